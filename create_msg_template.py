@@ -1,79 +1,265 @@
-import win32com.client
-import os
+"""
+Build the zAmp and USB cable verification email templates, no Outlook needed.
 
-# Get the absolute path to the Images folder
-script_dir = os.path.dirname(os.path.abspath(__file__))
-images_folder = os.path.join(script_dir, "Images")
-verification_image_path = os.path.join(images_folder, "zAmp verification")
+Writes "Templates/zAmp and USB Cable Verification - <LANGUAGE>.eml" for every
+language in VERIFICATION_EMAIL, each with Images/zAmp verification.png
+embedded inline and referenced from the HTML body as cid:verification_image.
+The image comes from the shared asset cache (zamp_assets.py): it is read,
+optimized and base64-encoded once and the same encoded payload is reused by
+every message, so the whole batch takes milliseconds on any platform.
+Outlook and Thunderbird open the .eml files as drafts (X-Unsent: 1): fill
+in the To: field and send.
 
-# Check if image exists
-if not os.path.exists(verification_image_path):
-    print(f"Error: Image not found at {verification_image_path}")
-    exit(1)
+With --msg an Outlook .msg is written alongside each .eml (see zamp_msg.py).
 
-# Create Outlook application object
-outlook = win32com.client.Dispatch("Outlook.Application")
+Usage:
+    python create_msg_template.py
+    python create_msg_template.py --languages ENGLISH FRENCH --msg
+"""
+import argparse
+import os
+import time
+from email.encoders import encode_noop
+from email.header import Header
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.policy import compat32
+from html import escape
 
-# Create a new mail item
-mail = outlook.CreateItem(0)  # 0 = olMailItem
+from zamp_assets import asset_cache
 
-# Set subject
-mail.Subject = "zAmp and USB cable picture verification"
+script_dir = os.path.dirname(os.path.abspath(__file__))
+VERIFICATION_IMAGE = os.path.join(script_dir, "Images", "zAmp verification.png")
+TEMPLATES_FOLDER = os.path.join(script_dir, "Templates")
+TEMPLATE_NAME = "zAmp and USB Cable Verification - {language}"
+CONTENT_ID = "verification_image"
+SUPPORT_EMAIL = "support@neuroptimal.com"
+# email.mime builds compat32 messages; mail files use CRLF line endings
+EML_POLICY = compat32.clone(linesep='\r\n')
+IMAGE_PLACEHOLDER = b'@@verification-image@@'
 
-# Create HTML body with embedded image
-# We'll use a content ID (cid) reference for the image
-html_body = """
-<html>
+# Per-language text; {email} in the instructions becomes a mailto link
+VERIFICATION_EMAIL = {
+    'ENGLISH': {
+        'subject': "zAmp and USB cable picture verification",
+        'greeting': "Hello,",
+        'intro': "To accurately diagnose your zAmp issue, please provide clear photos of the following:",
+        'items': [
+            ("zAmp", "A photo of the back of the zAmp, clearly showing the serial number and the USB cable "
+                     "connected to the zAmp."),
+            ("Monoprice USB Cable", "A close-up photo of the Monoprice USB cable, focusing on the section with the "
+                                    "“Monoprice” logo."),
+            ("System Setup", "A photo of your system setup with the USB cable connected to both the zAmp and the "
+                             "system."),
+        ],
+        'instructions': "Please refer to the image below for examples of the requested photos. Once you have taken "
+                        "these photos, please send them to {email}.",
+        'thanks': "Thank you for your cooperation.",
+    },
+    'FRENCH': {
+        'subject': "Vérification de l’image du zAmp et du câble USB",
+        'greeting': "Bonjour,",
+        'intro': "Afin de diagnostiquer précisément le problème de votre zAmp, veuillez nous envoyer des photos "
+                 "claires des éléments suivants :",
+        'items': [
+            ("zAmp", "Photo de l’arrière du zAmp, montrant clairement le numéro de série et le câble USB branché "
+                     "au zAmp."),
+            ("Câble USB Monoprice", "Gros plan du câble, mettant en évidence la zone avec le logo « Monoprice »."),
+            ("Configuration du système", "Photo de votre installation avec le câble USB connecté au zAmp et à "
+                                         "l’ordinateur."),
+        ],
+        'instructions': "Veuillez vous référer à l’image ci-dessous pour des exemples des photos demandées. Une fois "
+                        "ces photos prises, envoyez-les à {email}.",
+        'thanks': "Merci de votre coopération.",
+    },
+    'SPANISH': {
+        'subject': "Verificación de la imagen de zAmp y del cable USB",
+        'greeting': "Hola,",
+        'intro': "Para diagnosticar con precisión el problema de su zAmp, proporcione fotos claras de los "
+                 "siguientes elementos:",
+        'items': [
+            ("zAmp", "Una foto de la parte posterior del zAmp, que muestre claramente el número de serie y el cable "
+                     "USB conectado al zAmp."),
+            ("Cable USB Monoprice", "Una foto de primer plano del cable USB Monoprice, enfocándose en la sección "
+                                    "con el logotipo “Monoprice”."),
+            ("Configuración del sistema", "Una foto de la configuración de su sistema con el cable USB conectado "
+                                          "tanto al zAmp como al sistema."),
+        ],
+        'instructions': "Consulte la imagen a continuación para ver ejemplos de las fotos solicitadas. Una vez que "
+                        "haya tomado estas fotos, envíelas a {email}.",
+        'thanks': "Gracias por su cooperación.",
+    },
+    'ITALIAN': {
+        'subject': "Verifica dell'immagine di zAmp e del cavo USB",
+        'greeting': "Salve,",
+        'intro': "Per diagnosticare con precisione il problema del vostro zAmp, vi chiediamo di fornire foto chiare "
+                 "dei seguenti elementi:",
+        'items': [
+            ("zAmp", "Una foto del retro dello zAmp, che mostri chiaramente il numero di serie e il cavo USB "
+                     "collegato allo zAmp."),
+            ("Cavo USB Monoprice", "Una foto ravvicinata del cavo USB Monoprice, focalizzata sulla sezione con il "
+                                   "logo \"Monoprice\"."),
+            ("Configurazione del sistema", "Una foto della vostra configurazione, con il cavo USB collegato sia "
+                                           "allo zAmp che al sistema."),
+        ],
+        'instructions': "Fate riferimento all'immagine qui sotto per esempi delle foto richieste. Una volta "
+                        "scattate, inviatele a {email}.",
+        'thanks': "Grazie per la collaborazione.",
+    },
+    'DUTCH': {
+        'subject': "Verificatie van zAmp afbeelding en USB-kabel",
+        'greeting': "Hallo,",
+        'intro': "Om het probleem met uw zAmp nauwkeurig te diagnosticeren, gelieve duidelijke foto's te "
+                 "verstrekken van de volgende items:",
+        'items': [
+            ("zAmp", "Een foto van de achterkant van de zAmp, waarop duidelijk het serienummer en de USB-kabel die "
+                     "op de zAmp is aangesloten te zien zijn."),
+            ("Monoprice USB-kabel", "Een close-upfoto van de Monoprice USB-kabel, met de nadruk op het gedeelte met "
+                                    "het \"Monoprice\"-logo."),
+            ("Systeemconfiguratie", "Een foto van uw systeemconfiguratie met de USB-kabel aangesloten op zowel de "
+                                    "zAmp als het systeem."),
+        ],
+        'instructions': "Raadpleeg de onderstaande afbeelding voor voorbeelden van de gevraagde foto's. Zodra u "
+                        "deze foto's heeft gemaakt, stuurt u ze naar {email}.",
+        'thanks': "Dank u voor uw medewerking.",
+    },
+    'PORTUGUESE': {
+        'subject': "Verificação da imagem do zAmp e do cabo USB",
+        'greeting': "Olá,",
+        'intro': "Para diagnosticar com precisão o problema do seu zAmp, forneça fotos claras dos seguintes itens:",
+        'items': [
+            ("zAmp", "Uma foto da parte traseira do zAmp, mostrando claramente o número de série e o cabo USB "
+                     "conectado ao zAmp."),
+            ("Cabo USB Monoprice", "Uma foto em close do cabo USB Monoprice, com foco na seção com o logotipo "
+                                   "“Monoprice”."),
+            ("Configuração do sistema", "Uma foto da sua configuração com o cabo USB conectado ao zAmp e ao "
+                                        "computador."),
+        ],
+        'instructions': "Consulte a imagem abaixo para exemplos das fotos solicitadas. Depois de tirar as fotos, "
+                        "envie-as para {email}.",
+        'thanks': "Obrigado pela colaboração.",
+    },
+}
+
+HTML_TEMPLATE = """<html>
 <head>
+    <meta charset="utf-8">
     <style>
-        body { font-family: 'Calibri', sans-serif; font-size: 11pt; }
-        p { margin: 10px 0; }
-        ol { margin: 10px 0; padding-left: 25px; }
-        li { margin: 8px 0; }
-        .bold { font-weight: bold; }
+        body {{ font-family: 'Calibri', sans-serif; font-size: 11pt; }}
+        p {{ margin: 10px 0; }}
+        ol {{ margin: 10px 0; padding-left: 25px; }}
+        li {{ margin: 8px 0; }}
+        .bold {{ font-weight: bold; }}
     </style>
 </head>
 <body>
-    <p>Hello,</p>
+    <p>{greeting}</p>
 
-    <p>To accurately diagnose the issue with your zAmp, please provide clear pictures of the following:</p>
+    <p>{intro}</p>
 
     <ol>
-        <li><span class="bold">zAmp</span>:<br>
-        A photo of the back of the zAmp, clearly showing the serial number and the USB cable plugged into the zAmp.</li>
-
-        <li><span class="bold">Monoprice USB Cable</span>:<br>
-        A close-up photo of the Monoprice USB cable, focusing on the section with the "Monoprice" logo.</li>
-
-        <li><span class="bold">System Setup</span>:<br>
-        A picture of your system setup with the USB cable connected to both the zAmp and the system.</li>
+{items}
     </ol>
 
-    <p>Please refer to the image below for examples of the requested photos. Once you have taken these pictures, send them to <a href="mailto:support@neuroptimal.com">support@neuroptimal.com</a></p>
+    <p>{instructions}</p>
 
-    <p>Thank you for your cooperation.</p>
+    <p>{thanks}</p>
 
-    <p><img src="cid:verification_image" style="max-width: 100%; height: auto; border: 1px solid #000000;"></p>
+    <p><img src="cid:{cid}" style="max-width: 100%; height: auto; border: 1px solid #000000;"></p>
 </body>
 </html>
 """
 
-mail.HTMLBody = html_body
 
-# Attach the image with content ID
-attachment = mail.Attachments.Add(verification_image_path)
-attachment.PropertyAccessor.SetProperty("http://schemas.microsoft.com/mapi/proptag/0x3712001F", "verification_image")
+def render_html(text):
+    items = "\n\n".join(f'        <li><span class="bold">{escape(title)}</span>:<br>\n        {escape(body)}</li>'
+                        for title, body in text['items'])
+    link = f'<a href="mailto:{SUPPORT_EMAIL}">{SUPPORT_EMAIL}</a>'
+    return HTML_TEMPLATE.format(
+        greeting=escape(text['greeting']),
+        intro=escape(text['intro']),
+        items=items,
+        instructions=escape(text['instructions']).format(email=link),
+        thanks=escape(text['thanks']),
+        cid=CONTENT_ID,
+    )
+
+
+def render_text(text):
+    items = "\n\n".join(f"{n}. {title}:\n   {body}" for n, (title, body) in enumerate(text['items'], 1))
+    return "\n\n".join([text['greeting'], text['intro'], items,
+                        text['instructions'].format(email=SUPPORT_EMAIL), text['thanks']]) + "\n"
+
+
+def build_eml(text, image, to=None):
+    """multipart/related: text and HTML alternatives plus the inline EncodedImage"""
+    alternative = MIMEMultipart('alternative')
+    alternative.attach(MIMEText(render_text(text), 'plain', 'utf-8'))
+    alternative.attach(MIMEText(render_html(text), 'html', 'utf-8'))
+
+    # The generator would re-wrap the whole base64 payload for every message,
+    # so the image part carries a placeholder swapped for the shared encoding
+    image_part = MIMEImage(IMAGE_PLACEHOLDER, image.mime_type.split('/')[1], _encoder=encode_noop)
+    image_part['Content-Transfer-Encoding'] = 'base64'
+    image_part.add_header('Content-ID', f'<{CONTENT_ID}>')
+    image_part.add_header('Content-Disposition', 'inline', filename=image.name)
+
+    message = MIMEMultipart('related', type='multipart/alternative')
+    if to:
+        message['To'] = to
+    message['Subject'] = Header(text['subject'], 'utf-8')
+    message['X-Unsent'] = '1'
+    message.attach(alternative)
+    message.attach(image_part)
+    return message.as_bytes(policy=EML_POLICY).replace(IMAGE_PLACEHOLDER, image.mime_base64, 1)
+
+
+def build_templates(languages=None, out_dir=TEMPLATES_FOLDER, msg=False, image_path=VERIFICATION_IMAGE):
+    """Write the templates for the given languages (all by default); returns the paths written"""
+    languages = languages or list(VERIFICATION_EMAIL)
+    os.makedirs(out_dir, exist_ok=True)
+    image = asset_cache.get(image_path)
+    if msg:
+        from zamp_msg import write_msg
+
+    written = []
+    for language in languages:
+        text = VERIFICATION_EMAIL[language]
+        base = os.path.join(out_dir, TEMPLATE_NAME.format(language=language))
+        with open(base + '.eml', 'wb') as f:
+            f.write(build_eml(text, image))
+        written.append(base + '.eml')
+        if msg:
+            write_msg(base + '.msg', text['subject'], render_html(text), render_text(text),
+                      [(image.name, image.mime_type, image.data, CONTENT_ID)])
+            written.append(base + '.msg')
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the zAmp verification email templates")
+    parser.add_argument('--languages', nargs='+', type=str.upper, choices=list(VERIFICATION_EMAIL),
+                        help="Languages to build (default: all)")
+    parser.add_argument('--out', default=TEMPLATES_FOLDER, help="Output folder")
+    parser.add_argument('--msg', action='store_true', help="Also write Outlook .msg files")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(VERIFICATION_IMAGE):
+        print(f"Error: Image not found at {VERIFICATION_IMAGE}")
+        return 1
 
-# Save as .msg file in Templates folder
-templates_folder = os.path.join(script_dir, "Templates")
-if not os.path.exists(templates_folder):
-    os.makedirs(templates_folder)
+    started = time.perf_counter()
+    written = build_templates(args.languages, args.out, args.msg)
+    for path in written:
+        print(f"Email template saved to: {path}")
+    print(f"{len(written)} templates in {(time.perf_counter() - started) * 1000:.0f} ms")
+    print("\nYou can now:")
+    print("1. Double-click a template to open it as a draft in Outlook")
+    print("2. Fill in the 'To:' field with the recipient")
+    print("3. Click Send")
+    return 0
 
-msg_file_path = os.path.join(templates_folder, "zAmp_Verification_Request_ENGLISH.msg")
-mail.SaveAs(msg_file_path, 3)  # 3 = olMSG format
 
-print(f"Email template saved to: {msg_file_path}")
-print(f"\nYou can now:")
-print(f"1. Double-click the .msg file to open it in Outlook")
-print(f"2. Fill in the 'To:' field with the recipient")
-print(f"3. Click Send")
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -4,8 +4,6 @@
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>zAmp Checklist & Exchange Form</title>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/html2canvas/1.4.1/html2canvas.min.js"></script>
     <style>
         * {
             margin: 0;
@@ -670,19 +668,33 @@
                             <!-- SP9 Setup Image -->
                             <div id="sp9-setup-image" class="no-export" style="display: none; margin-top: 20px; padding: 15px; background: #f0f8ff; border: 2px solid #4C799B; border-radius: 10px;">
                                 <h4 style="margin: 0 0 10px 0; color: #18325B;">Surface Pro 9 Setup Guide</h4>
-                                <img id="sp9-image"
-                                     src="https://raw.githubusercontent.com/zooman69/zAmp/main/Images/SP9%20%20Setup.jpg"
-                                     alt="Surface Pro 9 Setup"
-                                     style="width: 100%; max-width: 800px; height: auto; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
+                                <picture>
+                                    <source type="image/avif" sizes="(max-width: 840px) 100vw, 800px"
+                                            srcset="Images/responsive/sp9-setup-400.avif 400w, Images/responsive/sp9-setup-800.avif 800w, Images/responsive/sp9-setup-1200.avif 1200w, Images/responsive/sp9-setup-1350.avif 1350w">
+                                    <source type="image/webp" sizes="(max-width: 840px) 100vw, 800px"
+                                            srcset="Images/responsive/sp9-setup-400.webp 400w, Images/responsive/sp9-setup-800.webp 800w, Images/responsive/sp9-setup-1200.webp 1200w, Images/responsive/sp9-setup-1350.webp 1350w">
+                                    <img id="sp9-image"
+                                         src="Images/SP9%20%20Setup.jpg"
+                                         width="1350" height="900" loading="lazy" decoding="async"
+                                         alt="Surface Pro 9 Setup"
+                                         style="width: 100%; max-width: 800px; height: auto; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
+                                </picture>
                                 <p style="margin-top: 10px; font-size: 9pt; color: #666; font-style: italic;">Click image to open in new tab</p>
                             </div>
                             <!-- SLG3 Setup Image -->
                             <div id="slg3-setup-image" class="no-export" style="display: none; margin-top: 20px; padding: 15px; background: #f0f8ff; border: 2px solid #4C799B; border-radius: 10px;">
                                 <h4 style="margin: 0 0 10px 0; color: #18325B;">Surface Laptop Go 3 Setup Guide</h4>
-                                <img id="slg3-image"
-                                     src="https://raw.githubusercontent.com/zooman69/zAmp/main/Images/SLG3.jpg"
-                                     alt="Surface Laptop Go 3 Setup"
-                                     style="width: 100%; max-width: 800px; height: auto; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
+                                <picture>
+                                    <source type="image/avif" sizes="(max-width: 840px) 100vw, 800px"
+                                            srcset="Images/responsive/slg3-400.avif 400w, Images/responsive/slg3-800.avif 800w, Images/responsive/slg3-1200.avif 1200w, Images/responsive/slg3-1600.avif 1600w">
+                                    <source type="image/webp" sizes="(max-width: 840px) 100vw, 800px"
+                                            srcset="Images/responsive/slg3-400.webp 400w, Images/responsive/slg3-800.webp 800w, Images/responsive/slg3-1200.webp 1200w, Images/responsive/slg3-1600.webp 1600w">
+                                    <img id="slg3-image"
+                                         src="Images/SLG3.jpg"
+                                         width="2355" height="1800" loading="lazy" decoding="async"
+                                         alt="Surface Laptop Go 3 Setup"
+                                         style="width: 100%; max-width: 800px; height: auto; border-radius: 8px; box-shadow: 0 4px 8px rgba(0,0,0,0.1);">
+                                </picture>
                                 <p style="margin-top: 10px; font-size: 9pt; color: #666; font-style: italic;">Click image to open in new tab</p>
                             </div>
                         </div>
@@ -1040,9 +1052,16 @@
                         <!-- Sample Images Grid -->
                         <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 20px;">
                             <div style="background: white; padding: 10px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                                <img src="https://raw.githubusercontent.com/zooman69/zAmp/main/Images/zAmp%20verification"
-                                     alt="Sample zAmp Verification"
-                                     style="width: 100%; height: auto; border-radius: 4px; display: block;">
+                                <picture>
+                                    <source type="image/avif" sizes="(max-width: 1200px) 45vw, 540px"
+                                            srcset="Images/responsive/zamp-verification-400.avif 400w, Images/responsive/zamp-verification-800.avif 800w, Images/responsive/zamp-verification-901.avif 901w">
+                                    <source type="image/webp" sizes="(max-width: 1200px) 45vw, 540px"
+                                            srcset="Images/responsive/zamp-verification-400.webp 400w, Images/responsive/zamp-verification-800.webp 800w, Images/responsive/zamp-verification-901.webp 901w">
+                                    <img src="Images/zAmp%20verification.png"
+                                         width="901" height="578" loading="lazy" decoding="async"
+                                         alt="Sample zAmp Verification"
+                                         style="width: 100%; height: auto; border-radius: 4px; display: block;">
+                                </picture>
                                 <div style="text-align: center; margin-top: 8px; font-size: 11px; color: #64748b; font-weight: 600;">
                                     Example 1: zAmp Serial Number Verification
                                 </div>
@@ -1052,9 +1071,16 @@
                                 </button>
                             </div>
                             <div style="background: white; padding: 10px; border-radius: 8px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);">
-                                <img src="https://raw.githubusercontent.com/zooman69/zAmp/main/Images/Device%20manager%20sample.jpg"
-                                     alt="Sample Device Manager"
-                                     style="width: 100%; height: auto; border-radius: 4px; display: block;">
+                                <picture>
+                                    <source type="image/avif" sizes="(max-width: 1200px) 45vw, 540px"
+                                            srcset="Images/responsive/device-manager-sample-400.avif 400w, Images/responsive/device-manager-sample-800.avif 800w, Images/responsive/device-manager-sample-961.avif 961w">
+                                    <source type="image/webp" sizes="(max-width: 1200px) 45vw, 540px"
+                                            srcset="Images/responsive/device-manager-sample-400.webp 400w, Images/responsive/device-manager-sample-800.webp 800w, Images/responsive/device-manager-sample-961.webp 961w">
+                                    <img src="Images/Device%20manager%20sample.jpg"
+                                         width="961" height="724" loading="lazy" decoding="async"
+                                         alt="Sample Device Manager"
+                                         style="width: 100%; height: auto; border-radius: 4px; display: block;">
+                                </picture>
                                 <div style="text-align: center; margin-top: 8px; font-size: 11px; color: #64748b; font-weight: 600;">
                                     Example 2: Device Manager Screenshot
                                 </div>
@@ -2117,12 +2143,31 @@ Loaners & Exchanges | Zengar Institute Inc.
                 return;
             }
 
-            // Get the absolute path to the MSG template
-            // Note: This assumes the form is being run locally
-            const currentPath = window.location.pathname;
-            const baseDir = currentPath.substring(0, currentPath.lastIndexOf('/'));
-            const msgTemplatePath = baseDir + '/Templates/zAmp_Verification_Request_ENGLISH.msg';
+            // Served by zamp_server.py: download a ready-made .eml draft with the client in To:,
+            // built from the shared image cache instead of re-attaching the image in Outlook.
+            // Any other server (or no template service) falls back to the VBScript below.
+            if (window.location.protocol.startsWith('http')) {
+                fetch(`verification-email?language=ENGLISH&to=${encodeURIComponent(clientEmail)}`)
+                    .then(response => {
+                        if (!response.ok) {
+                            throw new Error('No local template service');
+                        }
+                        return response.blob();
+                    })
+                    .then(blob => {
+                        downloadBlob(blob, 'zAmp and USB Cable Verification - ENGLISH.eml');
+                        setTimeout(() => {
+                            alert(`📧 Email Draft Downloaded!\n\nTo send the verification email:\n\n1. Go to your Downloads folder\n2. Double-click: zAmp and USB Cable Verification - ENGLISH.eml\n3. Outlook will open with email ready\n   ✓ To: ${clientEmail}\n   ✓ Subject and body pre-filled\n4. Review and click Send`);
+                        }, 500);
+                    })
+                    .catch(() => downloadVerificationScript(clientEmail));
+                return;
+            }
+            downloadVerificationScript(clientEmail);
+        }
 
+        // Download a VBScript that opens the MSG template in Outlook with the client in To:
+        function downloadVerificationScript(clientEmail) {
             // Create VBScript that opens the MSG template and sets the To field
             const vbsScript = `' VBScript to open MSG template with client email
 Dim objOutlook, objMail, objFSO, msgPath
@@ -2130,7 +2175,7 @@ Dim objOutlook, objMail, objFSO, msgPath
 Set objFSO = CreateObject("Scripting.FileSystemObject")
 
 ' Use absolute path to WhisperProject Templates folder
-msgPath = "c:\\WhisperProject\\Templates\\zAmp_Verification_Request_ENGLISH.msg"
+msgPath = "c:\\WhisperProject\\Templates\\zAmp and USB Cable Verification - ENGLISH.msg"
 
 ' Check if template exists
 If Not objFSO.FileExists(msgPath) Then
@@ -2330,160 +2375,267 @@ Set objFSO = Nothing
             return true;
         }
         
-        // Function to generate HTML file for Technician Submit
-        function generateTechnicianHTML(htmlFilename, fullName, email, zampNumber, description, systemId, ticketNum) {
-            try {
-                // Clone the entire document
-                const clonedDoc = document.documentElement.cloneNode(true);
-                
-                // Copy all form field values to the clone
-                const originalInputs = document.querySelectorAll('input, textarea, select');
-                const clonedInputs = clonedDoc.querySelectorAll('input, textarea, select');
-                
-                originalInputs.forEach((original, index) => {
-                    const cloned = clonedInputs[index];
-                    if (!cloned) return;
-                    
-                    if (original.type === 'checkbox' || original.type === 'radio') {
-                        if (original.checked) {
-                            cloned.setAttribute('checked', 'checked');
-                        } else {
-                            cloned.removeAttribute('checked');
-                        }
-                    } else if (original.tagName === 'SELECT') {
-                        cloned.value = original.value;
-                        // Set selected attribute on the correct option
-                        const clonedOptions = cloned.querySelectorAll('option');
-                        clonedOptions.forEach(opt => {
-                            if (opt.value === original.value) {
-                                opt.setAttribute('selected', 'selected');
-                            } else {
-                                opt.removeAttribute('selected');
-                            }
-                        });
-                    } else if (original.tagName === 'TEXTAREA') {
-                        cloned.textContent = original.value;
+        // Form fields as the JSON packet zamp_server.py renders (see zamp_packet.py):
+        // one entry per named control, labelled from its table row or form group
+        function collectPacket(title, filename) {
+            const cleanText = el => el ? el.textContent.replace(/\*/g, '').replace(/\s+/g, ' ').trim().replace(/:$/, '') : '';
+            const groupLabel = el => {
+                const group = el.closest('.form-group');
+                return group ? cleanText(group.querySelector('label')) : '';
+            };
+            const rowLabel = el => {
+                const row = el.closest('tr');
+                return row ? cleanText(row.querySelector('td')) : '';
+            };
+            const isHidden = (el, section) => {
+                for (let node = el; node && node !== section; node = node.parentElement) {
+                    if (node.style.display === 'none') return true;
+                }
+                return false;
+            };
+            const choiceNames = { yes: 'Yes', no: 'No', na: 'N/A' };
+
+            const sections = [];
+            document.querySelectorAll('.main-content .section').forEach(section => {
+                const fields = [];
+                const seen = new Set();
+                section.querySelectorAll('input, select, textarea').forEach(control => {
+                    if (control.type === 'file' || control.closest('.no-export')) return;
+                    const key = control.name || control.id;
+                    if (!key || key.startsWith('image_caption_') || seen.has(key)) return;
+                    seen.add(key);
+
+                    const options = control.type === 'radio'
+                        ? Array.from(section.querySelectorAll(`input[name="${key}"]`)) : [control];
+                    if (options.every(option => isHidden(option, section))) return;
+                    // Radios with one option per row (warranty approval) are a choice between the rows
+                    const optionRows = new Set(options.map(option => option.closest('tr')));
+                    const rowChoice = options.length > 1 && optionRows.size > 1;
+
+                    let value;
+                    if (control.type === 'radio') {
+                        const checked = options.find(option => option.checked);
+                        value = !checked ? '' : choiceNames[checked.value]
+                            || (rowChoice ? rowLabel(checked) : cleanText(checked.closest('label')))
+                            || checked.value;
+                    } else if (control.type === 'checkbox') {
+                        value = control.checked ? 'Yes' : 'No';
+                    } else if (control.tagName === 'SELECT') {
+                        value = control.value ? control.options[control.selectedIndex].text : '';
                     } else {
-                        cloned.setAttribute('value', original.value);
+                        value = control.value;
                     }
+
+                    let label;
+                    if (rowChoice) {
+                        label = groupLabel(control) || key.replace(/_/g, ' ').replace(/^./, c => c.toUpperCase());
+                    } else if (control.closest('tr')) {
+                        label = rowLabel(control);
+                    } else if (control.type === 'checkbox' && control.closest('label')) {
+                        label = cleanText(control.closest('label'));
+                    } else {
+                        label = groupLabel(control);
+                    }
+                    const table = rowChoice ? null : control.closest('table');
+                    const tableHeader = table ? table.querySelector('thead th') : null;
+                    const group = tableHeader ? cleanText(tableHeader) : (table ? groupLabel(table) : '');
+                    fields.push({ group: group, label: label || key, value: value });
                 });
-                
-                // Copy uploaded images
-                for (let i = 1; i <= 6; i++) {
-                    const originalInput = document.getElementById(`image-input-${i}`);
-                    const originalPreview = document.querySelector(`#image-area-${i} .preview-image`);
-                    const clonedPreview = clonedDoc.querySelector(`#image-area-${i} .preview-image`);
-                    
-                    if (originalPreview && clonedPreview && originalPreview.src && originalPreview.style.display !== 'none') {
-                        clonedPreview.src = originalPreview.src;
-                        clonedPreview.style.display = 'block';
-                        const clonedUploadText = clonedDoc.querySelector(`#image-area-${i} .upload-text`);
-                        if (clonedUploadText) clonedUploadText.style.display = 'none';
+                sections.push({ title: cleanText(section.querySelector('.section-header')), fields: fields });
+            });
+
+            const images = [];
+            for (let i = 1; i <= 6; i++) {
+                const preview = document.querySelector(`#image-area-${i} .preview-image`);
+                if (!preview || !preview.src.startsWith('data:') || preview.style.display === 'none') continue;
+                const caption = document.querySelector(`input[name="image_caption_${i}"]`);
+                images.push({ caption: (caption && caption.value.trim()) || `Image ${i}`, src: preview.src });
+            }
+
+            return { title: title, filename: filename, sections: sections, images: images };
+        }
+
+        // POST a packet to zamp_server.py and return the rendered file as a Blob
+        // ('technician' gives the HTML checklist, 'approval' the PDF)
+        async function renderPacket(kind, packet) {
+            const response = await fetch(`packet/${kind}`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(packet)
+            });
+            if (!response.ok) {
+                throw new Error(`Packet service returned ${response.status}: ${await response.text()}`);
+            }
+            return response.blob();
+        }
+
+        function downloadBlob(blob, filename) {
+            const url = URL.createObjectURL(blob);
+            const a = document.createElement('a');
+            a.href = url;
+            a.download = filename;
+            document.body.appendChild(a);
+            a.click();
+            document.body.removeChild(a);
+            URL.revokeObjectURL(url);
+        }
+
+        // Offline fallback (form opened from disk): the whole page cloned with the
+        // current values and images, without navigation, buttons or scripts
+        function exportFormHTML() {
+            // Clone the entire document
+            const clonedDoc = document.documentElement.cloneNode(true);
+
+            // Copy all form field values to the clone
+            const originalInputs = document.querySelectorAll('input, textarea, select');
+            const clonedInputs = clonedDoc.querySelectorAll('input, textarea, select');
+
+            originalInputs.forEach((original, index) => {
+                const cloned = clonedInputs[index];
+                if (!cloned) return;
+
+                if (original.type === 'checkbox' || original.type === 'radio') {
+                    if (original.checked) {
+                        cloned.setAttribute('checked', 'checked');
+                    } else {
+                        cloned.removeAttribute('checked');
                     }
+                } else if (original.tagName === 'SELECT') {
+                    cloned.value = original.value;
+                    // Set selected attribute on the correct option
+                    const clonedOptions = cloned.querySelectorAll('option');
+                    clonedOptions.forEach(opt => {
+                        if (opt.value === original.value) {
+                            opt.setAttribute('selected', 'selected');
+                        } else {
+                            opt.removeAttribute('selected');
+                        }
+                    });
+                } else if (original.tagName === 'TEXTAREA') {
+                    cloned.textContent = original.value;
+                } else {
+                    cloned.setAttribute('value', original.value);
                 }
-                
-                // Remove the sidebar navigation from clone
-                const sidebar = clonedDoc.querySelector('.sidebar');
-                if (sidebar) sidebar.remove();
-
-                // Remove all elements with no-export class
-                const noExportElements = clonedDoc.querySelectorAll('.no-export');
-                noExportElements.forEach(el => el.remove());
+            });
 
-                // Remove demo button from clone
-                const demoButton = clonedDoc.querySelector('button[onclick="demoAutoFill()"]');
-                if (demoButton) {
-                    const demoSection = demoButton.closest('div');
-                    if (demoSection) demoSection.remove();
+            // Copy uploaded images
+            for (let i = 1; i <= 6; i++) {
+                const originalPreview = document.querySelector(`#image-area-${i} .preview-image`);
+                const clonedPreview = clonedDoc.querySelector(`#image-area-${i} .preview-image`);
+
+                if (originalPreview && clonedPreview && originalPreview.src && originalPreview.style.display !== 'none') {
+                    clonedPreview.src = originalPreview.src;
+                    clonedPreview.style.display = 'block';
+                    const clonedUploadText = clonedDoc.querySelector(`#image-area-${i} .upload-text`);
+                    if (clonedUploadText) clonedUploadText.style.display = 'none';
                 }
+            }
 
-                // Remove all buttons from clone
-                const buttons = clonedDoc.querySelectorAll('button');
-                buttons.forEach(btn => btn.remove());
+            // Remove the sidebar navigation from clone
+            const sidebar = clonedDoc.querySelector('.sidebar');
+            if (sidebar) sidebar.remove();
 
-                // Remove all scripts from clone to prevent functionality
-                const scripts = clonedDoc.querySelectorAll('script');
-                scripts.forEach(script => script.remove());
-                
-                // Show all sections in the clone
-                const sections = clonedDoc.querySelectorAll('.section');
-                sections.forEach(section => {
-                    section.classList.add('active');
-                    section.style.display = 'block';
-                });
-                
-                // Adjust main content styling for better layout
-                const mainContent = clonedDoc.querySelector('.main-content');
-                if (mainContent) {
-                    mainContent.style.marginLeft = '0';
-                    mainContent.style.padding = '20px';
-                    mainContent.style.width = '100%';
-                    mainContent.style.maxWidth = '100%';
+            // Remove all elements with no-export class
+            const noExportElements = clonedDoc.querySelectorAll('.no-export');
+            noExportElements.forEach(el => el.remove());
+
+            // Remove demo button from clone
+            const demoButton = clonedDoc.querySelector('button[onclick="demoAutoFill()"]');
+            if (demoButton) {
+                const demoSection = demoButton.closest('div');
+                if (demoSection) demoSection.remove();
+            }
+
+            // Remove all buttons from clone
+            const buttons = clonedDoc.querySelectorAll('button');
+            buttons.forEach(btn => btn.remove());
+
+            // Remove all scripts from clone to prevent functionality
+            const scripts = clonedDoc.querySelectorAll('script');
+            scripts.forEach(script => script.remove());
+
+            // Show all sections in the clone
+            const sections = clonedDoc.querySelectorAll('.section');
+            sections.forEach(section => {
+                section.classList.add('active');
+                section.style.display = 'block';
+            });
+
+            // Adjust main content styling for better layout
+            const mainContent = clonedDoc.querySelector('.main-content');
+            if (mainContent) {
+                mainContent.style.marginLeft = '0';
+                mainContent.style.padding = '20px';
+                mainContent.style.width = '100%';
+                mainContent.style.maxWidth = '100%';
+            }
+
+            // Adjust body styling
+            const body = clonedDoc.querySelector('body');
+            if (body) {
+                body.style.margin = '0';
+                body.style.padding = '0';
+            }
+
+            // Get the HTML content first
+            let htmlContent = '<!DOCTYPE html>\n' + clonedDoc.outerHTML;
+
+            // Add print-friendly styles by injecting into HTML string
+            const styleTag = `<style>
+                @media print {
+                    body { margin: 0; padding: 20px; }
+                    .section { page-break-after: always; }
                 }
-                
-                // Adjust body styling
-                const body = clonedDoc.querySelector('body');
-                if (body) {
-                    body.style.margin = '0';
-                    body.style.padding = '0';
+                body { background: #f5f5f5; }
+                .main-content { background: white; }
+                .section-header {
+                    margin: 0 0 30px 0 !important;
                 }
-                
-                // Get the HTML content first
-                let htmlContent = '<!DOCTYPE html>\n' + clonedDoc.outerHTML;
-
-                // Add print-friendly styles by injecting into HTML string
-                const styleTag = `<style>
-                    @media print {
-                        body { margin: 0; padding: 20px; }
-                        .section { page-break-after: always; }
-                    }
-                    body { background: #f5f5f5; }
-                    .main-content { background: white; }
-                    .section-header {
-                        margin: 0 0 30px 0 !important;
-                    }
+                .form-row {
+                    display: grid !important;
+                    grid-template-columns: 1fr 1fr !important;
+                    gap: 20px !important;
+                }
+                .form-row.full {
+                    grid-template-columns: 1fr !important;
+                }
+                .image-grid {
+                    display: grid !important;
+                    grid-template-columns: repeat(2, 1fr) !important;
+                    gap: 30px !important;
+                }
+                /* Override responsive media query for exported file */
+                @media (max-width: 768px) {
                     .form-row {
-                        display: grid !important;
                         grid-template-columns: 1fr 1fr !important;
-                        gap: 20px !important;
-                    }
-                    .form-row.full {
-                        grid-template-columns: 1fr !important;
                     }
                     .image-grid {
-                        display: grid !important;
                         grid-template-columns: repeat(2, 1fr) !important;
-                        gap: 30px !important;
                     }
-                    /* Override responsive media query for exported file */
-                    @media (max-width: 768px) {
-                        .form-row {
-                            grid-template-columns: 1fr 1fr !important;
-                        }
-                        .image-grid {
-                            grid-template-columns: repeat(2, 1fr) !important;
-                        }
-                    }
-                </style>`;
+                }
+            </style>`;
 
-                // Inject the style tag before closing </head>
-                htmlContent = htmlContent.replace('</head>', styleTag + '</head>');
-                
-                // Create a Blob and download
-                const blob = new Blob([htmlContent], { type: 'text/html' });
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = htmlFilename;
-                document.body.appendChild(a);
-                a.click();
-                document.body.removeChild(a);
-                URL.revokeObjectURL(url);
+            // Inject the style tag before closing </head>
+            return htmlContent.replace('</head>', styleTag + '</head>');
+        }
+
+        // Function to generate HTML file for Technician Submit
+        async function generateTechnicianHTML(htmlFilename, fullName, email, zampNumber, description, systemId, ticketNum) {
+            try {
+                const emailSubject = `zAmp Checklist: ${systemId || 'N/A'} | zAmp# ${zampNumber} | ${ticketNum}`;
+
+                // Served by zamp_server.py: the checklist is rendered from the field values
+                // instead of cloning and serializing the whole page
+                if (window.location.protocol.startsWith('http')) {
+                    const packet = collectPacket(emailSubject, htmlFilename.replace(/\.html$/, ''));
+                    downloadBlob(await renderPacket('technician', packet), htmlFilename);
+                } else {
+                    downloadBlob(new Blob([exportFormHTML()], { type: 'text/html' }), htmlFilename);
+                }
                 
                 // Wait a moment for download
                 setTimeout(() => {
                     // Prepare email
-                    const emailSubject = `zAmp Checklist: ${systemId || 'N/A'} | zAmp# ${zampNumber} | ${ticketNum}`;
                     const emailBody = `Hi Guys,
 
 Attached is the checklist and information for the zAmp that needs to be exchanged. Thanks.
@@ -2556,163 +2708,26 @@ Description of issue: ${description}
             originalButton.textContent = 'Generating PDF...';
             
             try {
-                // Generate HTML filename
+                // Served by zamp_server.py the approval packet is a text PDF rendered from
+                // the field values; opened from disk it falls back to the page clone
                 const ticketNum = techTicket ? `TS${techTicket}` : 'NoTicket';
                 const sanitizedName = fullName.replace(/[^a-zA-Z0-9]/g, '_');
-                const htmlFilename = `zAmp_Checklist_${ticketNum}_${sanitizedName}.html`;
-                
-                // Clone the entire document
-                const clonedDoc = document.documentElement.cloneNode(true);
-                
-                // Copy all form field values to the clone
-                const originalInputs = document.querySelectorAll('input, textarea, select');
-                const clonedInputs = clonedDoc.querySelectorAll('input, textarea, select');
-                
-                originalInputs.forEach((original, index) => {
-                    const cloned = clonedInputs[index];
-                    if (!cloned) return;
-                    
-                    if (original.type === 'checkbox' || original.type === 'radio') {
-                        if (original.checked) {
-                            cloned.setAttribute('checked', 'checked');
-                        } else {
-                            cloned.removeAttribute('checked');
-                        }
-                    } else if (original.tagName === 'SELECT') {
-                        cloned.value = original.value;
-                        // Set selected attribute on the correct option
-                        const clonedOptions = cloned.querySelectorAll('option');
-                        clonedOptions.forEach(opt => {
-                            if (opt.value === original.value) {
-                                opt.setAttribute('selected', 'selected');
-                            } else {
-                                opt.removeAttribute('selected');
-                            }
-                        });
-                    } else if (original.tagName === 'TEXTAREA') {
-                        cloned.textContent = original.value;
-                    } else {
-                        cloned.setAttribute('value', original.value);
-                    }
-                });
-                
-                // Copy uploaded images
-                for (let i = 1; i <= 6; i++) {
-                    const originalInput = document.getElementById(`image-input-${i}`);
-                    const originalPreview = document.querySelector(`#image-area-${i} .preview-image`);
-                    const clonedPreview = clonedDoc.querySelector(`#image-area-${i} .preview-image`);
-                    
-                    if (originalPreview && clonedPreview && originalPreview.src && originalPreview.style.display !== 'none') {
-                        clonedPreview.src = originalPreview.src;
-                        clonedPreview.style.display = 'block';
-                        const clonedUploadText = clonedDoc.querySelector(`#image-area-${i} .upload-text`);
-                        if (clonedUploadText) clonedUploadText.style.display = 'none';
-                    }
-                }
-                
-                // Remove the sidebar navigation from clone
-                const sidebar = clonedDoc.querySelector('.sidebar');
-                if (sidebar) sidebar.remove();
-
-                // Remove all elements with no-export class
-                const noExportElements = clonedDoc.querySelectorAll('.no-export');
-                noExportElements.forEach(el => el.remove());
-
-                // Remove demo button from clone
-                const demoButton = clonedDoc.querySelector('button[onclick="demoAutoFill()"]');
-                if (demoButton) {
-                    const demoSection = demoButton.closest('div');
-                    if (demoSection) demoSection.remove();
-                }
-
-                // Remove all buttons from clone
-                const buttons = clonedDoc.querySelectorAll('button');
-                buttons.forEach(btn => btn.remove());
-
-                // Remove all scripts from clone to prevent functionality
-                const scripts = clonedDoc.querySelectorAll('script');
-                scripts.forEach(script => script.remove());
-                
-                // Show all sections in the clone
-                const sections = clonedDoc.querySelectorAll('.section');
-                sections.forEach(section => {
-                    section.classList.add('active');
-                    section.style.display = 'block';
-                });
-                
-                // Adjust main content styling for better layout
-                const mainContent = clonedDoc.querySelector('.main-content');
-                if (mainContent) {
-                    mainContent.style.marginLeft = '0';
-                    mainContent.style.padding = '20px';
-                    mainContent.style.width = '100%';
-                    mainContent.style.maxWidth = '100%';
-                }
-                
-                // Adjust body styling
-                const body = clonedDoc.querySelector('body');
-                if (body) {
-                    body.style.margin = '0';
-                    body.style.padding = '0';
+                const emailSubject = `Approved zAmp Repair: ${systemId || 'N/A'} | zAmp# ${zampNumber} | ${ticketNum}`;
+                const baseFilename = `zAmp_Checklist_${ticketNum}_${sanitizedName}`;
+                let packetFilename;
+                if (window.location.protocol.startsWith('http')) {
+                    packetFilename = `${baseFilename}.pdf`;
+                    downloadBlob(await renderPacket('approval', collectPacket(emailSubject, baseFilename)), packetFilename);
+                } else {
+                    packetFilename = `${baseFilename}.html`;
+                    downloadBlob(new Blob([exportFormHTML()], { type: 'text/html' }), packetFilename);
                 }
-                
-                // Get the HTML content first
-                let htmlContent = '<!DOCTYPE html>\n' + clonedDoc.outerHTML;
-
-                // Add print-friendly styles by injecting into HTML string
-                const styleTag = `<style>
-                    @media print {
-                        body { margin: 0; padding: 20px; }
-                        .section { page-break-after: always; }
-                    }
-                    body { background: #f5f5f5; }
-                    .main-content { background: white; }
-                    .section-header {
-                        margin: 0 0 30px 0 !important;
-                    }
-                    .form-row {
-                        display: grid !important;
-                        grid-template-columns: 1fr 1fr !important;
-                        gap: 20px !important;
-                    }
-                    .form-row.full {
-                        grid-template-columns: 1fr !important;
-                    }
-                    .image-grid {
-                        display: grid !important;
-                        grid-template-columns: repeat(2, 1fr) !important;
-                        gap: 30px !important;
-                    }
-                    /* Override responsive media query for exported file */
-                    @media (max-width: 768px) {
-                        .form-row {
-                            grid-template-columns: 1fr 1fr !important;
-                        }
-                        .image-grid {
-                            grid-template-columns: repeat(2, 1fr) !important;
-                        }
-                    }
-                </style>`;
-
-                // Inject the style tag before closing </head>
-                htmlContent = htmlContent.replace('</head>', styleTag + '</head>');
-                
-                // Create a Blob and download
-                const blob = new Blob([htmlContent], { type: 'text/html' });
-                const url = URL.createObjectURL(blob);
-                const a = document.createElement('a');
-                a.href = url;
-                a.download = htmlFilename;
-                document.body.appendChild(a);
-                a.click();
-                document.body.removeChild(a);
-                URL.revokeObjectURL(url);
+                const fileType = packetFilename.endsWith('.pdf') ? 'PDF' : 'HTML';
                 
                 // Wait a moment for download
                 await new Promise(resolve => setTimeout(resolve, 500));
                 
                 // Prepare email
-                const emailSubject = `Approved zAmp Repair: ${systemId || 'N/A'} | zAmp# ${zampNumber} | ${ticketNum}`;
                 const emailBody = `Hi Loaners & Exchanges Team,
 
 The zAmp for this client has been approved for advanced exchange. Thanks
@@ -2731,11 +2746,11 @@ Description of issue: ${description || 'N/A'}
                 window.location.href = mailtoLink;
                 
                 // Show success message
-                alert(`✅ HTML file generated successfully!\n\nFile: ${htmlFilename}\n\nIMPORTANT: The HTML file has been downloaded to your computer. Please attach it to the email that is opening.\n\nThe recipient can open this file in any web browser.`);
+                alert(`✅ ${fileType} file generated successfully!\n\nFile: ${packetFilename}\n\nIMPORTANT: The ${fileType} file has been downloaded to your computer. Please attach it to the email that is opening.\n\nThe recipient can open this file in any ${fileType === 'PDF' ? 'PDF viewer' : 'web browser'}.`);
                 
             } catch (error) {
-                console.error('Error generating HTML:', error);
-                alert('❌ Error generating HTML file. Please try again or contact support.');
+                console.error('Error generating packet:', error);
+                alert('❌ Error generating the approval file. Please try again or contact support.');
             } finally {
                 // Restore button
                 originalButton.disabled = false;
@@ -0,0 +1,320 @@
+"""
+Content-addressed cache of email-ready images from Images/.
+
+Each image is keyed by the SHA-256 of its bytes. For every key the cache
+keeps the version sent in emails: downscaled to EMAIL_MAX_WIDTH and
+recompressed when Pillow is installed (the original bytes otherwise), along
+with its base64 encodings - CRLF-wrapped for MIME parts and unwrapped for
+data: URIs. Optimized images are stored under .asset_cache/ (override with
+ZAMP_ASSET_CACHE_DIR) and, like the encodings, memoized in memory, so the
+template builder and the zAmp server read, resize and encode each image
+once however many languages and templates use it. Editing an image changes
+its hash, which builds a fresh entry.
+
+--responsive is the build step for the web pages: it writes AVIF and WebP
+copies of every image at RESPONSIVE_WIDTHS (never wider than the source)
+plus a THUMBNAIL_WIDTH WebP into Images/responsive/, and records them in
+Images/responsive/manifest.json by source name and content hash. zAmp.html
+references them through <picture> srcsets with lazy loading, keeping the
+originals as the fallback and the "open in new tab" target. The analyzer
+logo in assets/ gets the same treatment at LOGO_WIDTHS. Images whose hash
+matches the manifest are skipped, so reruns only encode what changed.
+
+Usage:
+    python zamp_assets.py                 # precompute every image in Images/
+    python zamp_assets.py "Images/zAmp verification.png"
+    python zamp_assets.py --responsive    # build Images/responsive/ and the logo variants (needs Pillow)
+"""
+import argparse
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from functools import cached_property
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+IMAGES_DIR = os.path.join(ROOT, 'Images')
+RESPONSIVE_DIR = os.path.join(IMAGES_DIR, 'responsive')
+ASSETS_DIR = os.path.join(ROOT, 'assets')
+LOGO = os.path.join(ASSETS_DIR, 'neurooptimal-logo.webp')
+MANIFEST_NAME = 'manifest.json'
+ASSET_VERSION = 1
+EMAIL_MAX_WIDTH = 1200
+JPEG_QUALITY = 85
+
+# Responsive variants; bump RESPONSIVE_VERSION when widths or qualities change to rebuild everything
+RESPONSIVE_VERSION = 1
+RESPONSIVE_WIDTHS = (400, 800, 1200, 1600)
+THUMBNAIL_WIDTH = 160
+# The logo is shown 80px high, so 1x and 2x
+LOGO_WIDTHS = (80, 160)
+RESPONSIVE_FORMATS = {
+    'avif': {'format': 'AVIF', 'quality': 55, 'speed': 6},
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 6},
+}
+
+IMAGE_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+}
+
+
+def optimize_image(data, max_width=EMAIL_MAX_WIDTH):
+    """Downscale to max_width and recompress PNG/JPEG; returns data unchanged without Pillow or any gain"""
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as image:
+        if image.format not in ('PNG', 'JPEG'):
+            return data
+        image_format = image.format
+        resized = image.width > max_width
+        if resized:
+            image = image.resize((max_width, round(image.height * max_width / image.width)), Image.LANCZOS)
+        out = io.BytesIO()
+        if image_format == 'JPEG':
+            image.convert('RGB').save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            image.save(out, 'PNG', optimize=True)
+    optimized = out.getvalue()
+    return optimized if resized or len(optimized) < len(data) else data
+
+
+class EncodedImage:
+    """An email-ready image plus its encodings, computed on first use"""
+
+    def __init__(self, name, mime_type, data, digest):
+        self.name = name
+        self.mime_type = mime_type
+        self.data = data
+        self.digest = digest
+
+    @cached_property
+    def mime_base64(self):
+        """Base64 in CRLF-terminated 76-character lines, as a MIME part body"""
+        return base64.encodebytes(self.data).rstrip(b'\n').replace(b'\n', b'\r\n')
+
+    @cached_property
+    def data_uri(self):
+        return f"data:{self.mime_type};base64,{base64.b64encode(self.data).decode('ascii')}"
+
+
+class AssetCache:
+    def __init__(self, directory, max_width=EMAIL_MAX_WIDTH):
+        self.directory = directory
+        self.max_width = max_width
+        self._lock = threading.Lock()
+        self._digests = {}
+        self._images = {}
+
+    def digest(self, path):
+        """SHA-256 of the file's bytes, memoized per (path, size, mtime)"""
+        stat = os.stat(path)
+        memo_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self._digests.get(memo_key)
+        if digest is None:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            self._digests[memo_key] = digest
+        return digest
+
+    def _path(self, digest, extension):
+        return os.path.join(self.directory, digest[:2], f"{digest}-v{ASSET_VERSION}-w{self.max_width}{extension}")
+
+    def get(self, path):
+        """The EncodedImage for an image file, building and storing its optimized version on a miss"""
+        digest = self.digest(path)
+        image = self._images.get(digest)
+        if image is not None:
+            return image
+
+        with self._lock:
+            image = self._images.get(digest)
+            if image is not None:
+                return image
+            extension = os.path.splitext(path)[1].lower()
+            stored = self._path(digest, extension)
+            try:
+                with open(stored, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                with open(path, 'rb') as f:
+                    original = f.read()
+                data = optimize_image(original, self.max_width)
+                # Nothing to keep when the original is already the best version
+                if data is not original:
+                    self._store(stored, data)
+            image = EncodedImage(os.path.basename(path), IMAGE_TYPES.get(extension, 'application/octet-stream'),
+                                 data, digest)
+            self._images[digest] = image
+            return image
+
+    def _store(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def precompute(self, paths=None):
+        """Build and encode every image (all of Images/ by default); returns the EncodedImages"""
+        if paths is None:
+            paths = image_paths()
+        images = []
+        for path in paths:
+            image = self.get(path)
+            image.mime_base64  # encode now so every later user shares it
+            images.append(image)
+        return images
+
+
+def slug(name):
+    """URL-safe stem for a variant file name"""
+    return re.sub(r'[^a-z0-9]+', '-', os.path.splitext(name)[0].lower()).strip('-')
+
+
+def variant_widths(source_width, widths):
+    """The requested widths below the source's, plus the source width itself when it is smaller than the largest"""
+    chosen = [width for width in widths if width < source_width]
+    if source_width <= max(widths) and source_width not in chosen:
+        chosen.append(source_width)
+    return chosen or [max(widths)]
+
+
+def _encode(image, width, image_format):
+    if image.width != width:
+        image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+    out = io.BytesIO()
+    options = dict(RESPONSIVE_FORMATS[image_format])
+    image.save(out, options.pop('format'), **options)
+    return out.getvalue()
+
+
+def load_manifest(out_dir=RESPONSIVE_DIR):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'version': RESPONSIVE_VERSION, 'images': {}}
+    if manifest.get('version') != RESPONSIVE_VERSION:
+        manifest['images'] = {}
+    return manifest
+
+
+def build_responsive(paths, out_dir=RESPONSIVE_DIR, widths=RESPONSIVE_WIDTHS, thumbnail=THUMBNAIL_WIDTH):
+    """
+    Write AVIF/WebP variants of each image (and a WebP thumbnail) to out_dir
+    and update its manifest. Returns (built, skipped) source names.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to build responsive images: pip install pillow")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    images = manifest['images']
+    prefix = os.path.relpath(out_dir, os.path.dirname(out_dir)).replace(os.sep, '/')
+    built, skipped = [], []
+
+    for path in paths:
+        name = os.path.basename(path)
+        digest = asset_cache.digest(path)
+        entry = images.get(name)
+        outputs = [] if entry is None else [item['path'] for fmt in RESPONSIVE_FORMATS for item in entry[fmt]]
+        if entry is not None and entry.get('thumbnail'):
+            outputs.append(entry['thumbnail'])
+        if entry is not None and entry['digest'] == digest and all(
+                os.path.exists(os.path.join(os.path.dirname(out_dir), output)) for output in outputs):
+            skipped.append(name)
+            continue
+
+        with Image.open(path) as source:
+            source.load()
+            if source.mode not in ('RGB', 'RGBA'):
+                source = source.convert('RGBA' if 'A' in source.getbands() else 'RGB')
+            entry = {'digest': digest, 'width': source.width, 'height': source.height}
+            for image_format in RESPONSIVE_FORMATS:
+                entry[image_format] = []
+                for width in variant_widths(source.width, widths):
+                    file_name = f"{slug(name)}-{width}.{image_format}"
+                    with open(os.path.join(out_dir, file_name), 'wb') as f:
+                        f.write(_encode(source, width, image_format))
+                    entry[image_format].append({'width': width, 'path': f"{prefix}/{file_name}"})
+            if thumbnail:
+                file_name = f"{slug(name)}-thumb.webp"
+                with open(os.path.join(out_dir, file_name), 'wb') as f:
+                    f.write(_encode(source, min(thumbnail, source.width), 'webp'))
+                entry['thumbnail'] = f"{prefix}/{file_name}"
+        images[name] = entry
+        built.append(name)
+
+    # Drop variants of images that are gone or were rebuilt at other widths
+    current = {os.path.basename(item['path']) for entry in images.values() for fmt in RESPONSIVE_FORMATS
+               for item in entry[fmt]} | {os.path.basename(entry['thumbnail'])
+                                          for entry in images.values() if entry.get('thumbnail')}
+    for file_name in os.listdir(out_dir):
+        if file_name != MANIFEST_NAME and file_name not in current and file_name.endswith(tuple(RESPONSIVE_FORMATS)):
+            os.remove(os.path.join(out_dir, file_name))
+
+    manifest['version'] = RESPONSIVE_VERSION
+    with open(os.path.join(out_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, sort_keys=True)
+    return built, skipped
+
+
+def srcset(entry, image_format):
+    """srcset attribute value for one format of a manifest entry"""
+    return ", ".join(f"{item['path']} {item['width']}w" for item in entry[image_format])
+
+
+def image_paths(folder=IMAGES_DIR):
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder)
+                  if os.path.splitext(name)[1].lower() in IMAGE_TYPES)
+
+
+asset_cache = AssetCache(os.environ.get('ZAMP_ASSET_CACHE_DIR', os.path.join(ROOT, '.asset_cache')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute the email-ready versions of the zAmp images")
+    parser.add_argument('paths', nargs='*', help="Images to process (default: everything in Images/)")
+    parser.add_argument('--responsive', action='store_true',
+                        help="Build the AVIF/WebP variants and manifest in Images/responsive/ and for the logo")
+    args = parser.parse_args(argv)
+
+    if args.responsive:
+        started = time.perf_counter()
+        built, skipped = build_responsive(args.paths or image_paths())
+        logo_built, _ = build_responsive([LOGO], os.path.join(ASSETS_DIR, 'responsive'), LOGO_WIDTHS, thumbnail=None)
+        for name in built + logo_built:
+            print(f"Built {name}")
+        print(f"{len(built) + len(logo_built)} built, {len(skipped)} unchanged in "
+              f"{time.perf_counter() - started:.1f}s")
+        return 0
+
+    if Image is None:
+        print("Pillow is not installed; images are cached without resizing or recompression.")
+    started = time.perf_counter()
+    for image in asset_cache.precompute(args.paths or None):
+        print(f"{image.digest[:12]}  {len(image.data):>9,} bytes  {image.name}")
+    print(f"Done in {(time.perf_counter() - started) * 1000:.0f} ms; cache: {asset_cache.directory}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
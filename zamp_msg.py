@@ -0,0 +1,235 @@
+"""
+Minimal Outlook .msg writer (MS-OXMSG) for draft email templates.
+
+A .msg file is an OLE compound file (MS-CFB): a small FAT file system whose
+storages and streams hold MAPI properties. write_msg() produces an unsent
+message with a subject, plain-text and HTML bodies and attachments (inline
+when they have a content ID, referenced from the HTML as cid:<id>), which is
+all a template needs; recipients are left for the sender to fill in.
+
+Streams under 4 KiB go to the mini stream as the format requires; the
+directory tree is built balanced with every node black, which MS-CFB allows.
+Files are limited to what 109 FAT sectors address (about 7 MB).
+"""
+import struct
+
+SECTOR = 512
+MINI_SECTOR = 64
+MINI_CUTOFF = 4096
+FREESECT = 0xFFFFFFFF
+ENDOFCHAIN = 0xFFFFFFFE
+FATSECT = 0xFFFFFFFD
+NOSTREAM = 0xFFFFFFFF
+MAX_HEADER_FAT_SECTORS = 109
+
+STORAGE = 1
+STREAM = 2
+ROOT = 5
+
+# MAPI property types
+PT_LONG = 0x0003
+PT_BOOLEAN = 0x000B
+PT_UNICODE = 0x001F
+PT_BINARY = 0x0102
+
+PROPATTR_READABLE_WRITABLE = 0x6
+MSGFLAG_UNSENT = 0x8
+STORE_UNICODE_OK = 0x00040000
+ATTACH_BY_VALUE = 1
+ATT_MHTML_REF = 0x4
+CP_UTF8 = 65001
+
+
+class _Entry:
+    def __init__(self, name, kind, data=b''):
+        self.name = name
+        self.kind = kind
+        self.data = data
+        self.children = []
+        self.left = self.right = self.child = NOSTREAM
+        self.start = ENDOFCHAIN
+        self.size = len(data)
+        self.index = None
+
+    def add(self, entry):
+        self.children.append(entry)
+        return entry
+
+
+def _sort_key(entry):
+    # CFB orders siblings by name length first, then by upper-cased UTF-16 code units
+    return len(entry.name), entry.name.upper()
+
+
+def _link_tree(children):
+    """Balanced binary search tree over sorted siblings; returns the root index"""
+    if not children:
+        return NOSTREAM
+    middle = len(children) // 2
+    node = children[middle]
+    node.left = _link_tree(children[:middle])
+    node.right = _link_tree(children[middle + 1:])
+    return node.index
+
+
+def _chain(fat, first, count):
+    for i in range(count):
+        fat[first + i] = first + i + 1 if i < count - 1 else ENDOFCHAIN
+
+
+def write_compound_file(path, root):
+    """Write a tree of _Entry storages/streams as a version 3 compound file"""
+    entries = []
+
+    def number(entry):
+        entry.index = len(entries)
+        entries.append(entry)
+        for child in entry.children:
+            number(child)
+
+    number(root)
+    for entry in entries:
+        entry.children.sort(key=_sort_key)
+        entry.child = _link_tree(entry.children)
+
+    streams = [entry for entry in entries if entry.kind == STREAM]
+    large = [entry for entry in streams if entry.size >= MINI_CUTOFF]
+    small = [entry for entry in streams if 0 < entry.size < MINI_CUTOFF]
+
+    # Mini stream: small streams packed in 64-byte mini sectors
+    mini_fat = []
+    mini_stream = bytearray()
+    for entry in small:
+        count = -(-entry.size // MINI_SECTOR)
+        entry.start = len(mini_fat)
+        mini_fat.extend(range(entry.start + 1, entry.start + count + 1))
+        mini_fat[-1] = ENDOFCHAIN
+        mini_stream += entry.data.ljust(count * MINI_SECTOR, b'\0')
+
+    # Regular sectors: large streams, mini stream, mini FAT, directory, then the FAT itself
+    blocks = []  # (owner, bytes) laid out in order
+    for entry in large:
+        blocks.append((entry, entry.data))
+    blocks.append((root, bytes(mini_stream)))
+    mini_fat_bytes = struct.pack(f'<{len(mini_fat)}I', *mini_fat) if mini_fat else b''
+    blocks.append(('minifat', mini_fat_bytes))
+    directory = bytearray()
+    blocks.append(('directory', None))
+
+    directory_sectors = -(-max(len(entries), 1) * 128 // SECTOR)
+    data_sectors = sum(-(-len(data) // SECTOR) for _owner, data in blocks if data is not None) + directory_sectors
+    fat_sectors = 1
+    while fat_sectors * (SECTOR // 4) < data_sectors + fat_sectors:
+        fat_sectors += 1
+    if fat_sectors > MAX_HEADER_FAT_SECTORS:
+        raise ValueError("Message too large for a compound file without DIFAT sectors")
+
+    fat = [FREESECT] * (fat_sectors * (SECTOR // 4))
+    next_sector = 0
+    starts = {}
+    for owner, data in blocks:
+        count = directory_sectors if data is None else -(-len(data) // SECTOR)
+        if count:
+            _chain(fat, next_sector, count)
+            starts[owner if isinstance(owner, str) else id(owner)] = next_sector
+            next_sector += count
+    fat_start = next_sector
+    for i in range(fat_sectors):
+        fat[fat_start + i] = FATSECT
+
+    for entry in large:
+        entry.start = starts[id(entry)]
+    root.start = starts.get(id(root), ENDOFCHAIN)
+    root.size = len(mini_stream)
+
+    for entry in entries + [None] * (directory_sectors * 4 - len(entries)):
+        if entry is None:
+            directory += b'\0' * 64 + struct.pack('<HBBIII', 0, 0, 0, NOSTREAM, NOSTREAM, NOSTREAM) + b'\0' * 36 + struct.pack('<IQ', 0, 0)
+            continue
+        name = entry.name.encode('utf-16-le')
+        if len(name) > 62:
+            raise ValueError(f"Compound file name too long: {entry.name}")
+        directory += name.ljust(64, b'\0')
+        directory += struct.pack('<HBBIII', len(name) + 2, entry.kind, 1, entry.left, entry.right, entry.child)
+        directory += b'\0' * 16 + struct.pack('<I', 0) + b'\0' * 16
+        directory += struct.pack('<IQ', entry.start if entry.kind != STORAGE else 0, entry.size if entry.kind != STORAGE else 0)
+
+    header = bytearray(SECTOR)
+    header[0:8] = bytes.fromhex('D0CF11E0A1B11AE1')
+    struct.pack_into('<HHHHH', header, 24, 0x003E, 3, 0xFFFE, 9, 6)
+    struct.pack_into('<IIIIIIIII', header, 40, 0, fat_sectors, starts['directory'], 0, MINI_CUTOFF,
+                     starts['minifat'] if mini_fat else ENDOFCHAIN, -(-len(mini_fat_bytes) // SECTOR),
+                     ENDOFCHAIN, 0)
+    difat = list(range(fat_start, fat_start + fat_sectors)) + [FREESECT] * (MAX_HEADER_FAT_SECTORS - fat_sectors)
+    struct.pack_into(f'<{MAX_HEADER_FAT_SECTORS}I', header, 76, *difat)
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        for owner, data in blocks:
+            if data is None:
+                data = bytes(directory)
+            if data:
+                f.write(data.ljust(-(-len(data) // SECTOR) * SECTOR, b'\0'))
+        f.write(struct.pack(f'<{len(fat)}I', *fat))
+
+
+def _properties(storage, properties, header):
+    """Add a __properties_version1.0 stream plus __substg1.0_ streams for variable-size values"""
+    table = bytearray(header)
+    for prop_id, prop_type, value in properties:
+        tag = (prop_id << 16) | prop_type
+        if prop_type in (PT_UNICODE, PT_BINARY):
+            data = value.encode('utf-16-le') if prop_type == PT_UNICODE else bytes(value)
+            storage.add(_Entry(f'__substg1.0_{tag:08X}', STREAM, data))
+            size = len(data) + 2 if prop_type == PT_UNICODE else len(data)
+            table += struct.pack('<IIII', tag, PROPATTR_READABLE_WRITABLE, size, 0)
+        else:
+            table += struct.pack('<IIQ', tag, PROPATTR_READABLE_WRITABLE, int(value))
+    storage.add(_Entry('__properties_version1.0', STREAM, bytes(table)))
+
+
+def write_msg(path, subject, html, text="", attachments=()):
+    """
+    Write an unsent Outlook message. attachments are (filename, mime_type,
+    data, content_id) tuples; content_id may be None for a regular attachment.
+    """
+    root = _Entry('Root Entry', ROOT)
+    nameid = root.add(_Entry('__nameid_version1.0', STORAGE))
+    for stream in ('__substg1.0_00020102', '__substg1.0_00030102', '__substg1.0_00040102'):
+        nameid.add(_Entry(stream, STREAM))
+
+    message = [
+        (0x001A, PT_UNICODE, 'IPM.Note'),
+        (0x0037, PT_UNICODE, subject),
+        (0x0E1D, PT_UNICODE, subject),
+        (0x1000, PT_UNICODE, text),
+        (0x1013, PT_BINARY, html.encode('utf-8')),
+        (0x3FDE, PT_LONG, CP_UTF8),
+        (0x0E07, PT_LONG, MSGFLAG_UNSENT),
+        (0x340D, PT_LONG, STORE_UNICODE_OK),
+        (0x0E1B, PT_BOOLEAN, bool(attachments)),
+    ]
+    attachments = list(attachments)
+    _properties(root, message, struct.pack('<8xIIII8x', 0, len(attachments), 0, len(attachments)))
+
+    for number, (filename, mime_type, data, content_id) in enumerate(attachments):
+        storage = root.add(_Entry(f'__attach_version1.0_#{number:08X}', STORAGE))
+        properties = [
+            (0x0E21, PT_LONG, number),
+            (0x3705, PT_LONG, ATTACH_BY_VALUE),
+            (0x3701, PT_BINARY, data),
+            (0x3001, PT_UNICODE, filename),
+            (0x3707, PT_UNICODE, filename),
+            (0x3704, PT_UNICODE, filename),
+            (0x370E, PT_UNICODE, mime_type),
+            (0x370B, PT_LONG, FREESECT),
+        ]
+        if content_id:
+            properties += [
+                (0x3712, PT_UNICODE, content_id),
+                (0x3714, PT_LONG, ATT_MHTML_REF),
+                (0x7FFE, PT_BOOLEAN, True),
+            ]
+        _properties(storage, properties, b'\0' * 8)
+
+    write_compound_file(path, root)
@@ -0,0 +1,281 @@
+"""
+Render zAmp exchange packets from the submitted form fields.
+
+The Technician and Approver Submit buttons download the form as an
+interactive HTML clone, which the later MicroPCB repair step fills in.
+When the form is served by zamp_server.py they also post the filled in
+fields as JSON and download the file that comes back alongside the clone:
+a print-friendly HTML checklist for the technician, and a text PDF
+(zamp_pdf.py) for approval. Both come from templates compiled once at
+import, so a packet renders in milliseconds. The JSON looks like:
+
+    {"title": "zAmp Checklist: 12345 | zAmp# 678 | TS901",
+     "filename": "zAmp_Checklist_12345_zAmp678_TS901",
+     "sections": [{"title": "CLIENT INFORMATION",
+                   "fields": [{"group": "", "label": "Full Name", "value": "Jane Doe"}]}],
+     "images": [{"caption": "Image 1", "src": "data:image/jpeg;base64,..."}]}
+
+Usage:
+    python zamp_packet.py packet.json                  # writes packet.html and packet.pdf
+    python zamp_packet.py packet.json --html out.html --pdf out.pdf
+"""
+import argparse
+import base64
+import binascii
+import io
+import json
+import os
+import re
+import time
+from html import escape
+from string import Template
+
+from zamp_pdf import TextPdf
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+TECHNICIAN_TITLE = "zAmp Checklist"
+APPROVAL_TITLE = "zAmp Exchange Approval"
+DEFAULT_FILENAME = "zAmp_Checklist"
+IMAGE_TYPES = ('image/png', 'image/jpeg', 'image/gif', 'image/webp')
+JPEG_QUALITY = 85
+MAX_IMAGES = 12
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1">
+    <title>$title</title>
+    <style>
+        body { margin: 0; padding: 24px; background: #f5f5f5; color: #1f2937; font: 10pt/1.4 Arial, Helvetica, sans-serif; }
+        main { max-width: 900px; margin: 0 auto; background: #fff; padding: 24px 32px; }
+        header { background: #18325B; color: #fff; padding: 16px 20px; margin-bottom: 24px; }
+        header h1 { margin: 0; font-size: 16pt; }
+        header p { margin: 4px 0 0; }
+        h2 { color: #18325B; font-size: 12pt; border-bottom: 2px solid #18325B; padding-bottom: 4px; margin: 28px 0 8px; }
+        h3 { font-size: 10pt; margin: 16px 0 4px; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { text-align: left; vertical-align: top; padding: 5px 8px; border-bottom: 1px solid #E6E7E8; }
+        th { width: 40%; color: #4b5563; font-weight: normal; }
+        td { font-weight: bold; white-space: pre-wrap; }
+        .images { display: grid; grid-template-columns: repeat(2, 1fr); gap: 24px; }
+        figure { margin: 0; text-align: center; }
+        figure img { max-width: 100%; max-height: 420px; border: 1px solid #919396; }
+        figcaption { margin-top: 6px; font-size: 9pt; color: #64748b; font-weight: bold; }
+        @media print {
+            body { background: #fff; padding: 0; }
+            main { padding: 0; }
+            section { break-inside: avoid-page; }
+            figure { break-inside: avoid; }
+        }
+    </style>
+</head>
+<body>
+<main>
+    <header>
+        <h1>$title</h1>
+        <p>$subtitle</p>
+    </header>
+$sections
+</main>
+</body>
+</html>
+""")
+SECTION_TEMPLATE = Template("""    <section>
+        <h2>$title</h2>
+$groups
+    </section>
+""")
+GROUP_TEMPLATE = Template("""        $heading<table>
+$rows
+        </table>
+""")
+ROW_TEMPLATE = Template("""            <tr><th>$label</th><td>$value</td></tr>""")
+FIGURE_TEMPLATE = Template("""            <figure><img src="$src" alt="$caption"><figcaption>$caption</figcaption></figure>""")
+IMAGES_TEMPLATE = Template("""    <section>
+        <h2>IMAGES</h2>
+        <div class="images">
+$figures
+        </div>
+    </section>
+""")
+
+
+class PacketError(ValueError):
+    """The submitted packet JSON is malformed"""
+
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def parse_packet(body):
+    """Validate and normalise the JSON sent by the form"""
+    try:
+        packet = json.loads(body)
+    except (UnicodeDecodeError, ValueError) as e:
+        raise PacketError(f"Invalid JSON: {e}") from None
+    if not isinstance(packet, dict) or not isinstance(packet.get('sections'), list):
+        raise PacketError("Packet needs a 'sections' list")
+
+    sections = []
+    for section in packet['sections']:
+        if not isinstance(section, dict) or not isinstance(section.get('fields', []), list):
+            raise PacketError("Each section needs a title and a 'fields' list")
+        fields = [{'group': _text(field.get('group')), 'label': _text(field.get('label')),
+                   'value': _text(field.get('value'))}
+                  for field in section.get('fields', []) if isinstance(field, dict)]
+        sections.append({'title': _text(section.get('title')), 'fields': fields})
+
+    images = packet.get('images') or []
+    if not isinstance(images, list) or len(images) > MAX_IMAGES:
+        raise PacketError(f"'images' must be a list of at most {MAX_IMAGES} images")
+    decoded = []
+    for number, image in enumerate(images, 1):
+        if not isinstance(image, dict):
+            raise PacketError("Each image needs a 'src' data URL")
+        mime_type, data = decode_data_url(_text(image.get('src')))
+        decoded.append({'caption': _text(image.get('caption')) or f"Image {number}",
+                        'mime_type': mime_type, 'data': data})
+
+    return {
+        'title': _text(packet.get('title')),
+        'subtitle': _text(packet.get('subtitle')),
+        'filename': _text(packet.get('filename')),
+        'sections': sections,
+        'images': decoded,
+    }
+
+
+def decode_data_url(src):
+    """(mime_type, bytes) for a base64 data: URL of a supported image type"""
+    header, sep, payload = src.partition(',')
+    mime_type = header[len('data:'):].split(';')[0].lower()
+    if not sep or not header.startswith('data:') or not header.endswith(';base64') or mime_type not in IMAGE_TYPES:
+        raise PacketError("Images must be base64 data: URLs of PNG, JPEG, GIF or WebP files")
+    try:
+        return mime_type, base64.b64decode(payload, validate=True)
+    except binascii.Error:
+        raise PacketError("Image data is not valid base64") from None
+
+
+def safe_filename(name, extension):
+    """name reduced to letters, digits, '_', '-' and '.', with the given extension"""
+    stem = re.sub(r'[^A-Za-z0-9_.-]', '_', os.path.splitext(os.path.basename(name))[0]).strip('._')
+    return f"{stem or DEFAULT_FILENAME}{extension}"
+
+
+def _groups(fields):
+    """Consecutive fields sharing a group, as (group, fields) pairs"""
+    groups = []
+    for field in fields:
+        if not groups or groups[-1][0] != field['group']:
+            groups.append((field['group'], []))
+        groups[-1][1].append(field)
+    return groups
+
+
+def render_technician_html(packet):
+    """Standalone HTML checklist with every section and the uploaded images inline"""
+    sections = []
+    for section in packet['sections']:
+        if not section['fields']:
+            continue
+        groups = "".join(GROUP_TEMPLATE.substitute(
+            heading=f"<h3>{escape(group)}</h3>\n        " if group else "",
+            rows="\n".join(ROW_TEMPLATE.substitute(label=escape(field['label']), value=escape(field['value']))
+                           for field in fields))
+            for group, fields in _groups(section['fields']))
+        sections.append(SECTION_TEMPLATE.substitute(title=escape(section['title']), groups=groups.rstrip('\n')))
+    if packet['images']:
+        figures = "\n".join(FIGURE_TEMPLATE.substitute(
+            src=f"data:{image['mime_type']};base64,{base64.b64encode(image['data']).decode('ascii')}",
+            caption=escape(image['caption'])) for image in packet['images'])
+        sections.append(IMAGES_TEMPLATE.substitute(figures=figures))
+    return PAGE_TEMPLATE.substitute(
+        title=escape(packet['title'] or TECHNICIAN_TITLE),
+        subtitle=escape(packet['subtitle']),
+        sections="".join(sections).rstrip('\n'),
+    ).encode('utf-8')
+
+
+def _jpeg(data):
+    """JPEG copy of an image the PDF can't embed as it is; None without Pillow or when it can't be read"""
+    if Image is None:
+        return None
+    try:
+        return _convert_jpeg(data)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+
+
+def _convert_jpeg(data):
+    with Image.open(io.BytesIO(data)) as image:
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        return out.getvalue()
+
+
+def render_approval_pdf(packet):
+    """Text PDF of every section, followed by the uploaded images"""
+    pdf = TextPdf(packet['title'] or APPROVAL_TITLE, packet['subtitle'])
+    for section in packet['sections']:
+        if not section['fields']:
+            continue
+        pdf.heading(section['title'])
+        for group, fields in _groups(section['fields']):
+            if group:
+                pdf.subheading(group)
+            for field in fields:
+                pdf.field(field['label'], field['value'])
+    if packet['images']:
+        pdf.heading("IMAGES")
+        for image in packet['images']:
+            if pdf.image(image['data'], image['caption']):
+                continue
+            converted = _jpeg(image['data'])
+            if converted is None or not pdf.image(converted, image['caption']):
+                pdf.paragraph(f"{image['caption']}: {image['mime_type']} image not embedded, see the technician HTML")
+    return pdf.to_bytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a zAmp packet JSON as technician HTML and approval PDF")
+    parser.add_argument('packet', help="Packet JSON as posted by the form")
+    parser.add_argument('--html', help="HTML output (default: next to the JSON)")
+    parser.add_argument('--pdf', help="PDF output (default: next to the JSON)")
+    args = parser.parse_args(argv)
+
+    with open(args.packet, 'rb') as f:
+        body = f.read()
+    base = os.path.splitext(args.packet)[0]
+    started = time.perf_counter()
+    try:
+        packet = parse_packet(body)
+    except PacketError as e:
+        print(f"Error: {e}")
+        return 1
+    outputs = ((args.html or base + '.html', render_technician_html(packet)),
+               (args.pdf or base + '.pdf', render_approval_pdf(packet)))
+    elapsed = (time.perf_counter() - started) * 1000
+    for path, data in outputs:
+        with open(path, 'wb') as f:
+            f.write(data)
+        print(f"Wrote {path} ({len(data) / 1024:.1f} KB)")
+    print(f"Rendered in {elapsed:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
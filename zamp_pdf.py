@@ -0,0 +1,328 @@
+"""
+Minimal text PDF writer for the zAmp exchange packets.
+
+Pages are built from PDF text operators in the standard Helvetica and
+Helvetica-Bold fonts (WinAnsi encoding), which every viewer has, so nothing
+is rasterized or embedded: a checklist packet is a few kilobytes and takes
+milliseconds to write. Lines are wrapped with the Helvetica metrics below.
+JPEG photos and plain 8-bit RGB/grayscale PNGs are embedded as they are
+(DCTDecode, or FlateDecode with the PNG predictor), without decoding them.
+
+    pdf = TextPdf("zAmp Checklist")
+    pdf.heading("CLIENT INFORMATION")
+    pdf.field("Full Name", "Jane Doe")
+    pdf.image(jpeg_bytes, "Image 1")
+    data = pdf.to_bytes()
+"""
+import struct
+import time
+import zlib
+
+PAGE_WIDTH = 612   # US Letter, in points
+PAGE_HEIGHT = 792
+MARGIN = 48
+FOOTER_HEIGHT = 24
+LABEL_WIDTH = 220
+LINE_SPACING = 1.3
+FONT_SIZE = 9.5
+HEADING_SIZE = 11
+TITLE_SIZE = 15
+GAP = 4
+
+HEADER_COLOR = (0x18 / 255, 0x32 / 255, 0x5B / 255)  # #18325B, the form's header colour
+RULE_GRAY = 0.85
+MUTED_GRAY = 0.35
+
+REGULAR = 'F1'
+BOLD = 'F2'
+FONTS = {REGULAR: 'Helvetica', BOLD: 'Helvetica-Bold'}
+
+# Advance widths (1/1000 em) for WinAnsi codes 32-126 from the Adobe AFM files;
+# everything else is measured as DEFAULT_WIDTH, close enough for accented letters
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+DEFAULT_WIDTH = 556
+WIDTHS = {
+    REGULAR: [DEFAULT_WIDTH] * 32 + list(_HELVETICA) + [DEFAULT_WIDTH] * 129,
+    BOLD: [DEFAULT_WIDTH] * 32 + list(_HELVETICA_BOLD) + [DEFAULT_WIDTH] * 129,
+}
+
+
+def encode(text):
+    """Text as WinAnsi bytes; characters outside it become '?'"""
+    return str(text).replace('\t', ' ').encode('cp1252', 'replace')
+
+
+def text_width(data, font=REGULAR, size=FONT_SIZE):
+    widths = WIDTHS[font]
+    return sum(widths[byte] for byte in data) * size / 1000
+
+
+def wrap(text, width, font=REGULAR, size=FONT_SIZE):
+    """WinAnsi-encoded lines no wider than width; long words are broken"""
+    lines = []
+    for paragraph in encode(text).split(b'\n'):
+        line = b''
+        for word in paragraph.split(b' '):
+            candidate = line + b' ' + word if line else word
+            if text_width(candidate, font, size) <= width:
+                line = candidate
+                continue
+            if line:
+                lines.append(line)
+            while text_width(word, font, size) > width:
+                cut = len(word) - 1
+                while cut > 1 and text_width(word[:cut], font, size) > width:
+                    cut -= 1
+                lines.append(word[:cut])
+                word = word[cut:]
+            line = word
+        lines.append(line)
+    return lines
+
+
+def _literal(data):
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)').replace(b'\r', b'') + b')'
+
+
+def _jpeg_image(data):
+    """XObject dictionary entries for a baseline or progressive JPEG, or None"""
+    position = 2
+    while position + 9 < len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            position += 2
+            continue
+        length = struct.unpack('>H', data[position + 2:position + 4])[0]
+        if marker in (0xC0, 0xC1, 0xC2):
+            bits, height, width, components = struct.unpack('>BHHB', data[position + 4:position + 10])
+            colorspace = {1: '/DeviceGray', 3: '/DeviceRGB', 4: '/DeviceCMYK'}.get(components)
+            if colorspace is None or bits != 8:
+                return None
+            entries = f'/Width {width} /Height {height} /ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode'
+            if components == 4:
+                # Adobe writes CMYK JPEGs inverted
+                entries += ' /Decode [1 0 1 0 1 0 1 0]'
+            return width, height, entries, data
+        position += 2 + length
+    return None
+
+
+def _png_image(data):
+    """XObject entries for a non-interlaced 8-bit gray or RGB PNG (the IDAT data is reused as is), or None"""
+    if data[:8] != b'\x89PNG\r\n\x1a\n':
+        return None
+    position = 8
+    header = None
+    idat = []
+    while position + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[position:position + 8])
+        chunk = data[position + 8:position + 8 + length]
+        if kind == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif kind == b'IDAT':
+            idat.append(chunk)
+        elif kind == b'IEND':
+            break
+        position += 12 + length
+    if header is None or not idat:
+        return None
+    width, height, bits, color_type, _compression, _filter, interlace = header
+    colors = {0: 1, 2: 3}.get(color_type)
+    if colors is None or bits != 8 or interlace:
+        return None
+    entries = (f'/Width {width} /Height {height} /ColorSpace /{"DeviceGray" if colors == 1 else "DeviceRGB"} '
+               f'/BitsPerComponent 8 /Filter /FlateDecode '
+               f'/DecodeParms << /Predictor 15 /Colors {colors} /BitsPerComponent 8 /Columns {width} >>')
+    return width, height, entries, b''.join(idat)
+
+
+def image_info(data):
+    """(width, height, dictionary entries, stream) when the image can be embedded without decoding, else None"""
+    try:
+        if data[:2] == b'\xff\xd8':
+            return _jpeg_image(data)
+        return _png_image(data)
+    except struct.error:
+        # Truncated headers
+        return None
+
+
+class TextPdf:
+    """A document laid out top to bottom: a title, section headings, label/value rows, text and images"""
+
+    def __init__(self, title, subtitle=''):
+        self.title = title
+        self.pages = []
+        self.images = []
+        self._ops = None
+        self._y = 0
+        self._page_title(title, subtitle)
+
+    # -- layout
+
+    def _new_page(self):
+        self._ops = []
+        self.pages.append(self._ops)
+        self._y = PAGE_HEIGHT - MARGIN
+
+    def _ensure(self, height):
+        if self._y - height < MARGIN + FOOTER_HEIGHT:
+            self._new_page()
+
+    def _text(self, x, y, data, font=REGULAR, size=FONT_SIZE):
+        self._ops.append(b'BT /%s %g Tf %.2f %.2f Td %s Tj ET' % (font.encode(), size, x, y, _literal(data)))
+
+    def _page_title(self, title, subtitle):
+        self._new_page()
+        band = TITLE_SIZE * 2.6 + (FONT_SIZE * LINE_SPACING if subtitle else 0)
+        self._ops.append(b'%.3f %.3f %.3f rg %d %.2f %d %.2f re f' % (
+            *HEADER_COLOR, MARGIN, self._y - band, PAGE_WIDTH - 2 * MARGIN, band))
+        self._ops.append(b'1 g')
+        self._text(MARGIN + 12, self._y - TITLE_SIZE * 1.6, encode(title), BOLD, TITLE_SIZE)
+        if subtitle:
+            self._text(MARGIN + 12, self._y - TITLE_SIZE * 1.6 - FONT_SIZE * LINE_SPACING - 2, encode(subtitle))
+        self._ops.append(b'0 g')
+        self._y -= band + GAP * 3
+
+    def heading(self, text):
+        """Section heading with a rule under it; starts a new page when near the bottom"""
+        self._ensure(HEADING_SIZE * 4)
+        self._y -= HEADING_SIZE * 1.4
+        self._ops.append(b'%.3f %.3f %.3f rg' % HEADER_COLOR)
+        self._text(MARGIN, self._y, encode(text), BOLD, HEADING_SIZE)
+        self._ops.append(b'0 g %.3f %.3f %.3f RG 1 w %d %.2f m %d %.2f l S 0 G' % (
+            *HEADER_COLOR, MARGIN, self._y - 4, PAGE_WIDTH - MARGIN, self._y - 4))
+        self._y -= HEADING_SIZE * 0.6 + GAP * 2
+
+    def subheading(self, text):
+        self._ensure(FONT_SIZE * 3)
+        self._y -= FONT_SIZE * LINE_SPACING + GAP
+        self._text(MARGIN, self._y, encode(text), BOLD, FONT_SIZE)
+        self._y -= GAP
+
+    def field(self, label, value):
+        """Label on the left, value wrapped in the column on the right, with a light rule below"""
+        value_x = MARGIN + LABEL_WIDTH + 12
+        label_lines = wrap(label, LABEL_WIDTH)
+        value_lines = wrap(value, PAGE_WIDTH - MARGIN - value_x, BOLD) if value else [b'-']
+        leading = FONT_SIZE * LINE_SPACING
+        rows = max(len(label_lines), len(value_lines))
+        # Keep a row on one page when it fits; taller values continue line by line on the next
+        if rows * leading + GAP <= PAGE_HEIGHT - 2 * MARGIN - FOOTER_HEIGHT:
+            self._ensure(rows * leading + GAP)
+        for i in range(rows):
+            self._ensure(leading + GAP)
+            self._y -= leading
+            if i < len(label_lines):
+                self._ops.append(b'%g g' % MUTED_GRAY)
+                self._text(MARGIN, self._y + 2, label_lines[i])
+                self._ops.append(b'0 g')
+            if i < len(value_lines):
+                self._text(value_x, self._y + 2, value_lines[i], BOLD)
+        self._y -= GAP
+        self._ops.append(b'%g G 0.5 w %d %.2f m %d %.2f l S 0 G' % (
+            RULE_GRAY, MARGIN, self._y + GAP / 2, PAGE_WIDTH - MARGIN, self._y + GAP / 2))
+
+    def paragraph(self, text, font=REGULAR):
+        leading = FONT_SIZE * LINE_SPACING
+        for line in wrap(text, PAGE_WIDTH - 2 * MARGIN, font):
+            self._ensure(leading)
+            self._y -= leading
+            self._text(MARGIN, self._y + 2, line, font)
+        self._y -= GAP
+
+    def image(self, data, caption=''):
+        """Embed a JPEG or simple PNG scaled to the text width; returns False when the format isn't supported"""
+        info = image_info(data)
+        if info is None:
+            return False
+        width, height, entries, stream = info
+        scale = min(1.0, (PAGE_WIDTH - 2 * MARGIN) / width,
+                    (PAGE_HEIGHT - 2 * MARGIN - FOOTER_HEIGHT - FONT_SIZE * 3) / height)
+        shown_width, shown_height = width * scale, height * scale
+        caption_height = FONT_SIZE * LINE_SPACING + GAP if caption else 0
+        self._ensure(shown_height + caption_height + GAP * 2)
+        if caption:
+            self._y -= FONT_SIZE * LINE_SPACING
+            self._text(MARGIN, self._y + 2, encode(caption), BOLD)
+            self._y -= GAP
+        name = f'Im{len(self.images) + 1}'
+        self.images.append((name, entries, stream, len(self.pages) - 1))
+        self._y -= shown_height
+        self._ops.append(b'q %.2f 0 0 %.2f %d %.2f cm /%s Do Q' % (
+            shown_width, shown_height, MARGIN, self._y, name.encode()))
+        self._y -= GAP * 3
+        return True
+
+    # -- output
+
+    def _footer(self, number):
+        label = encode(f'Page {number} of {len(self.pages)}')
+        ops = [b'%g g' % MUTED_GRAY]
+        y = MARGIN - 4
+        ops.append(b'BT /%s 8 Tf %d %d Td %s Tj ET' % (REGULAR.encode(), MARGIN, y, _literal(encode(self.title))))
+        ops.append(b'BT /%s 8 Tf %.2f %d Td %s Tj ET' % (
+            REGULAR.encode(), PAGE_WIDTH - MARGIN - text_width(label, REGULAR, 8), y, _literal(label)))
+        return ops
+
+    def to_bytes(self):
+        objects = []  # bodies, object n at index n - 1
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        def stream(entries, data):
+            return b'<< %s /Length %d >>\nstream\n%s\nendstream' % (entries, len(data), data)
+
+        catalog = add(None)
+        pages = add(None)
+        fonts = {name: add(b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>'
+                           % base.encode()) for name, base in FONTS.items()}
+        font_resources = b' '.join(b'/%s %d 0 R' % (name.encode(), ref) for name, ref in fonts.items())
+        page_images = [[] for _page in self.pages]
+        for name, entries, data, page in self.images:
+            ref = add(stream(b'/Type /XObject /Subtype /Image ' + entries.encode(), data))
+            page_images[page].append(b'/%s %d 0 R' % (name.encode(), ref))
+
+        kids = []
+        for number, ops in enumerate(self.pages, 1):
+            resources = b'<< /Font << %s >> /XObject << %s >> >>' % (font_resources, b' '.join(page_images[number - 1]))
+            content = zlib.compress(b'\n'.join(ops + self._footer(number)), 6)
+            contents = add(stream(b'/Filter /FlateDecode', content))
+            kids.append(add(b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>'
+                            % (pages, PAGE_WIDTH, PAGE_HEIGHT, resources, contents)))
+        objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages
+        objects[pages - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % kid for kid in kids), len(kids))
+        info = add(b'<< /Title %s /Producer (zAmp) /CreationDate (D:%s) >>' % (
+            _literal(encode(self.title)), time.strftime('%Y%m%d%H%M%SZ', time.gmtime()).encode()))
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objects) + 1, catalog, info, xref)
+        return bytes(out)
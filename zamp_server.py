@@ -0,0 +1,499 @@
+"""
+Static file server for the zAmp form (zAmp.html) and its Images/.
+
+Replaces start-server.ps1 (a single-threaded HttpListener loop that re-read
+every file per request) with an asyncio server that runs anywhere Python
+does. Each connection is its own coroutine, so technicians loading the form
+at the same time never wait on each other, and connections are kept alive
+between requests.
+
+Files are held in memory and reloaded when their mtime or size changes;
+loads run on a worker thread and concurrent misses for the same file share
+one load. Responses carry ETag, Last-Modified and Cache-Control, and
+conditional requests get 304. Text assets are sent brotli- or gzip-encoded
+when the client accepts it: a precompressed sibling (zAmp.html.br,
+zAmp.html.gz) is used when it is at least as new as the file, otherwise the
+file is compressed once when loaded. Single byte ranges are supported, so
+large images can be resumed.
+
+GET /verification-email?language=FRENCH&to=client@example.com returns the
+zAmp and USB cable verification email as a draft .eml with the client in
+To:, built by create_msg_template.py from the shared image cache
+(zamp_assets.py), so the image is encoded once per server rather than per
+email.
+
+POST /packet/technician and POST /packet/approval take the form's fields as
+JSON and return the technician HTML checklist and the approval PDF, rendered
+by zamp_packet.py. These are the only requests with a body; it must come
+with a Content-Length of at most MAX_BODY_BYTES.
+
+Usage:
+    python zamp_server.py                      # http://localhost:5000/zAmp.html
+    python zamp_server.py --host 0.0.0.0 --port 8080
+    python zamp_server.py --open               # also open the form in a browser
+    python zamp_server.py --precompress        # write .br/.gz next to the text assets and exit
+"""
+import argparse
+import asyncio
+import gzip
+import logging
+import os
+import webbrowser
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from create_msg_template import TEMPLATE_NAME, VERIFICATION_EMAIL, VERIFICATION_IMAGE, build_eml
+from zamp_assets import asset_cache
+from zamp_packet import PacketError, parse_packet, render_approval_pdf, render_technician_html, safe_filename
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+INDEX = 'zAmp.html'
+# Top-level files and folders under the root that may be served
+SERVED = ('zAmp.html', 'Images')
+VERIFICATION_ROUTE = '/verification-email'
+# POST routes: renderer, content type and file extension
+PACKET_ROUTES = {
+    '/packet/technician': (render_technician_html, 'text/html; charset=utf-8', '.html'),
+    '/packet/approval': (render_approval_pdf, 'application/pdf', '.pdf'),
+}
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.css': 'text/css; charset=utf-8',
+    '.js': 'application/javascript; charset=utf-8',
+    '.json': 'application/json',
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.svg': 'image/svg+xml',
+    '.webp': 'image/webp',
+    '.avif': 'image/avif',
+    '.ico': 'image/x-icon',
+    '.pdf': 'application/pdf',
+}
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Content encodings in order of preference, with the suffix of their precompressed files
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+MIN_COMPRESS_BYTES = 1024
+
+# HTML is revalidated on every load so form changes show up at once; images are cached
+HTML_CACHE_CONTROL = 'no-cache'
+ASSET_MAX_AGE = 24 * 3600
+
+MAX_HEADER_BYTES = 16 * 1024
+# Packets carry up to six photos as base64 data URLs
+MAX_BODY_BYTES = 64 * 1024 ** 2
+KEEPALIVE_SECONDS = 15
+BODY_TIMEOUT_SECONDS = 60
+
+REASONS = {200: 'OK', 206: 'Partial Content', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 411: 'Length Required', 413: 'Content Too Large',
+           416: 'Range Not Satisfiable', 500: 'Internal Server Error'}
+
+logger = logging.getLogger("zamp.server")
+
+
+def content_type(path):
+    return CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), 'application/octet-stream')
+
+
+def is_compressible(path):
+    return content_type(path).startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body, encoding):
+    """body encoded with 'br' or 'gzip', or None when that encoder is unavailable"""
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(body, quality=11)
+    return None
+
+
+class CachedFile:
+    """One file's bytes, validators and encoded variants"""
+
+    __slots__ = ('path', 'mtime_ns', 'size', 'body', 'content_type', 'etag', 'last_modified', 'variants')
+
+    def __init__(self, path, stat, body, variants):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.body = body
+        self.content_type = content_type(path)
+        self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.variants = variants
+
+    @property
+    def nbytes(self):
+        return len(self.body) + sum(len(body) for body in self.variants.values())
+
+    def variant_etag(self, encoding):
+        return self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+
+
+def _load(path, stat):
+    """Read a file and its encoded variants (precompressed siblings first)"""
+    with open(path, 'rb') as f:
+        body = f.read()
+    variants = {}
+    if is_compressible(path) and len(body) >= MIN_COMPRESS_BYTES:
+        for encoding, suffix in ENCODINGS:
+            try:
+                sibling = os.stat(path + suffix)
+            except OSError:
+                sibling = None
+            if sibling is not None and sibling.st_mtime_ns >= stat.st_mtime_ns:
+                with open(path + suffix, 'rb') as f:
+                    encoded = f.read()
+            else:
+                encoded = compress(body, encoding)
+            if encoded is not None and len(encoded) < len(body):
+                variants[encoding] = encoded
+    return CachedFile(path, stat, body, variants)
+
+
+class FileCache:
+    """
+    Files in memory, least recently used first out once over max_bytes.
+    An entry is reloaded when the file's mtime or size no longer matches.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._loading = {}
+
+    async def get(self, path, stat):
+        entry = self._entries.get(path)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            self._entries.move_to_end(path)
+            return entry
+
+        key = (path, stat.st_mtime_ns, stat.st_size)
+        task = self._loading.get(key)
+        if task is None:
+            task = self._loading[key] = asyncio.ensure_future(asyncio.to_thread(_load, path, stat))
+            task.add_done_callback(lambda _task: self._loading.pop(key, None))
+        entry = await task
+        self._store(entry)
+        return entry
+
+    def _store(self, entry):
+        old = self._entries.pop(entry.path, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        if entry.nbytes > self.max_bytes:
+            return
+        self._entries[entry.path] = entry
+        self._bytes += entry.nbytes
+        while self._bytes > self.max_bytes:
+            _path, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+
+def _accepted_encodings(header):
+    """Content codings the client accepts (q > 0)"""
+    accepted = set()
+    for item in (header or "").split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def _etag_matches(header, etag):
+    """If-None-Match / If-Range comparison (weak, so W/ prefixes are ignored)"""
+    if header.strip() == '*':
+        return True
+    return any(candidate.strip().removeprefix('W/') == etag for candidate in header.split(','))
+
+
+def _parse_range(header, size):
+    """
+    (start, end) inclusive for a single 'bytes=' range, None to ignore the
+    header (malformed or multiple ranges) or 'unsatisfiable'.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, _, last = spec.strip().partition('-')
+    try:
+        if first == '':
+            length = int(last)
+            if length <= 0:
+                return 'unsatisfiable'
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+
+def _not_modified_since(header, mtime_ns):
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return mtime_ns // 1_000_000_000 <= since
+
+
+def verification_email(query):
+    """(status, headers, body) for a verification email draft in the requested language"""
+    params = parse_qs(query)
+    language = params.get('language', ['ENGLISH'])[0].upper()
+    to = params.get('to', [''])[0].strip()
+    if language not in VERIFICATION_EMAIL or any(c in to for c in '\r\n'):
+        return 404, {'Content-Type': 'text/plain; charset=utf-8'}, b'404 - File Not Found'
+    body = build_eml(VERIFICATION_EMAIL[language], asset_cache.get(VERIFICATION_IMAGE), to or None)
+    return 200, {
+        'Content-Type': 'message/rfc822',
+        'Content-Disposition': f'attachment; filename="{TEMPLATE_NAME.format(language=language)}.eml"',
+        'Cache-Control': 'no-store',
+    }, body
+
+
+def packet_response(route, body):
+    """(status, headers, body) for a technician HTML or approval PDF packet posted as JSON"""
+    render, packet_type, extension = PACKET_ROUTES[route]
+    try:
+        packet = parse_packet(body)
+    except PacketError as e:
+        return 400, {'Content-Type': 'text/plain; charset=utf-8'}, str(e).encode('utf-8')
+    return 200, {
+        'Content-Type': packet_type,
+        'Content-Disposition': f'attachment; filename="{safe_filename(packet["filename"], extension)}"',
+        'Cache-Control': 'no-store',
+    }, render(packet)
+
+
+class ZampServer:
+    def __init__(self, root=ROOT, served=SERVED, cache=None):
+        self.root = os.path.abspath(root)
+        self.served = set(served)
+        self.cache = cache or FileCache()
+
+    def resolve(self, target):
+        """Filesystem path for a request target, or None when it is not served"""
+        path = unquote(urlsplit(target).path)
+        if path in ('', '/'):
+            path = '/' + INDEX
+        full = os.path.normpath(os.path.join(self.root, path.lstrip('/')))
+        relative = os.path.relpath(full, self.root)
+        if relative.startswith('..') or os.path.isabs(relative):
+            return None
+        if relative.split(os.sep, 1)[0] not in self.served:
+            return None
+        return full
+
+    async def respond(self, method, target, headers, body=b''):
+        """(status, headers, body) for one request; body is empty for HEAD and 304"""
+        route = urlsplit(target).path
+        if route in PACKET_ROUTES:
+            if method != 'POST':
+                return 405, {'Allow': 'POST'}, b''
+            return await asyncio.to_thread(packet_response, route, body)
+        if method not in ('GET', 'HEAD'):
+            return 405, {'Allow': 'GET, HEAD'}, b''
+        if route == VERIFICATION_ROUTE:
+            return await asyncio.to_thread(verification_email, urlsplit(target).query)
+        path = self.resolve(target)
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+        if stat is None or not os.path.isfile(path):
+            return 404, {'Content-Type': 'text/plain; charset=utf-8'}, b'404 - File Not Found'
+
+        entry = await self.cache.get(path, stat)
+        response = {
+            'Content-Type': entry.content_type,
+            'Last-Modified': entry.last_modified,
+            'Cache-Control': HTML_CACHE_CONTROL if entry.content_type.startswith('text/html')
+            else f'public, max-age={ASSET_MAX_AGE}',
+            'Accept-Ranges': 'bytes',
+        }
+        if entry.variants:
+            response['Vary'] = 'Accept-Encoding'
+
+        range_header = headers.get('range')
+        if range_header and 'if-range' in headers:
+            if_range = headers['if-range']
+            if if_range.startswith(('"', 'W/')):
+                current = if_range.strip() == entry.etag
+            else:
+                current = if_range.strip() == entry.last_modified
+            if not current:
+                range_header = None
+
+        # Ranges are served from the identity encoding only
+        encoding = None
+        if not range_header:
+            accepted = _accepted_encodings(headers.get('accept-encoding'))
+            encoding = next((name for name, _suffix in ENCODINGS if name in accepted and name in entry.variants), None)
+        etag = entry.variant_etag(encoding)
+        response['ETag'] = etag
+
+        if 'if-none-match' in headers:
+            if _etag_matches(headers['if-none-match'], etag):
+                return 304, response, b''
+        elif 'if-modified-since' in headers and _not_modified_since(headers['if-modified-since'], entry.mtime_ns):
+            return 304, response, b''
+
+        if range_header:
+            byte_range = _parse_range(range_header, len(entry.body))
+            if byte_range == 'unsatisfiable':
+                response['Content-Range'] = f'bytes */{len(entry.body)}'
+                return 416, response, b''
+            if byte_range is not None:
+                start, end = byte_range
+                response['Content-Range'] = f'bytes {start}-{end}/{len(entry.body)}'
+                return 206, response, entry.body[start:end + 1]
+
+        if encoding is not None:
+            response['Content-Encoding'] = encoding
+            return 200, response, entry.variants[encoding]
+        return 200, response, entry.body
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until it closes or goes idle"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), KEEPALIVE_SECONDS)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    await self._send(writer, 'HEAD', 400, {}, b'', False)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, sep, value = line.partition(':')
+                    if sep:
+                        headers[name.strip().lower()] = value.strip()
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+                # Only packet posts have a body, sent with a Content-Length; anything else closes the connection
+                length = headers.get('content-length', '0')
+                if 'transfer-encoding' in headers or not length.isdigit():
+                    await self._send(writer, method, 411, {}, b'', False)
+                    break
+                if int(length) > MAX_BODY_BYTES:
+                    await self._send(writer, method, 413, {}, b'', False)
+                    break
+                request_body = b''
+                if int(length):
+                    try:
+                        request_body = await asyncio.wait_for(reader.readexactly(int(length)), BODY_TIMEOUT_SECONDS)
+                    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                try:
+                    status, response, body = await self.respond(method, target, headers, request_body)
+                except Exception:
+                    logger.exception("Error serving %s", target)
+                    status, response, body = 500, {}, b''
+                await self._send(writer, method, status, response, body, keep_alive)
+                logger.info("%s %s %d %d", method, target, status, len(body))
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _send(self, writer, method, status, headers, body, keep_alive):
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                 f"Date: {formatdate(usegmt=True)}",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1'))
+        if method != 'HEAD' and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def serve(self, host='localhost', port=5000):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        async with server:
+            await server.serve_forever()
+
+
+def precompress(root=ROOT, served=SERVED):
+    """Write .br (when brotli is installed) and .gz files next to every compressible served file"""
+    written = []
+    for name in served:
+        path = os.path.join(root, name)
+        paths = [path] if os.path.isfile(path) else [
+            os.path.join(folder, filename) for folder, _dirs, files in os.walk(path) for filename in files]
+        for source in paths:
+            if not is_compressible(source) or source.endswith(tuple(suffix for _name, suffix in ENCODINGS)):
+                continue
+            with open(source, 'rb') as f:
+                body = f.read()
+            if len(body) < MIN_COMPRESS_BYTES:
+                continue
+            for encoding, suffix in ENCODINGS:
+                encoded = compress(body, encoding)
+                if encoded is not None and len(encoded) < len(body):
+                    with open(source + suffix, 'wb') as f:
+                        f.write(encoded)
+                    written.append(source + suffix)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the zAmp form and its images")
+    parser.add_argument('--host', default='localhost', help="Interface to listen on (0.0.0.0 for all)")
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--root', default=ROOT, help="Folder holding zAmp.html and Images/")
+    parser.add_argument('--cache-mb', type=int, default=256, help="Memory for cached files")
+    parser.add_argument('--open', action='store_true', help="Open the form in a browser")
+    parser.add_argument('--precompress', action='store_true', help="Write .br/.gz variants of text assets and exit")
+    args = parser.parse_args(argv)
+
+    if args.precompress:
+        for path in precompress(args.root):
+            print(f"Wrote {os.path.relpath(path, args.root)}")
+        return 0
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    server = ZampServer(args.root, cache=FileCache(args.cache_mb * 1024 ** 2))
+    url = f"http://{'localhost' if args.host in ('0.0.0.0', '::') else args.host}:{args.port}/{INDEX}"
+    print(f"Serving zAmp on {url} (Ctrl+C to stop)")
+    if args.open:
+        webbrowser.open(url)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
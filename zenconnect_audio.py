@@ -0,0 +1,129 @@
+"""
+Decode-once, memory-mapped audio for transcription.
+
+Loading a recording the usual way (whisper.load_audio) pipes ffmpeg's output
+into memory and keeps the whole float32 waveform around: about 460 MB for a
+two hour call, per concurrent job. Instead, each recording is decoded once
+to a 16 kHz mono 16-bit PCM file in a cache directory, keyed by the audio's
+content hash, and read through a memory map. Slicing a PCMAudio converts
+only that slice to float32, so transcribing it window by window keeps memory
+per job roughly constant whatever the call length; the OS pages the mapping
+in and out as needed.
+"""
+import os
+import subprocess
+import tempfile
+import threading
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+def decode_to_pcm(audio_file, path, sample_rate=SAMPLE_RATE):
+    """Decode any ffmpeg-readable file to raw 16-bit mono PCM at path"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", audio_file,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-y", tmp_path,
+    ]
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+        os.replace(tmp_path, path)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode(errors='replace')}") from e
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class PCMAudio:
+    """
+    Read-only float32 view of a PCM file. len() is the number of samples and
+    slicing returns a float32 array in [-1, 1), like whisper.load_audio.
+    """
+
+    def __init__(self, path, sample_rate=SAMPLE_RATE):
+        self.path = path
+        self.sample_rate = sample_rate
+        size = os.path.getsize(path) // 2
+        # np.memmap cannot map an empty file
+        self._samples = np.memmap(path, dtype='<i2', mode='r', shape=(size,)) if size else np.zeros(0, dtype='<i2')
+
+    def __len__(self):
+        return len(self._samples)
+
+    @property
+    def duration(self):
+        return len(self) / self.sample_rate
+
+    def __getitem__(self, index):
+        return self._samples[index].astype(np.float32) / 32768.0
+
+    def close(self):
+        """Drop the mapping (needed before the file can be removed on Windows)"""
+        self._samples = np.zeros(0, dtype='<i2')
+
+
+class PCMCache:
+    """
+    Directory of decoded PCM files, bounded by total size with least
+    recently used files evicted first. digest(audio_file) names the entries;
+    pass TranscriptCache.audio_digest to share its memoized hashing.
+    """
+
+    def __init__(self, directory, digest, max_bytes=4 * 1024 ** 3, sample_rate=SAMPLE_RATE):
+        self.directory = directory
+        self.digest = digest
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._decoding = {}
+
+    def path(self, audio_file):
+        """Path of the decoded PCM for audio_file, decoding it on first use"""
+        digest = self.digest(audio_file)
+        path = os.path.join(self.directory, f"{digest}.{self.sample_rate}.s16le")
+        with self._lock:
+            decode_lock = self._decoding.setdefault(path, threading.Lock())
+        # Concurrent jobs for the same recording wait for a single decode
+        with decode_lock:
+            if os.path.exists(path):
+                try:
+                    os.utime(path)  # mark as recently used
+                except OSError:
+                    pass
+                return path
+            os.makedirs(self.directory, exist_ok=True)
+            decode_to_pcm(audio_file, path, self.sample_rate)
+        self._evict(keep=path)
+        return path
+
+    def open(self, audio_file):
+        """Memory-mapped PCMAudio for audio_file"""
+        return PCMAudio(self.path(audio_file), self.sample_rate)
+
+    def _evict(self, keep=None):
+        """Drop least recently used files until the cache fits its budget"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith('.s16le'):
+                    path = os.path.join(self.directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _mtime, size, _path in entries)
+            for _mtime, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass  # still mapped by a running job (Windows)
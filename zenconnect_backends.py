@@ -0,0 +1,133 @@
+"""
+Transcription backends for the ZenConnect analyzer.
+
+Every backend exposes `transcribe(audio, **options)` and returns the same
+shape as openai-whisper: a dict with "text", "language", "duration" and
+"segments", where each segment has "start", "end", "text" and, when word
+timestamps are requested, "words" with "word", "start", "end" and
+"probability". The scoring and rendering code only ever sees that shape.
+
+Passing vad=True trims silence and hold music before decoding (see
+zenconnect_vad); timestamps still refer to the original audio and the
+result gains a "vad" entry with the seconds skipped.
+
+whisper (and through it torch) and faster-whisper are imported when a
+backend is first created, so importing this module stays cheap.
+
+Model specs:
+    "tiny", "small", "base", ...   openai-whisper on CPU
+    "faster:small", ...            faster-whisper (CTranslate2) with int8 weights
+"""
+from functools import partial
+
+from zenconnect_audio import SAMPLE_RATE
+from zenconnect_models import estimate_model_bytes, model_size_bytes
+from zenconnect_vad import remap_result, trim_non_speech
+
+FASTER_PREFIX = "faster:"
+
+
+def transcribe_speech(transcribe, audio, load_audio, **options):
+    """
+    Run transcribe() on the speech regions of audio only. A path is decoded
+    with load_audio(path), so each backend uses its own decoder.
+    """
+    if isinstance(audio, str):
+        audio = load_audio(audio)
+    trimmed, time_map = trim_non_speech(audio, SAMPLE_RATE)
+    if len(trimmed):
+        result = transcribe(trimmed, **options)
+    else:
+        result = {'text': '', 'segments': [], 'language': options.get('language') or 'en'}
+    return remap_result(result, time_map)
+
+
+class WhisperBackend:
+    """openai-whisper (PyTorch) backend"""
+
+    def __init__(self, model_name):
+        import whisper
+        self.name = model_name
+        self.model = whisper.load_model(model_name)
+        self.size_bytes = model_size_bytes(self.model)
+
+    def transcribe(self, audio, vad=False, **options):
+        if vad:
+            import whisper
+            return transcribe_speech(self.transcribe, audio, whisper.load_audio, **options)
+        result = self.model.transcribe(audio, **options)
+        if 'duration' not in result:
+            if not isinstance(audio, str):
+                result['duration'] = len(audio) / SAMPLE_RATE
+            else:
+                result['duration'] = result['segments'][-1]['end'] if result['segments'] else 0
+        return result
+
+
+class FasterWhisperBackend:
+    """faster-whisper (CTranslate2) backend, int8-quantized on CPU by default"""
+
+    def __init__(self, model_name, device="cpu", compute_type="int8", cpu_threads=0):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise RuntimeError("The faster-whisper backend needs the faster-whisper package (pip install faster-whisper)") from None
+        self.name = FASTER_PREFIX + model_name
+        self.model = WhisperModel(model_name, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
+        self.size_bytes = estimate_model_bytes(self.name)
+
+    def transcribe(self, audio, word_timestamps=False, initial_prompt=None, language=None, vad=False, **options):
+        if vad:
+            from faster_whisper import decode_audio
+            return transcribe_speech(self.transcribe, audio, partial(decode_audio, sampling_rate=SAMPLE_RATE),
+                                     word_timestamps=word_timestamps, initial_prompt=initial_prompt,
+                                     language=language, **options)
+        segments, info = self.model.transcribe(
+            audio,
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            language=language,
+            **options
+        )
+        result_segments = []
+        for segment in segments:
+            item = {
+                'id': len(result_segments),
+                'seek': segment.seek,
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text,
+                'tokens': list(segment.tokens),
+                'temperature': segment.temperature,
+                'avg_logprob': segment.avg_logprob,
+                'compression_ratio': segment.compression_ratio,
+                'no_speech_prob': segment.no_speech_prob,
+            }
+            if word_timestamps:
+                item['words'] = [
+                    {'word': word.word, 'start': word.start, 'end': word.end, 'probability': word.probability}
+                    for word in (segment.words or [])
+                ]
+            result_segments.append(item)
+        return {
+            'text': ''.join(segment['text'] for segment in result_segments),
+            'segments': result_segments,
+            'language': info.language,
+            'duration': info.duration,
+        }
+
+
+def is_faster_spec(model_spec):
+    return model_spec.startswith(FASTER_PREFIX)
+
+
+def base_model_name(model_spec):
+    """Model size without the backend prefix, e.g. "faster:small" -> "small" """
+    return model_spec[len(FASTER_PREFIX):] if is_faster_spec(model_spec) else model_spec
+
+
+def load_backend(model_spec, cpu_threads=0):
+    """Load the backend named by a model spec; cpu_threads=0 lets faster-whisper pick"""
+    if is_faster_spec(model_spec):
+        return FasterWhisperBackend(base_model_name(model_spec), cpu_threads=cpu_threads)
+    return WhisperBackend(model_spec)
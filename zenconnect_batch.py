@@ -0,0 +1,264 @@
+"""
+Headless batch analysis for ZenConnect call recordings.
+
+Transcription is fanned out over a pool of worker processes, each of which
+loads its Whisper model once and decodes its recordings window by window
+from the memory-mapped PCM cache. Scoring runs in the parent as results arrive,
+and every call gets an HTML report plus a row in summary.csv / summary.json.
+
+With ZENCONNECT_DIARIZE=1 each call is split into agent and customer turns
+and only the agent is scored; the summary then includes the agent's share of
+talk time and interruptions.
+
+Usage:
+    python zenconnect_batch.py recordings/ --out reports --model small --workers 3
+    python zenconnect_batch.py "calls/2024-*/**/*.mp3" --strictness strict
+"""
+import argparse
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import time
+from functools import partial
+
+from zenconnect_backends import is_faster_spec, load_backend
+from zenconnect_premium_analyzer import (
+    DEFAULT_STRICTNESS, RUBRIC, RUBRIC_SECTIONS, build_reports, diarize_if_enabled, model_pool, save_call_result,
+    transcribe_file, transcript_cache, transcript_key,
+)
+
+AUDIO_EXTENSIONS = ('.mp3', '.wav', '.m4a', '.ogg', '.flac', '.webm', '.mp4', '.aac', '.wma')
+SUMMARY_FIELDS = ['file', 'status', 'duration', 'skipped_seconds', 'language', 'word_count', 'wpm',
+                  'agent_talk_ratio', 'interruptions', 'dead_air_seconds', 'hold_seconds', 'response_latency',
+                  *(key for key, _label, _maximum in RUBRIC_SECTIONS),
+                  'total', 'percentage', 'category', 'flagged', 'transcribe_seconds', 'error']
+
+# Per-process model name, set once _init_worker has loaded it into model_pool
+_worker_model = None
+_worker_error = None
+
+
+def find_recordings(inputs):
+    """Expand directories and glob patterns into a sorted list of audio files"""
+    found = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _dirs, files in os.walk(item):
+                for name in files:
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        found.add(os.path.join(root, name))
+        else:
+            for path in glob.glob(item, recursive=True):
+                if os.path.isfile(path) and path.lower().endswith(AUDIO_EXTENSIONS):
+                    found.add(path)
+    return sorted(found)
+
+
+def _init_worker(model_name, threads):
+    """Load the transcription backend once per worker process"""
+    global _worker_model, _worker_error
+    # A failing pool initializer makes multiprocessing respawn the worker
+    # forever, so load errors are kept and reported per file instead
+    try:
+        if is_faster_spec(model_name):
+            # CTranslate2 sizes its own thread pool; torch may not even be installed
+            model_pool.loader = partial(load_backend, cpu_threads=threads)
+        else:
+            import torch
+            torch.set_num_threads(threads)
+        model_pool.get(model_name)
+        _worker_model = model_name
+    except Exception as e:
+        _worker_error = f"Could not load {model_name} model: {e}"
+
+
+def _transcribe_one(audio_file):
+    """Transcribe a single file in a worker; errors are returned, not raised"""
+    started = time.perf_counter()
+    if _worker_model is None:
+        return audio_file, None, _worker_error, 0
+    try:
+        result = transcribe_file(audio_file, _worker_model)
+        diarize_if_enabled(result, audio_file)
+        return audio_file, result, None, time.perf_counter() - started
+    except Exception as e:
+        return audio_file, None, str(e), time.perf_counter() - started
+
+
+def _report_name(audio_file, used):
+    """Pick a unique HTML filename for a recording"""
+    stem = os.path.splitext(os.path.basename(audio_file))[0]
+    name = stem
+    n = 2
+    while name in used:
+        name = f"{stem}_{n}"
+        n += 1
+    used.add(name)
+    return name + ".html"
+
+
+def write_call_report(path, audio_file, reports):
+    """Write the three report sections for one call into a standalone HTML file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>ZenConnect Report - {os.path.basename(audio_file)}</title>
+</head>
+<body style="max-width: 1400px; margin: 0 auto; padding: 20px;">
+{reports['quality_html']}
+<div style="height: 20px;"></div>
+{reports['recommendations_html']}
+<div style="height: 20px;"></div>
+{reports['transcript_html']}
+</body>
+</html>
+""")
+
+
+def _summary_row(audio_file, reports=None, error=None, transcribe_seconds=0):
+    row = dict.fromkeys(SUMMARY_FIELDS, "")
+    row['file'] = audio_file
+    row['transcribe_seconds'] = round(transcribe_seconds, 2)
+    if reports is None:
+        row['status'] = 'error'
+        row['error'] = error
+        return row
+    scores = reports['scores']
+    conversation = reports.get('conversation') or {}
+    two_voices = conversation.get('speakers', 1) > 1
+    timing = reports.get('timing') or {}
+    row.update({
+        'status': 'ok',
+        'duration': round(reports['duration'], 1),
+        'skipped_seconds': round(reports['skipped_seconds'], 1),
+        'language': reports['language'],
+        'word_count': reports['word_count'],
+        'wpm': round(reports['speaking_rate'], 1),
+        'agent_talk_ratio': conversation['talk_ratio'] if two_voices else "",
+        'interruptions': conversation['agent_interruptions'] if two_voices else "",
+        'dead_air_seconds': timing.get('dead_air_seconds', ""),
+        'hold_seconds': timing.get('hold_seconds', ""),
+        'response_latency': timing.get('response_latency') if timing.get('response_latency') is not None else "",
+        **{key: scores[key] for key, _label, _maximum in RUBRIC_SECTIONS},
+        'total': round(reports['total'], 1),
+        'percentage': round(reports['percentage'], 1),
+        'category': reports['category'],
+        'flagged': "; ".join(issue['category'] for issue in reports['flagged_issues']),
+    })
+    return row
+
+
+def analyze_batch(audio_files, output_dir, model_name="small", strictness="moderate", workers=2, agent=None,
+                  store=True):
+    """
+    Transcribe and score a list of recordings with a pool of worker processes.
+
+    Recordings already in the transcript cache are scored without being
+    sent to a worker. Writes one HTML report per call plus summary.csv and
+    summary.json to output_dir, and returns the summary rows in input order.
+    With store=True each call is also recorded in the results store, under
+    agent if given and dated by the recording's modification time.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    rows = {}
+    used_names = set()
+    report_names = {audio_file: _report_name(audio_file, used_names) for audio_file in audio_files}
+    done = 0
+
+    def record(audio_file, result, error, seconds):
+        nonlocal done
+        if result is not None:
+            try:
+                reports = build_reports(result, strictness)
+                write_call_report(os.path.join(output_dir, report_names[audio_file]), audio_file, reports)
+                if store:
+                    save_call_result(audio_file, reports, model_name, strictness, agent)
+                rows[audio_file] = _summary_row(audio_file, reports, transcribe_seconds=seconds)
+            except Exception as e:
+                rows[audio_file] = _summary_row(audio_file, error=str(e), transcribe_seconds=seconds)
+        else:
+            rows[audio_file] = _summary_row(audio_file, error=error, transcribe_seconds=seconds)
+        done += 1
+        print(f"[{done}/{len(audio_files)}] {rows[audio_file]['status']}: {audio_file}")
+
+    cache_keys = {}
+    pending = []
+    for audio_file in audio_files:
+        try:
+            cache_keys[audio_file] = transcript_key(audio_file, model_name)
+        except OSError as e:
+            record(audio_file, None, str(e), 0)
+            continue
+        cached = transcript_cache.get(cache_keys[audio_file])
+        if cached is not None:
+            try:
+                if diarize_if_enabled(cached, audio_file):
+                    transcript_cache.put(cache_keys[audio_file], cached)
+            except Exception as e:
+                record(audio_file, None, str(e), 0)
+                continue
+            record(audio_file, cached, None, 0)
+        else:
+            pending.append(audio_file)
+
+    if pending:
+        workers = max(1, min(workers, len(pending)))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        # spawn keeps each worker's torch state independent of the parent
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(model_name, threads)) as pool:
+            for audio_file, result, error, seconds in pool.imap_unordered(_transcribe_one, pending):
+                if result is not None:
+                    transcript_cache.put(cache_keys[audio_file], result,
+                                         source=transcript_cache.source(audio_file, model_name))
+                record(audio_file, result, error, seconds)
+
+    summary = [rows[audio_file] for audio_file in audio_files]
+    write_summary(summary, output_dir)
+    return summary
+
+
+def write_summary(rows, output_dir):
+    """Write the per-call summary rows as CSV and JSON"""
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch ZenConnect call quality analysis")
+    parser.add_argument('inputs', nargs='+', help="Directories or glob patterns of call recordings")
+    parser.add_argument('--out', default='zenconnect_reports', help="Output folder for reports and summary")
+    parser.add_argument('--model', default='small', choices=['tiny', 'small', 'base', 'faster:small', 'faster:base'],
+                        help="Whisper model size; faster:* uses int8 faster-whisper")
+    parser.add_argument('--strictness', default=DEFAULT_STRICTNESS, choices=list(RUBRIC['strictness']))
+    parser.add_argument('--workers', type=int, default=2, help="Number of transcription worker processes")
+    parser.add_argument('--agent', help="Agent to record these calls under in the results store")
+    parser.add_argument('--no-store', action='store_true', help="Don't record the calls in the results store")
+    args = parser.parse_args(argv)
+
+    audio_files = find_recordings(args.inputs)
+    if not audio_files:
+        print("No audio files found.")
+        return 1
+
+    print(f"Analyzing {len(audio_files)} recordings with {args.workers} workers ({args.model} model)...")
+    started = time.perf_counter()
+    summary = analyze_batch(audio_files, args.out, args.model, args.strictness, args.workers, args.agent,
+                            store=not args.no_store)
+    failed = sum(1 for row in summary if row['status'] != 'ok')
+    print(f"Done in {time.perf_counter() - started:.1f}s: {len(summary) - failed} analyzed, {failed} failed")
+    print(f"Reports written to: {os.path.abspath(args.out)}")
+    return 0 if failed == 0 else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,299 @@
+"""
+Benchmark harness for the transcribe -> score -> render pipeline.
+
+Each stage is timed on its own against a fixed, seeded corpus of synthetic
+Whisper results (5, 30 and 90 minute calls) and a short generated audio
+clip, reporting median wall time, peak RSS and throughput. Results are saved
+as JSON so a run can be compared against a baseline from another commit.
+
+Cold start is the analyzer's import time in a fresh interpreter. It must
+stay within --cold-start-budget seconds and must not pull in torch, whisper
+or gradio, which are only imported once a model or the UI is needed.
+
+Usage:
+    python zenconnect_benchmark.py --save benchmark_results/baseline.json
+    python zenconnect_benchmark.py --compare benchmark_results/baseline.json
+    python zenconnect_benchmark.py --no-audio --repeat 10
+    python zenconnect_benchmark.py --no-audio --cold-start-budget 0.5
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from datetime import datetime, timezone
+
+import numpy as np
+
+from zenconnect_backends import load_backend
+from zenconnect_metrics import RSSSampler
+from zenconnect_premium_analyzer import (
+    GREETINGS, VERIFY_PHRASES, PURPOSE_PHRASES, LISTENING_PHRASES, EMPATHY_PHRASES, PROCESS_PHRASES,
+    TECHNICAL_TERMS, FILLER_PHRASES, PROFESSIONAL_PHRASES, RESOLUTION_PHRASES, OFFER_PHRASES, FOLLOWUP_PHRASES,
+    TRANSCRIBE_OPTIONS, analyze_zenconnect_quality, format_html_report, format_transcript_html,
+    generate_recommendations_html, model_pool, transcribe_file,
+)
+
+CORPUS_MINUTES = (5, 30, 90)
+CORPUS_SEED = 1234
+AUDIO_SECONDS = 20
+SAMPLE_RATE = 16000
+
+COLD_START_MODULE = 'zenconnect_premium_analyzer'
+COLD_START_BUDGET_S = 1.5
+HEAVY_MODULES = ('torch', 'whisper', 'faster_whisper', 'gradio')
+
+FILLER_VOCABULARY = (
+    "the amplifier was working fine until last week when it stopped showing up on my laptop and "
+    "we tried another port but the light stays off so i wanted to see what my options are for an exchange"
+).split()
+
+
+def synthetic_result(minutes, seed=CORPUS_SEED):
+    """A deterministic Whisper-shaped result for a call of the given length"""
+    rng = random.Random(seed + minutes)
+    phrase_pool = (GREETINGS + VERIFY_PHRASES + PURPOSE_PHRASES + LISTENING_PHRASES + EMPATHY_PHRASES
+                   + PROCESS_PHRASES + TECHNICAL_TERMS + FILLER_PHRASES + PROFESSIONAL_PHRASES
+                   + RESOLUTION_PHRASES + OFFER_PHRASES + FOLLOWUP_PHRASES)
+    duration = minutes * 60.0
+    segments = []
+    t = 0.0
+    while t < duration:
+        words = []
+        for _ in range(rng.randint(6, 22)):
+            if rng.random() < 0.08:
+                words.extend(rng.choice(phrase_pool).split())
+            else:
+                words.append(rng.choice(FILLER_VOCABULARY))
+        text = " " + " ".join(words) + rng.choice(['.', '.', '?', ','])
+        length = len(words) / rng.uniform(2.0, 3.2)
+        step = length / len(words)
+        segments.append({
+            'id': len(segments),
+            'start': t,
+            'end': t + length,
+            'text': text,
+            'words': [{'word': ' ' + w, 'start': t + i * step, 'end': t + (i + 1) * step, 'probability': 0.9}
+                      for i, w in enumerate(words)],
+        })
+        t += length + rng.uniform(0.1, 1.5)
+    return {
+        'text': "".join(segment['text'] for segment in segments),
+        'segments': segments,
+        'language': 'en',
+        'duration': duration,
+    }
+
+
+def generate_audio(path, seconds=AUDIO_SECONDS, seed=CORPUS_SEED):
+    """Write a short 16 kHz mono WAV of voiced bursts separated by pauses"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    signal = 0.3 * np.sin(2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE)
+    signal += 0.15 * np.sin(2 * np.pi * 3 * np.cumsum(pitch) / SAMPLE_RATE)
+    envelope = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float64)
+    signal = signal * envelope + 0.01 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def measure(fn, repeat=1, items=1.0, unit='calls'):
+    """Run fn `repeat` times and summarize wall time, peak RSS and throughput"""
+    times = []
+    peak = None
+    for _ in range(repeat):
+        with RSSSampler() as sampler:
+            started = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - started)
+        if sampler.peak is not None:
+            peak = sampler.peak if peak is None else max(peak, sampler.peak)
+    median = statistics.median(times)
+    return {
+        'wall_s': median,
+        'wall_s_min': min(times),
+        'runs': repeat,
+        'peak_rss_mb': round(peak / 1024 ** 2, 1) if peak is not None else None,
+        'throughput': items / median if median > 0 else None,
+        'unit': unit + '/s',
+    }
+
+
+def cold_start(module=COLD_START_MODULE, repeat=3):
+    """
+    Import time of module in fresh interpreters, summarized like measure(),
+    plus the heavy modules (HEAVY_MODULES) the import loaded.
+    """
+    script = (f"import sys, time\nstarted = time.perf_counter()\nimport {module}\n"
+              f"print(time.perf_counter() - started)\n"
+              f"print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))")
+    times = []
+    heavy = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+        times.append(float(output[0]))
+        heavy.update(output[1].split() if len(output) > 1 else ())
+    median = statistics.median(times)
+    return {
+        'wall_s': median,
+        'wall_s_min': min(times),
+        'runs': repeat,
+        'peak_rss_mb': None,
+        'throughput': None,
+        'unit': 'imports/s',
+        'heavy_modules': sorted(heavy),
+    }
+
+
+def check_cold_start(results, budget=COLD_START_BUDGET_S):
+    """Problems with the cold-start stage: over budget, or heavy modules imported"""
+    stage = results['stages'].get(f'cold_start[{COLD_START_MODULE}]')
+    if stage is None:
+        return []
+    problems = []
+    if stage['wall_s_min'] > budget:
+        problems.append(f"import took {stage['wall_s_min']:.2f}s (budget {budget:.2f}s)")
+    if stage['heavy_modules']:
+        problems.append(f"import loaded {', '.join(stage['heavy_modules'])}")
+    return problems
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(repeat=5, model_name='tiny', audio=True):
+    """Run every stage and return the results dict"""
+    stages = {f'cold_start[{COLD_START_MODULE}]': cold_start(COLD_START_MODULE, max(1, min(repeat, 5)))}
+
+    for minutes in CORPUS_MINUTES:
+        result = synthetic_result(minutes)
+        text = result['text']
+        label = f"[{minutes}min]"
+        scored = analyze_zenconnect_quality(text)
+        scores, total, percentage, category, category_emoji, detailed_feedback, flagged_issues = scored
+        word_count = len(text.split())
+
+        stages['analyze_zenconnect_quality' + label] = measure(
+            lambda: analyze_zenconnect_quality(text), repeat, len(text) / 1000, 'kchars')
+        stages['format_html_report' + label] = measure(
+            lambda: format_html_report(scores, total, percentage, category, category_emoji, detailed_feedback,
+                                       flagged_issues, "0:00:00", word_count, 150, 'en'), repeat)
+        stages['generate_recommendations_html' + label] = measure(
+            lambda: generate_recommendations_html(scores, percentage), repeat)
+        stages['transcript_html' + label] = measure(
+            lambda: format_transcript_html(result, scores), repeat, len(result['segments']), 'segments')
+
+    if audio:
+        stages['model_load[' + model_name + ']'] = measure(lambda: load_backend(model_name), 1)
+        backend = load_backend(model_name)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'benchmark.wav')
+            generate_audio(path)
+            stages['transcribe[' + model_name + ']'] = measure(
+                lambda: backend.transcribe(path, **TRANSCRIBE_OPTIONS), 1, AUDIO_SECONDS, 'audio_s')
+            # Windowed decoding from the memory-mapped PCM cache, as the app runs it
+            model_pool.get(model_name)
+            stages['transcribe_windows[' + model_name + ']'] = measure(
+                lambda: transcribe_file(path, model_name), 1, AUDIO_SECONDS, 'audio_s')
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'repeat': repeat,
+        },
+        'stages': stages,
+    }
+
+
+def compare(results, baseline, tolerance=0.15):
+    """
+    Return (stage, baseline_s, current_s, ratio) rows for stages slower than
+    tolerance. Best-of-N times are compared since they are the least noisy.
+    """
+    regressions = []
+    for stage, current in results['stages'].items():
+        before = baseline.get('stages', {}).get(stage)
+        if not before or not before.get('wall_s_min'):
+            continue
+        ratio = current['wall_s_min'] / before['wall_s_min']
+        if ratio > 1 + tolerance:
+            regressions.append((stage, before['wall_s_min'], current['wall_s_min'], ratio))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'stage':<46} {'wall ms':>10} {'peak MB':>9} {'throughput':>18} {'vs base':>8}")
+    for stage, row in results['stages'].items():
+        throughput = f"{row['throughput']:.1f} {row['unit']}" if row['throughput'] else "-"
+        peak = f"{row['peak_rss_mb']:.0f}" if row['peak_rss_mb'] is not None else "-"
+        versus = ""
+        if baseline and stage in baseline.get('stages', {}):
+            versus = f"{row['wall_s_min'] / baseline['stages'][stage]['wall_s_min']:.2f}x"
+        print(f"{stage:<46} {row['wall_s'] * 1000:>10.2f} {peak:>9} {throughput:>18} {versus:>8}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the ZenConnect analysis pipeline")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per scoring/rendering stage")
+    parser.add_argument('--model', default='tiny', help="Model spec for the load/transcribe stages")
+    parser.add_argument('--no-audio', action='store_true', help="Skip model load and transcription")
+    parser.add_argument('--save', help="Write results JSON to this path")
+    parser.add_argument('--compare', help="Baseline results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed slowdown before flagging (0.15 = 15%%)")
+    parser.add_argument('--cold-start-budget', type=float, default=COLD_START_BUDGET_S,
+                        help=f"Seconds the analyzer may take to import (default: {COLD_START_BUDGET_S})")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.repeat, args.model, audio=not args.no_audio)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to: {args.save}")
+
+    problems = check_cold_start(results, args.cold_start_budget)
+    if problems:
+        print(f"\nCold start over budget: {'; '.join(problems)}")
+        return 1
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} stage(s) slower than baseline ({baseline['meta'].get('commit')}):")
+            for stage, before, after, ratio in regressions:
+                print(f"  {stage}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo regressions against baseline ({baseline['meta'].get('commit')}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,282 @@
+"""
+Vectorized re-scoring of stored transcripts.
+
+Scoring one call is cheap, but re-scoring an archive of thousands under a
+new strictness through build_reports repeats the phrase scan, the measure
+closures and the tier walk per call. Here the phrase scan happens once:
+PhraseCountMatrix holds, for every call, the count of every phrase the
+rubric's measures look at (a calls x features int32 matrix, where a feature
+is a phrase plus how it is counted: anywhere, within a start/end window, or
+as a whole word). Measures are then column reductions over that matrix, and
+score_matrix() evaluates the rubric's tier tables, caps, totals, categories
+and flags with array operations. The matrix depends only on the rubric's
+phrases and measures, so it can be kept and re-scored under every
+strictness level, or under a spec whose thresholds and points changed.
+The rubric's declared inputs (timing stats) are held per call alongside.
+
+Usage:
+    python zenconnect_bulk.py --strictness strict --out rescored.csv
+    python zenconnect_bulk.py --cache-dir .transcript_cache --rubric rubrics/zenconnect.json
+"""
+import argparse
+import csv
+import time
+
+import numpy as np
+
+from zenconnect_rubric import _mask, rubric_plan
+
+MATRIX_MEASURE_OPS = {'any': 'count', 'distinct': 'count', 'total': 'count',
+                      'total_words': 'words', 'word_ratio': 'words'}
+
+
+def _measure_features(spec):
+    """(name, op, features) per measure, a feature being (phrase, kind, start, end)"""
+    measures = []
+    for name, measure in spec.get('measures', {}).items():
+        kind = MATRIX_MEASURE_OPS[measure['op']]
+        start, end = (measure.get('start'), measure.get('end')) if kind == 'count' else (None, None)
+        measures.append((name, measure['op'], [(phrase, kind, start, end)
+                                               for phrase in spec['phrases'][measure['phrases']]]))
+    return measures
+
+
+class PhraseCountMatrix:
+    """
+    Per-call phrase counts for a rubric spec. counts[i, j] is how often
+    features[j] = (phrase, kind, start, end) occurs in call i, where kind is
+    'count' (non-overlapping occurrences, optionally windowed) or 'words'
+    (whole-word occurrences). word_count and avg_sentence_length are the
+    built-in measures, one entry per call. inputs optionally gives each
+    call's rubric inputs (e.g. timing_inputs()); missing ones take the
+    spec's defaults.
+    """
+
+    def __init__(self, spec, transcriptions, inputs=None):
+        self.name = spec['name']
+        self.version = spec['version']
+        self.features = {}
+        for _name, _op, features in _measure_features(spec):
+            for feature in features:
+                self.features.setdefault(feature, len(self.features))
+
+        # Any plan for this spec has the same matcher; strictness does not matter here
+        matcher = rubric_plan(spec, None).matcher
+        features = list(self.features)
+        counts = np.zeros((len(transcriptions), len(features)), dtype=np.int32)
+        word_counts = np.zeros(len(transcriptions), dtype=np.int64)
+        sentence_counts = np.zeros(len(transcriptions), dtype=np.int64)
+        for i, transcription in enumerate(transcriptions):
+            hits = matcher.scan(transcription.lower())
+            counts[i] = [hits.count_words(phrase) if kind == 'words' else hits.count(phrase, start, end)
+                         for phrase, kind, start, end in features]
+            word_counts[i] = len(transcription.split())
+            sentence_counts[i] = len([s for s in transcription.split('.') if s.strip()])
+        self.counts = counts
+        self.word_count = word_counts
+        self.avg_sentence_length = word_counts / np.maximum(sentence_counts, 1)
+
+        self.inputs = {}
+        if inputs is not None:
+            for name, default in spec.get('inputs', {}).items():
+                self.inputs[name] = np.array([call.get(name, default) for call in inputs])
+
+    def __len__(self):
+        return len(self.counts)
+
+    def covers(self, spec):
+        """True when spec's measures can be computed from this matrix without rescanning"""
+        return all(feature in self.features for _name, _op, features in _measure_features(spec) for feature in features)
+
+    def measures(self, spec):
+        """Every measure of spec as an array over calls, matching RubricPlan.measure()"""
+        values = {'word_count': self.word_count, 'avg_sentence_length': self.avg_sentence_length}
+        for name, default in spec.get('inputs', {}).items():
+            values[name] = self.inputs[name] if name in self.inputs else np.full(len(self), default)
+        for name, op, features in _measure_features(spec):
+            # Duplicate phrases in a group keep their repeated column, as the scalar path counts them twice
+            counts = self.counts[:, [self.features[feature] for feature in features]]
+            if op == 'any':
+                values[name] = (counts > 0).any(axis=1)
+            elif op == 'distinct':
+                values[name] = (counts > 0).sum(axis=1)
+            elif op in ('total', 'total_words'):
+                values[name] = counts.sum(axis=1)
+            else:
+                values[name] = np.divide(counts.sum(axis=1), self.word_count, out=np.zeros(len(self)),
+                                         where=self.word_count > 0)
+        return values
+
+
+class BulkScores:
+    """
+    Scores for many calls: scores[section], total, percentage and category
+    index are arrays over calls; flags[i] is a boolean array per plan flag.
+    feedback(i) and flagged_issues(i) rebuild the per-call lists that
+    RubricPlan.score() returns.
+    """
+
+    def __init__(self, plan, scores, total, percentage, category_index, tier_choices, flags):
+        self.plan = plan
+        self.scores = scores
+        self.total = total
+        self.percentage = percentage
+        self.category_index = category_index
+        self.tier_choices = tier_choices
+        self.flags = flags
+
+    def __len__(self):
+        return len(self.total)
+
+    def category(self, i):
+        index = self.category_index[i]
+        return ("", "") if index < 0 else self.plan.categories[index][1:]
+
+    def feedback(self, i):
+        detailed_feedback = {}
+        for key, _cap, rules in self.plan.sections:
+            detailed_feedback[key] = [
+                tiers[choices[i]][2]
+                for (_only_if, tiers), choices in zip(rules, self.tier_choices[key])
+                if choices[i] >= 0 and tiers[choices[i]][2]
+            ]
+        return detailed_feedback
+
+    def flagged_issues(self, i):
+        return [dict(issue) for (_section, _below, issue), raised in zip(self.plan.flags, self.flags) if raised[i]]
+
+    def result(self, i):
+        """The same 7-tuple RubricPlan.evaluate() returns, for call i"""
+        scores = {key: float(values[i]) for key, values in self.scores.items()}
+        category, category_emoji = self.category(i)
+        return (scores, float(self.total[i]), float(self.percentage[i]), category, category_emoji,
+                self.feedback(i), self.flagged_issues(i))
+
+
+def _round(values, digits=1):
+    """
+    round() elementwise. np.round scales and rounds half to even (2.45 ->
+    2.4) where round() rounds the exact decimal value (2.45 -> 2.5); a
+    section only has a handful of distinct point sums, so round those.
+    """
+    unique, inverse = np.unique(values, return_inverse=True)
+    return np.array([round(value, digits) for value in unique.tolist()])[inverse.reshape(-1)]
+
+
+def score_matrix(plan, values):
+    """
+    Score every call at once. values maps measure names to arrays over calls
+    (PhraseCountMatrix.measures(spec)); plan is a RubricPlan for any strictness.
+    """
+    size = len(values['word_count'])
+    scores = {}
+    tier_choices = {}
+    for key, cap, rules in plan.sections:
+        points = np.zeros(size)
+        choices = []
+        for only_if, tiers in rules:
+            remaining = _mask(only_if, values, size)
+            choice = np.full(size, -1, dtype=np.int16)
+            for t, (when, tier_points, _feedback) in enumerate(tiers):
+                if not remaining.any():
+                    break
+                hit = remaining & _mask(when, values, size)
+                points[hit] += tier_points
+                choice[hit] = t
+                remaining &= ~hit
+            choices.append(choice)
+        scores[key] = _round(np.minimum(points, cap) if cap is not None else points)
+        tier_choices[key] = choices
+
+    total = np.zeros(size)
+    for section_scores in scores.values():
+        total += section_scores
+    percentage = (total / plan.total_points) * 100
+
+    # First category whose minimum is met wins, as in RubricPlan.score()
+    category_index = np.full(size, -1, dtype=np.int16)
+    for index in reversed(range(len(plan.categories))):
+        minimum = plan.categories[index][0]
+        category_index[np.ones(size, dtype=bool) if minimum is None else percentage >= minimum] = index
+
+    flags = [scores[section] < below for section, below, _issue in plan.flags]
+    return BulkScores(plan, scores, total, percentage, category_index, tier_choices, flags)
+
+
+def rescore(spec, strictness, transcriptions=None, matrix=None, inputs=None):
+    """
+    Score many transcripts under one strictness level. Pass the matrix from a
+    previous call (returned alongside the scores) to skip the phrase scan.
+    """
+    if matrix is None or not matrix.covers(spec):
+        matrix = PhraseCountMatrix(spec, transcriptions, inputs)
+    return score_matrix(rubric_plan(spec, strictness), matrix.measures(spec)), matrix
+
+
+def main(argv=None):
+    from zenconnect_premium_analyzer import RUBRIC, DEFAULT_STRICTNESS, transcript_cache
+    from zenconnect_cache import TranscriptCache
+    from zenconnect_diarize import agent_text
+    from zenconnect_rubric import load_rubric
+    from zenconnect_timing import timing_inputs, timing_stats
+
+    parser = argparse.ArgumentParser(description="Re-score every cached ZenConnect transcript")
+    parser.add_argument('--cache-dir', help="Transcript cache folder (default: the analyzer's cache)")
+    parser.add_argument('--rubric', help="Rubric spec to score with (default: the analyzer's rubric)")
+    parser.add_argument('--strictness', default=None,
+                        help=f"Strictness level (default: {DEFAULT_STRICTNESS}); 'all' scores every level")
+    parser.add_argument('--out', default='rescored.csv', help="CSV file for the per-call scores")
+    args = parser.parse_args(argv)
+
+    spec = load_rubric(args.rubric) if args.rubric else RUBRIC
+    cache = TranscriptCache(args.cache_dir) if args.cache_dir else transcript_cache
+    levels = list(spec['strictness']) if args.strictness == 'all' else [args.strictness or DEFAULT_STRICTNESS]
+
+    started = time.perf_counter()
+    # One transcript per recording and model: a recording decoded both whole
+    # and streamed keeps its most recently used entry. Entries cached before
+    # sources were recorded can't be matched up and are kept as they are.
+    # Reading the archive doesn't count as use, so the cache's LRU order is kept.
+    latest = {}
+    for key in cache.keys():
+        result = cache.get(key, touch=False)
+        if result is not None:
+            source = result.get('source') or {}
+            latest[(source['audio'], source['model']) if source else key] = (key, result)
+    keys = [key for key, _result in latest.values()]
+    results = [result for _key, result in latest.values()]
+    if not results:
+        print("No cached transcripts found.")
+        return 1
+    loaded = time.perf_counter()
+    hold_phrases = spec['phrases'].get('hold', [])
+    matrix = PhraseCountMatrix(spec, [agent_text(result) for result in results],
+                               [timing_inputs(timing_stats(result, hold_phrases)) for result in results])
+    scanned = time.perf_counter()
+    print(f"Loaded {len(results)} transcripts in {loaded - started:.1f}s, "
+          f"counted {matrix.counts.shape[1]} phrase features in {scanned - loaded:.1f}s")
+
+    sections = [key for key, _cap, _rules in rubric_plan(spec, levels[0]).sections]
+    with open(args.out, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['key', 'audio', 'file', 'model', 'strictness', 'language', 'duration', 'word_count',
+                         *sections, 'total', 'percentage', 'category', 'flagged'])
+        for level in levels:
+            level_started = time.perf_counter()
+            bulk, matrix = rescore(spec, level, matrix=matrix)
+            print(f"Scored {len(bulk)} calls ({level}) in {time.perf_counter() - level_started:.3f}s")
+            for i, (key, result) in enumerate(zip(keys, results)):
+                source = result.get('source') or {}
+                writer.writerow([
+                    key, source.get('audio', ''), source.get('file', ''), source.get('model', ''),
+                    bulk.plan.strictness, result.get('language', ''), round(result.get('duration') or 0, 1),
+                    int(matrix.word_count[i]), *(float(bulk.scores[section][i]) for section in sections),
+                    round(float(bulk.total[i]), 1), round(float(bulk.percentage[i]), 1), bulk.category(i)[0],
+                    "; ".join(issue['category'] for issue in bulk.flagged_issues(i)),
+                ])
+    print(f"Scores written to: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
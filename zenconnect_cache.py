@@ -0,0 +1,156 @@
+"""
+Content-addressed on-disk cache for Whisper transcription results.
+
+Entries are keyed by a SHA-256 of the audio bytes together with the model
+name and transcribe options, so re-scoring the same recording (for example
+with a different strictness) never re-runs Whisper. Each entry is a gzipped
+JSON file holding the full result, including segments and word timestamps,
+plus a "source" entry naming the recording (audio digest and file name) and
+model it came from when the caller supplies one. The cache is bounded by total size; file mtimes record last use and the
+least recently used entries are evicted first.
+"""
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+CACHE_VERSION = 1
+# Audio digests remembered per (path, size, mtime), most recently used kept
+DIGEST_MEMO_ENTRIES = 4096
+
+
+def _json_default(value):
+    """Convert numpy scalars/arrays that can appear in Whisper output"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TranscriptCache:
+    def __init__(self, directory, max_bytes=2 * 1024 ** 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._digests = OrderedDict()
+        self._size = None
+
+    def audio_digest(self, audio_file):
+        """SHA-256 of the audio bytes, memoized per (path, size, mtime) for the last DIGEST_MEMO_ENTRIES files"""
+        stat = os.stat(audio_file)
+        memo_key = (os.path.abspath(audio_file), stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            digest = self._digests.get(memo_key)
+            if digest is not None:
+                self._digests.move_to_end(memo_key)
+                return digest
+        sha = hashlib.sha256()
+        with open(audio_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._digests[memo_key] = digest
+            while len(self._digests) > DIGEST_MEMO_ENTRIES:
+                self._digests.popitem(last=False)
+        return digest
+
+    def key(self, audio_file, model_name, options=None):
+        """Cache key for a recording transcribed with a given model and options"""
+        params = json.dumps({'v': CACHE_VERSION, 'model': model_name, 'options': options or {}}, sort_keys=True)
+        return hashlib.sha256(f"{self.audio_digest(audio_file)}:{params}".encode('utf-8')).hexdigest()
+
+    def source(self, audio_file, model_name):
+        """The recording and model a result came from, as stored by put(..., source=...)"""
+        return {'audio': self.audio_digest(audio_file), 'file': os.path.basename(audio_file), 'model': model_name}
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json.gz')
+
+    def get(self, key, touch=True):
+        """
+        Return the cached result for key, or None. touch=False reads without
+        marking the entry as recently used, e.g. when scanning the archive.
+        """
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if touch:
+            try:
+                os.utime(path)  # mark as recently used
+            except OSError:
+                pass
+        return result
+
+    def put(self, key, result, source=None):
+        """
+        Store a transcription result and evict old entries if over budget.
+        source (see source()) is stored with it as result['source'].
+        """
+        path = self._path(key)
+        if source is not None:
+            result = dict(result, source=source)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=5) as f:
+                f.write(json.dumps(result, default=_json_default, ensure_ascii=False).encode('utf-8'))
+            new_size = os.path.getsize(tmp_path)
+            # Replace under the lock so an overwrite only adds the size difference
+            with self._lock:
+                try:
+                    old_size = os.path.getsize(path)
+                except OSError:
+                    old_size = 0
+                os.replace(tmp_path, path)
+                if self._size is None:
+                    self._size = self._scan_size()
+                else:
+                    self._size += new_size - old_size
+                if self._size > self.max_bytes:
+                    self._evict()
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def keys(self):
+        """Keys of every cached result, least recently used first, e.g. for re-scoring the whole archive"""
+        return [os.path.basename(path)[:-len('.json.gz')] for _mtime, _size, path in sorted(self._entries())]
+
+    def _entries(self):
+        entries = []
+        for root, _dirs, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _mtime, size, _path in self._entries())
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its budget"""
+        entries = sorted(self._entries())
+        total = sum(size for _mtime, size, _path in entries)
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size = total
@@ -0,0 +1,242 @@
+"""
+Lightweight two-speaker diarization for Whisper results.
+
+Support calls have two voices, agent and customer, so instead of a neural
+speaker model each Whisper segment gets a cheap spectral voice print: the
+mean and spread of its log-mel energies, taken from at most
+MAX_EMBED_SECONDS of the segment. The prints are standardized across the
+call and split into two clusters with k-means; segments too short to
+embed reliably take the label of the nearest embedded segment. Embedding
+reads the memory-mapped PCM and runs float32 FFTs over EMBED_BATCH
+segments at a time, which costs a few percent of CPU transcription time;
+the cap per segment and the batch size keep its memory bounded on long
+calls.
+
+The cluster whose segments contain more agent phrases (greetings, offers of
+help, follow-up) is the agent; when neither does, whoever spoke first is.
+Calls whose clusters barely differ (voicemail, one-sided recordings) are
+treated as a single speaker and labelled agent throughout.
+
+diarize() labels segments in place, adding segment['speaker'] and a
+result['diarization'] dict with the talk-time and interruption stats from
+conversation_stats().
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+FRAME_MS = 25
+HOP_MS = 10
+N_FFT = 512
+N_MELS = 40
+MAX_EMBED_SECONDS = 4.0
+MIN_EMBED_SECONDS = 0.6
+# Segments whose frames are transformed together; numpy's FFT peaks at a few
+# times its output, so this bounds embedding memory (about 4 MB per segment)
+EMBED_BATCH = 16
+# Share of feature variance the two-cluster split must explain to count as two voices
+MIN_SEPARATION = 0.25
+# A turn that starts within this many seconds of an unfinished turn cuts it off
+INTERRUPTION_GAP = 0.3
+
+AGENT = 'agent'
+CUSTOMER = 'customer'
+
+_mel_banks = {}
+
+
+def _mel_filterbank(sample_rate, n_fft=N_FFT, n_mels=N_MELS):
+    """Triangular mel filters as an (n_mels, n_fft // 2 + 1) matrix"""
+    key = (sample_rate, n_fft, n_mels)
+    bank = _mel_banks.get(key)
+    if bank is None:
+        def to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def to_hz(mel):
+            return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+        edges = to_hz(np.linspace(to_mel(60.0), to_mel(min(sample_rate / 2, 7600.0)), n_mels + 2))
+        freqs = np.linspace(0, sample_rate / 2, n_fft // 2 + 1)
+        bank = np.zeros((n_mels, len(freqs)), dtype=np.float32)
+        for m in range(n_mels):
+            lo, mid, hi = edges[m], edges[m + 1], edges[m + 2]
+            rising = (freqs - lo) / (mid - lo)
+            falling = (hi - freqs) / (hi - mid)
+            bank[m] = np.clip(np.minimum(rising, falling), 0, None)
+        bank = _mel_banks[key] = bank
+    return bank
+
+
+def _frames(samples, frame, hop):
+    """Overlapping frames of samples as a (count, frame) view, no copy"""
+    return np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+
+
+def segment_embeddings(audio, segments, sample_rate=16000, max_seconds=MAX_EMBED_SECONDS):
+    """
+    One voice print per segment (None for segments under MIN_EMBED_SECONDS).
+    audio is anything sliceable into float samples, e.g. a PCMAudio.
+    """
+    frame = sample_rate * FRAME_MS // 1000
+    hop = sample_rate * HOP_MS // 1000
+    window = np.hanning(frame).astype(np.float32)
+    bank = _mel_filterbank(sample_rate)
+
+    embeddings = [None] * len(segments)
+    clips, owners = [], []
+    for i, segment in enumerate(segments):
+        start, end = segment['start'], segment['end']
+        if end - start < MIN_EMBED_SECONDS:
+            continue
+        # Take the middle of long segments; their edges often overlap the other speaker
+        if end - start > max_seconds:
+            middle = (start + end) / 2
+            start, end = middle - max_seconds / 2, middle + max_seconds / 2
+        samples = np.asarray(audio[int(start * sample_rate):int(end * sample_rate)], dtype=np.float32)
+        if len(samples) < frame:
+            continue
+        clips.append(_frames(samples, frame, hop))
+        owners.append(i)
+        if len(clips) == EMBED_BATCH:
+            _embed_batch(clips, owners, embeddings, window, bank)
+            clips, owners = [], []
+    if clips:
+        _embed_batch(clips, owners, embeddings, window, bank)
+    return embeddings
+
+
+def _embed_batch(clips, owners, embeddings, window, bank):
+    """Fill embeddings[owner] with the log-mel mean and std of each clip's frames"""
+    sizes = [len(clip) for clip in clips]
+    frames = np.concatenate(clips)
+    frames *= window
+    spectrum = np.fft.rfft(frames, n=N_FFT).astype(np.complex64, copy=False)
+    del frames
+    power = np.square(spectrum.real) + np.square(spectrum.imag)
+    del spectrum
+    log_mel = np.log(power @ bank.T + np.float32(1e-8))
+    offset = 0
+    for i, size in zip(owners, sizes):
+        features = log_mel[offset:offset + size]
+        offset += size
+        embeddings[i] = np.concatenate([features.mean(axis=0), features.std(axis=0)])
+
+
+def _two_means(points, iterations=20):
+    """k-means with k=2 from a farthest-point start; returns (labels, centroids)"""
+    first = points[np.argmax(np.linalg.norm(points - points.mean(axis=0), axis=1))]
+    second = points[np.argmax(np.linalg.norm(points - first, axis=1))]
+    centroids = np.stack([first, second])
+    labels = None
+    for _iteration in range(iterations):
+        distances = np.linalg.norm(points[:, None, :] - centroids[None, :, :], axis=2)
+        new_labels = distances.argmin(axis=1)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for k in (0, 1):
+            if np.any(labels == k):
+                centroids[k] = points[labels == k].mean(axis=0)
+    return labels, centroids
+
+
+def _agent_cues(text, phrases):
+    text = text.lower()
+    return sum(text.count(phrase) for phrase in phrases)
+
+
+def conversation_stats(segments, interruption_gap=INTERRUPTION_GAP):
+    """
+    Talk time per speaker, talk ratio (agent share of speech), turns and
+    interruptions from speaker-labelled segments. An interruption is a
+    speaker change within interruption_gap seconds of the previous turn's
+    end when that turn did not finish a sentence.
+    """
+    talk = {AGENT: 0.0, CUSTOMER: 0.0}
+    interruptions = {AGENT: 0, CUSTOMER: 0}
+    turns = 0
+    longest = {AGENT: 0.0, CUSTOMER: 0.0}
+    previous = None
+    turn_start = 0.0
+    for segment in segments:
+        speaker = segment.get('speaker', AGENT)
+        talk[speaker] += max(0.0, segment['end'] - segment['start'])
+        if previous is None or speaker != previous.get('speaker', AGENT):
+            if previous is not None:
+                longest[previous.get('speaker', AGENT)] = max(longest[previous.get('speaker', AGENT)],
+                                                              previous['end'] - turn_start)
+                finished = previous['text'].rstrip().endswith(('.', '?', '!'))
+                if segment['start'] - previous['end'] < interruption_gap and not finished:
+                    interruptions[speaker] += 1
+            turns += 1
+            turn_start = segment['start']
+        previous = segment
+    if previous is not None:
+        speaker = previous.get('speaker', AGENT)
+        longest[speaker] = max(longest[speaker], previous['end'] - turn_start)
+
+    spoken = talk[AGENT] + talk[CUSTOMER]
+    return {
+        'agent_talk_seconds': round(talk[AGENT], 1),
+        'customer_talk_seconds': round(talk[CUSTOMER], 1),
+        'talk_ratio': round(talk[AGENT] / spoken, 3) if spoken else 0.0,
+        'turns': turns,
+        'agent_interruptions': interruptions[AGENT],
+        'customer_interruptions': interruptions[CUSTOMER],
+        'longest_agent_turn': round(longest[AGENT], 1),
+        'longest_customer_turn': round(longest[CUSTOMER], 1),
+    }
+
+
+def diarize(result, audio, sample_rate=16000, agent_phrases=(), min_separation=MIN_SEPARATION):
+    """
+    Label result['segments'] as agent or customer in place and store
+    result['diarization'] (speakers found plus conversation_stats()).
+    Returns the result.
+    """
+    segments = result['segments']
+    embeddings = segment_embeddings(audio, segments, sample_rate)
+    embedded = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+
+    speakers = 1
+    labels = np.zeros(len(segments), dtype=int)
+    if len(embedded) >= 4:
+        points = np.stack([embeddings[i] for i in embedded])
+        points = (points - points.mean(axis=0)) / (points.std(axis=0) + 1e-6)
+        cluster, centroids = _two_means(points)
+        total = np.square(points).sum()
+        within = np.square(points - centroids[cluster]).sum()
+        if total > 0 and 1 - within / total >= min_separation and 0 < cluster.sum() < len(cluster):
+            speakers = 2
+            labels[embedded] = cluster
+            # Short segments: same speaker as the nearest embedded neighbour in time
+            by_start = sorted(embedded, key=lambda j: segments[j]['start'])
+            starts = [segments[j]['start'] for j in by_start]
+            for i in range(len(segments)):
+                if embeddings[i] is None:
+                    start = segments[i]['start']
+                    k = bisect_left(starts, start)
+                    if k == len(starts) or (k > 0 and start - starts[k - 1] <= starts[k] - start):
+                        k -= 1
+                    labels[i] = labels[by_start[k]]
+
+    if speakers == 2:
+        cues = [0, 0]
+        for segment, label in zip(segments, labels):
+            cues[label] += _agent_cues(segment['text'], agent_phrases)
+        agent_label = labels[0] if cues[0] == cues[1] else int(np.argmax(cues))
+    else:
+        agent_label = 0
+    for segment, label in zip(segments, labels):
+        segment['speaker'] = AGENT if label == agent_label else CUSTOMER
+
+    result['diarization'] = dict(speakers=speakers, **conversation_stats(segments))
+    return result
+
+
+def agent_text(result):
+    """Text of the agent's segments (the whole transcript when unlabelled)"""
+    if not result.get('diarization'):
+        return result['text']
+    return "".join(segment['text'] for segment in result['segments'] if segment.get('speaker', AGENT) == AGENT)
@@ -0,0 +1,233 @@
+"""
+SQLite-backed job queue for ZenConnect analyses.
+
+Submitting an analysis stores a row in a local SQLite database and returns a
+job ID straight away; a small pool of worker threads in the same process
+picks queued jobs up in submission order. Each model size has its own
+concurrency limit, so a burst of uploads neither loads the same Whisper
+model several times nor runs more decodes than the machine can hold, and a
+job for a free model can start while another model is saturated.
+
+The runner reports progress through a callback; that callback raises
+JobCancelled once cancellation was requested, so a running job stops at its
+next progress report (for streamed transcription, the next chunk). Jobs left
+running by a previous process are re-queued on startup.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    model TEXT NOT NULL,
+    params TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at);
+"""
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation was requested"""
+
+
+def parse_concurrency(spec):
+    """Parse "tiny=2,small=1" into {'tiny': 2, 'small': 1}"""
+    limits = {}
+    for item in (spec or '').split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            limits[name.strip()] = max(1, int(value))
+    return limits
+
+
+class JobQueue:
+    """
+    runner(params, progress) does the work for one job. params is the dict
+    passed to submit() plus 'model' and 'job_id';
+    progress(fraction=None, message=None, partial=None) records progress and
+    an optional partial result, and raises JobCancelled when the job should
+    stop. The runner's return value is stored as the job result and must be
+    JSON serializable. The database is created on first use.
+    """
+
+    def __init__(self, db_path, runner, workers=2, concurrency=None, default_concurrency=1, poll_interval=1.0):
+        self.db_path = db_path
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.concurrency = dict(concurrency or {})
+        self.default_concurrency = default_concurrency
+        self.poll_interval = poll_interval
+        self._running = {}
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+        self._ready = False
+
+    def _connect(self):
+        if not self._ready:
+            self._init_db()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        """Create the database on first use and re-queue interrupted jobs"""
+        with self._cond:
+            if self._ready:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(SCHEMA)
+                # Anything still marked running was interrupted by a restart
+                conn.execute("UPDATE jobs SET status = ?, started_at = NULL, progress = 0 WHERE status = ?",
+                             (QUEUED, RUNNING))
+            self._ready = True
+
+    def _execute(self, sql, args=()):
+        with closing(self._connect()) as conn, conn:
+            return conn.execute(sql, args).rowcount
+
+    def limit(self, model):
+        return self.concurrency.get(model, self.default_concurrency)
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        with self._cond:
+            if self._threads:
+                return self
+            self._stopping = False
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"zenconnect-job-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, model, **params):
+        """Queue a job and return its ID"""
+        job_id = uuid.uuid4().hex
+        params = dict(params, model=model)
+        self._execute("INSERT INTO jobs (id, status, model, params, submitted_at) VALUES (?, ?, ?, ?, ?)",
+                      (job_id, QUEUED, model, json.dumps(params), time.time()))
+        with self._cond:
+            self._cond.notify_all()
+        return job_id
+
+    def status(self, job_id):
+        """Job state as a dict (without the result), or None for an unknown ID"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT id, status, model, submitted_at, started_at, finished_at, progress, message, error, "
+                "cancel_requested, (SELECT COUNT(*) FROM jobs AS q WHERE q.status = 'queued' "
+                "AND q.submitted_at < jobs.submitted_at) AS ahead FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        status = dict(row)
+        status['cancel_requested'] = bool(status['cancel_requested'])
+        if status['status'] != QUEUED:
+            status['ahead'] = 0
+        return status
+
+    def result(self, job_id):
+        """Final result of a finished job, or the latest partial result of a running one"""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row['result']) if row is not None and row['result'] else None
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. A queued job is cancelled at once; a running job stops
+        at its next progress report. Returns False for unknown or finished jobs.
+        """
+        cancelled = self._execute("UPDATE jobs SET status = ?, finished_at = ?, cancel_requested = 1 "
+                                  "WHERE id = ? AND status = ?", (CANCELLED, time.time(), job_id, QUEUED))
+        if cancelled:
+            return True
+        return bool(self._execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                                  (job_id, RUNNING)))
+
+    def _claim(self):
+        """Mark the oldest queued job whose model has a free slot as running"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT id, model, params FROM jobs WHERE status = ? ORDER BY submitted_at",
+                                (QUEUED,)).fetchall()
+        for row in rows:
+            if self._running.get(row['model'], 0) >= self.limit(row['model']):
+                continue
+            claimed = self._execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                                    (RUNNING, time.time(), row['id'], QUEUED))
+            if claimed:
+                self._running[row['model']] = self._running.get(row['model'], 0) + 1
+                return row['id'], row['model'], dict(json.loads(row['params']), job_id=row['id'])
+        return None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping:
+                    job = self._claim()
+                    if job is not None:
+                        break
+                    self._cond.wait(self.poll_interval)
+                if job is None:
+                    return
+            job_id, model, params = job
+            try:
+                self._run(job_id, params)
+            finally:
+                with self._cond:
+                    self._running[model] -= 1
+                    self._cond.notify_all()
+
+    def _run(self, job_id, params):
+        def progress(fraction=None, message=None, partial=None):
+            partial = json.dumps(partial) if partial is not None else None
+            with closing(self._connect()) as conn, conn:
+                conn.execute("UPDATE jobs SET progress = COALESCE(?, progress), message = COALESCE(?, message), "
+                             "result = COALESCE(?, result) WHERE id = ?", (fraction, message, partial, job_id))
+                row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row['cancel_requested']:
+                raise JobCancelled(job_id)
+
+        try:
+            progress(0)
+            result = self.runner(params, progress)
+        except JobCancelled:
+            self._execute("UPDATE jobs SET status = ?, finished_at = ?, message = ? WHERE id = ?",
+                          (CANCELLED, time.time(), "Cancelled", job_id))
+        except Exception as e:
+            self._execute("UPDATE jobs SET status = ?, finished_at = ?, error = ?, message = ? WHERE id = ?",
+                          (FAILED, time.time(), f"{type(e).__name__}: {e}", "Failed", job_id))
+        else:
+            self._execute("UPDATE jobs SET status = ?, finished_at = ?, progress = 1, result = ? WHERE id = ?",
+                          (DONE, time.time(), json.dumps(result), job_id))
@@ -0,0 +1,129 @@
+"""
+Per-stage timing and memory instrumentation for ZenConnect analyses.
+
+A StageTimer is created per analyzed call. Each `with timer.stage(name):`
+block records wall time and the peak RSS seen while it ran (sampled on a
+background thread) and emits a JSON log line on the "zenconnect.perf"
+logger; `timer.finish()` logs a summary line with the real-time factor.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger("zenconnect.perf")
+
+# psutil handle for this process, or None to read /proc/self/statm instead
+_process = psutil.Process() if psutil is not None else None
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None if unavailable"""
+    global _process
+    if _process is not None:
+        if _process.pid != os.getpid():
+            # Forked child: the inherited handle still points at the parent
+            _process = psutil.Process()
+        return _process.memory_info().rss
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _mb(value):
+    return round(value / 1024 ** 2, 1) if value is not None else None
+
+
+class RSSSampler:
+    """Track peak RSS on a background thread while a block runs"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = current_rss()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._sample()
+            self._stop.wait(self.interval)
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return False
+
+
+class StageTimer:
+    """Collects wall time and peak memory per pipeline stage for one call"""
+
+    def __init__(self, call=None, model=None):
+        self.call = call
+        self.model = model
+        self.audio_seconds = None
+        self.skipped_seconds = None
+        self.stages = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a stage; repeated stages (e.g. streamed chunks) accumulate"""
+        with RSSSampler() as sampler:
+            started = time.perf_counter()
+            try:
+                yield
+            finally:
+                seconds = time.perf_counter() - started
+        entry = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'peak_rss': None})
+        entry['seconds'] += seconds
+        entry['calls'] += 1
+        if sampler.peak is not None and (entry['peak_rss'] is None or sampler.peak > entry['peak_rss']):
+            entry['peak_rss'] = sampler.peak
+        logger.info(json.dumps({
+            'event': 'stage', 'call': self.call, 'model': self.model, 'stage': name,
+            'seconds': round(seconds, 4), 'peak_rss_mb': _mb(sampler.peak),
+        }))
+
+    def summary(self):
+        """Totals, real-time factor and per-stage breakdown as plain data"""
+        decode = self.stages.get('decode', {}).get('seconds')
+        peaks = [entry['peak_rss'] for entry in self.stages.values() if entry['peak_rss'] is not None]
+        return {
+            'call': self.call,
+            'model': self.model,
+            'audio_seconds': self.audio_seconds,
+            'skipped_seconds': self.skipped_seconds,
+            'total_seconds': round(time.perf_counter() - self._started, 4),
+            'rtf': round(decode / self.audio_seconds, 4) if decode and self.audio_seconds else None,
+            'peak_rss_mb': _mb(max(peaks)) if peaks else None,
+            'stages': {
+                name: {'seconds': round(entry['seconds'], 4), 'calls': entry['calls'],
+                       'peak_rss_mb': _mb(entry['peak_rss'])}
+                for name, entry in self.stages.items()
+            },
+        }
+
+    def finish(self):
+        """Log and return the summary for this call"""
+        summary = self.summary()
+        logger.info(json.dumps(dict(event='analysis', **summary)))
+        return summary
@@ -0,0 +1,211 @@
+"""
+Bounded, thread-safe pool of resident Whisper models.
+
+Up to `max_models` models stay loaded at once, within a memory budget of
+`max_bytes`. When a new model would not fit, the least recently used models
+are dropped first. Concurrent requests for a model that is still loading
+wait for that single load instead of loading it again, and each model has a
+usage lock so two requests never decode on the same instance at once
+(Whisper installs its kv-cache hooks on the model itself).
+
+ModelPreloader loads a list of models into a pool on a background thread at
+startup and runs a warm-up on each, so the first request does not pay for
+loading and first-run allocation; its status() backs a readiness check.
+"""
+import gc
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+# Approximate parameter counts, used to make room before a model is loaded
+WHISPER_MODEL_PARAMS = {
+    'tiny': 39_000_000,
+    'base': 74_000_000,
+    'small': 244_000_000,
+    'medium': 769_000_000,
+    'large': 1_550_000_000,
+}
+
+
+def estimate_model_bytes(model_name):
+    """
+    Weight size estimate for a model that has not been loaded yet: fp32 for
+    openai-whisper, int8 for "faster:" (CTranslate2) specs
+    """
+    quantized = model_name.startswith('faster:')
+    size = model_name.split(':', 1)[-1].split('.')[0].split('-')[0]
+    return WHISPER_MODEL_PARAMS.get(size, 0) * (1 if quantized else 4)
+
+
+def model_size_bytes(model):
+    """Memory held by a loaded model's parameters and buffers"""
+    if getattr(model, 'size_bytes', None) is not None:
+        return model.size_bytes
+    try:
+        tensors = list(model.parameters()) + list(model.buffers())
+    except AttributeError:
+        return 0
+    return sum(t.numel() * t.element_size() for t in tensors)
+
+
+class _Entry:
+    def __init__(self, model, size):
+        self.model = model
+        self.size = size
+        self.use_lock = threading.Lock()
+
+
+class ModelPool:
+    def __init__(self, loader, max_models=2, max_bytes=None):
+        self.loader = loader
+        self.max_models = max(1, max_models)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    def _lookup(self, model_name):
+        entry = self._entries.get(model_name)
+        if entry is not None:
+            self._entries.move_to_end(model_name)
+        return entry
+
+    def _entry(self, model_name):
+        with self._lock:
+            entry = self._lookup(model_name)
+            if entry is not None:
+                return entry
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        with load_lock:
+            # Another request may have finished loading while we waited
+            with self._lock:
+                entry = self._lookup(model_name)
+                if entry is not None:
+                    return entry
+                self._make_room(estimate_model_bytes(model_name))
+
+            print(f"Loading {model_name} model...")
+            model = self.loader(model_name)
+            entry = _Entry(model, model_size_bytes(model))
+
+            with self._lock:
+                self._entries[model_name] = entry
+                self._make_room(0, keep=model_name)
+            print(f"{model_name} model loaded successfully!")
+            return entry
+
+    def _make_room(self, incoming_bytes, keep=None):
+        """Evict least recently used models until the pool fits its limits"""
+        reserve = 1 if incoming_bytes else 0
+        evicted = False
+        while self._entries:
+            used = sum(entry.size for entry in self._entries.values())
+            over_count = len(self._entries) + reserve > self.max_models
+            over_bytes = self.max_bytes is not None and used + incoming_bytes > self.max_bytes
+            if not (over_count or over_bytes):
+                break
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            del self._entries[oldest]
+            print(f"Unloaded {oldest} model to free memory")
+            evicted = True
+        if evicted:
+            gc.collect()
+
+    def get(self, model_name):
+        """Return a resident model, loading it if necessary"""
+        return self._entry(model_name).model
+
+    @contextmanager
+    def acquire(self, model_name):
+        """Hold a model exclusively for the duration of a transcription"""
+        entry = self._entry(model_name)
+        with entry.use_lock:
+            yield entry.model
+
+    def resident(self):
+        """Names of loaded models, least recently used first"""
+        with self._lock:
+            return list(self._entries)
+
+    def evict(self, model_name):
+        with self._lock:
+            removed = self._entries.pop(model_name, None)
+        if removed is not None:
+            gc.collect()
+        return removed is not None
+
+
+def parse_model_list(spec):
+    """Model specs from a comma-separated list such as "small,faster:small" """
+    return [name.strip() for name in (spec or "").split(',') if name.strip()]
+
+
+class ModelPreloader:
+    """
+    Loads model_names into pool on a daemon thread, in order, calling
+    warmup(model) on each while holding it. Models that do not fit the pool's
+    max_models are skipped, since loading them would evict earlier ones.
+    Ready once every preloaded model is loaded and warmed; a model that
+    fails to load or warm keeps the preloader not ready.
+    """
+
+    def __init__(self, pool, model_names, warmup=None):
+        self.pool = pool
+        self.warmup = warmup
+        self.model_names = list(dict.fromkeys(model_names))[:pool.max_models]
+        self.skipped = list(dict.fromkeys(model_names))[pool.max_models:]
+        self._lock = threading.Lock()
+        self._models = {name: {'state': 'pending', 'seconds': None, 'error': None} for name in self.model_names}
+        self._thread = None
+
+    def start(self):
+        """Start preloading (idempotent)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="zenconnect-preload", daemon=True)
+                self._thread.start()
+        return self
+
+    def _set(self, name, **fields):
+        with self._lock:
+            self._models[name].update(fields)
+
+    def _run(self):
+        for name in self.model_names:
+            started = time.perf_counter()
+            try:
+                self._set(name, state='loading')
+                with self.pool.acquire(name) as model:
+                    if self.warmup is not None:
+                        self._set(name, state='warming')
+                        self.warmup(model)
+                self._set(name, state='ready', seconds=round(time.perf_counter() - started, 2))
+            except Exception as e:
+                self._set(name, state='failed', error=f"{type(e).__name__}: {e}",
+                          seconds=round(time.perf_counter() - started, 2))
+
+    def wait(self, timeout=None):
+        """Block until preloading has finished; returns readiness"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    @property
+    def ready(self):
+        with self._lock:
+            return all(model['state'] == 'ready' for model in self._models.values())
+
+    def status(self):
+        """Readiness, resident models and the preload state of each model"""
+        with self._lock:
+            models = {name: dict(model) for name, model in self._models.items()}
+        return {
+            'ready': all(model['state'] == 'ready' for model in models.values()),
+            'resident': self.pool.resident(),
+            'preload': models,
+            'skipped': list(self.skipped),
+        }
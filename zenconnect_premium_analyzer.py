@@ -1,385 +1,242 @@
-import whisper
-import gradio as gr
-import re
-from datetime import timedelta
+import numpy as np
+import logging
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+from html import escape
+from zenconnect_audio import SAMPLE_RATE, PCMCache
+from zenconnect_backends import load_backend
+from zenconnect_cache import TranscriptCache
+from zenconnect_diarize import CUSTOMER, agent_text, diarize
+from zenconnect_jobs import CANCELLED, FAILED, FINISHED_STATES, QUEUED, RUNNING, JobCancelled, JobQueue, parse_concurrency
+from zenconnect_metrics import StageTimer
+from zenconnect_models import ModelPool, ModelPreloader, parse_model_list
+from zenconnect_phrases import PhraseMatcher
+from zenconnect_results import GROUP_COLUMNS, ResultsStore, recording_date
+from zenconnect_rubric import load_rubric, rubric_phrases, rubric_plan, rubric_sections
+from zenconnect_timing import timing_inputs, timing_stats
 
-# Don't load model at startup - will load based on user selection
-model = None
-current_model_name = None
+# Don't load models at startup - they are loaded on first use and kept in
+# a bounded pool so switching between sizes doesn't reload from disk
+model_pool = ModelPool(
+    load_backend,
+    max_models=int(os.environ.get('ZENCONNECT_MAX_MODELS', '2')),
+    max_bytes=int(os.environ.get('ZENCONNECT_MODEL_MEMORY_MB', '4096')) * 1024 * 1024
+)
+
+# Options passed to the backend's transcribe(); part of the transcript cache key.
+# vad trims silence and hold music before decoding (ZENCONNECT_VAD=0 turns it off)
+TRANSCRIBE_OPTIONS = {'word_timestamps': True, 'vad': os.environ.get('ZENCONNECT_VAD', '1') != '0'}
+
+# Streaming mode transcribes the call in chunks of roughly this many seconds
+STREAM_CHUNK_SECONDS = 60
+
+# and re-scores the provisional reports after the first chunk and every this
+# many chunks after it; chunks in between only update the progress status
+STREAM_SCORE_EVERY = max(1, int(os.environ.get('ZENCONNECT_STREAM_SCORE_EVERY', '5')))
+
+# One-shot transcription feeds Whisper windows of about this many seconds
+DECODE_WINDOW_SECONDS = 30
+
+# Label segments agent/customer after transcription and score only the agent
+DIARIZE = os.environ.get('ZENCONNECT_DIARIZE', '0') == '1'
+
+# Dropdown labels mapped to Whisper model names
+MODEL_CHOICES = {
+    "Fast (Tiny - ~1min for 5min audio)": "tiny",
+    "Balanced (Small - ~2min for 5min audio)": "small",
+    "Accurate (Base - ~3min for 5min audio)": "base",
+    "Turbo CPU (Small int8 - faster-whisper)": "faster:small",
+    "Turbo CPU Fast (Base int8 - faster-whisper)": "faster:base"
+}
+
+# Transcripts are cached on disk so re-scoring a call skips Whisper entirely
+transcript_cache = TranscriptCache(
+    os.environ.get('ZENCONNECT_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.transcript_cache')),
+    max_bytes=int(os.environ.get('ZENCONNECT_CACHE_MB', '2048')) * 1024 * 1024
+)
+
+# Recordings are decoded once to 16 kHz PCM and memory-mapped while transcribing
+audio_cache = PCMCache(
+    os.environ.get('ZENCONNECT_AUDIO_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.audio_cache')),
+    transcript_cache.audio_digest,
+    max_bytes=int(os.environ.get('ZENCONNECT_AUDIO_CACHE_MB', '4096')) * 1024 * 1024
+)
+
+def transcript_key(audio_file, model_name, chunk_seconds=DECODE_WINDOW_SECONDS):
+    """Transcript cache key for a recording decoded in chunks of chunk_seconds"""
+    return transcript_cache.key(audio_file, model_name, dict(TRANSCRIBE_OPTIONS, chunk_seconds=chunk_seconds))
 
 def load_model_if_needed(model_name):
-    """Load the Whisper model only when needed"""
-    global model, current_model_name
-    if model is None or current_model_name != model_name:
-        print(f"Loading {model_name} model...")
-        model = whisper.load_model(model_name)
-        current_model_name = model_name
-        print(f"{model_name} model loaded successfully!")
-    return model
-
-def analyze_zenconnect_quality(transcription, strictness="moderate"):
+    """Load the transcription backend for a model spec only when needed"""
+    return model_pool.get(model_name)
+
+def no_progress(*args, **kwargs):
+    """Progress callback for calls made outside the UI"""
+
+# Models loaded and warmed on a background thread when the server starts, e.g.
+# ZENCONNECT_PRELOAD_MODELS="small,faster:small" (empty for none; default small)
+PRELOAD_MODELS = parse_model_list(os.environ.get('ZENCONNECT_PRELOAD_MODELS', 'small'))
+WARMUP_SECONDS = 1.0
+
+def warm_up_model(backend):
+    """Decode a short silent clip so kernel setup and buffer allocation happen before the first call"""
+    silence = np.zeros(int(WARMUP_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    backend.transcribe(silence, **dict(TRANSCRIBE_OPTIONS, vad=False))
+
+preloader = ModelPreloader(model_pool, PRELOAD_MODELS, warm_up_model)
+
+# The ZenConnect rubric: phrases, rules, thresholds and strictness levels
+RUBRIC_PATH = os.environ.get('ZENCONNECT_RUBRIC', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rubrics', 'zenconnect.json'))
+RUBRIC = load_rubric(RUBRIC_PATH)
+
+# Strictness levels come from the rubric, so adding one needs no code change
+STRICTNESS_CHOICES = {level.get('label', name): name for name, level in RUBRIC['strictness'].items()}
+DEFAULT_STRICTNESS = RUBRIC.get('default_strictness', 'moderate')
+
+# Report sections as (key, label, max points) and their coaching tips, from the rubric too
+RUBRIC_SECTIONS = rubric_sections(RUBRIC)
+RUBRIC_RECOMMENDATIONS = RUBRIC.get('recommendations', [])
+
+# Phrase lists used by the ZenConnect rubric
+GREETINGS = RUBRIC['phrases'].get('greetings', [])
+PROFESSIONAL_GREETINGS = RUBRIC['phrases'].get('professional_greetings', [])
+VERIFY_PHRASES = RUBRIC['phrases'].get('verify', [])
+PURPOSE_PHRASES = RUBRIC['phrases'].get('purpose', [])
+LISTENING_PHRASES = RUBRIC['phrases'].get('listening', [])
+EMPATHY_PHRASES = RUBRIC['phrases'].get('empathy', [])
+CLARIFYING_WORDS = RUBRIC['phrases'].get('clarifying', [])
+HOLD_PHRASES = RUBRIC['phrases'].get('hold', [])
+TRANSFER_PHRASES = RUBRIC['phrases'].get('transfer', [])
+PROCESS_PHRASES = RUBRIC['phrases'].get('process', [])
+CONFIDENCE_PHRASES = RUBRIC['phrases'].get('confidence', [])
+TECHNICAL_TERMS = RUBRIC['phrases'].get('technical', [])
+RESOURCE_PHRASES = RUBRIC['phrases'].get('resources', [])
+SAFETY_PHRASES = RUBRIC['phrases'].get('safety', [])
+FILLER_PHRASES = RUBRIC['phrases'].get('filler', [])
+PROFESSIONAL_PHRASES = RUBRIC['phrases'].get('professional', [])
+RESOLUTION_PHRASES = RUBRIC['phrases'].get('resolution', [])
+OFFER_PHRASES = RUBRIC['phrases'].get('offer', [])
+FOLLOWUP_PHRASES = RUBRIC['phrases'].get('followup', [])
+
+# Per-segment transcript flags
+SEGMENT_GREETINGS = ['hello', 'hi', 'good morning', 'good afternoon', 'good evening', 'thank you for calling']
+SEGMENT_VERIFY_PHRASES = ['may i have', 'can i get', 'verify', 'confirm your', 'your name']
+SEGMENT_FILLER_WORDS = ['um', 'uh', 'like', 'you know', 'basically', 'actually']
+SEGMENT_FILLER_PATTERNS = [f' {word} ' for word in SEGMENT_FILLER_WORDS]
+NEGATIVE_PHRASES = ['whatever', "don't care", "not my problem", "can't help"]
+SEGMENT_RESOLUTION_PHRASES = ['did that help', 'does that work', 'is that clear', 'resolved', 'fixed']
+SEGMENT_FOLLOWUP_PHRASES = ['anything else', 'further assistance', 'follow up', 'call back']
+
+# Compiled once at import so each call scans the transcript a single time
+# for both the rubric and the transcript flags
+RUBRIC_MATCHER = PhraseMatcher(
+    rubric_phrases(RUBRIC)
+    + SEGMENT_GREETINGS + SEGMENT_VERIFY_PHRASES + SEGMENT_FILLER_PATTERNS + NEGATIVE_PHRASES
+    + SEGMENT_RESOLUTION_PHRASES + SEGMENT_FOLLOWUP_PHRASES
+)
+
+# Phrases that mark the agent's side of a diarized call
+AGENT_CUE_PHRASES = SEGMENT_GREETINGS + SEGMENT_VERIFY_PHRASES + SEGMENT_FOLLOWUP_PHRASES + OFFER_PHRASES
+
+def diarize_if_enabled(result, audio_file, timer=None):
+    """
+    Label a result's segments by speaker when DIARIZE is on and it isn't
+    labelled yet. Returns True when the result changed (so callers can
+    re-cache it).
+    """
+    if not DIARIZE or 'diarization' in result or not result['segments']:
+        return False
+    timer = timer or StageTimer()
+    with timer.stage('diarize'):
+        audio = audio_cache.open(audio_file)
+        try:
+            diarize(result, audio, audio.sample_rate, agent_phrases=AGENT_CUE_PHRASES)
+        finally:
+            audio.close()
+    return True
+
+class TranscriptIndex:
+    """
+    Phrase hits for a whole transcript, tagged by segment.
+    
+    The segments are lowercased and joined into one text that is scanned
+    once with RUBRIC_MATCHER; every hit that lies wholly inside a segment is
+    then filed under that segment. Call-level scoring reads the same hit
+    table when the joined text matches the scored text (it does for Whisper
+    output), and the transcript flags read the per-segment tags. call_text
+    is the text to score, by default the whole transcript; a diarized call
+    passes the agent's text, which gets its own scan.
     """
-    Analyze call based on ZenConnect monitoring criteria:
-    - Opening (5 points)
-    - Handling & Process (20 points)
-    - Knowledge & Accuracy (10 points)
-    - Communication & Language (10 points)
-    - Closing & Next Steps (5 points)
-    Total: 50 points
+    
+    def __init__(self, result, call_text=None):
+        texts = [segment['text'].lower() for segment in result["segments"]]
+        starts = []
+        ends = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text)
+            ends.append(offset)
+        self.segment_hits = RUBRIC_MATCHER.scan("".join(texts))
+        
+        # segments[i] maps phrase -> start offsets inside segment i
+        self.segments = [{} for _ in texts]
+        for phrase, positions in self.segment_hits.hits.items():
+            size = len(phrase)
+            for pos in positions:
+                i = bisect_right(starts, pos) - 1
+                if pos + size <= ends[i]:
+                    self.segments[i].setdefault(phrase, []).append(pos)
+        
+        call_text = (result["text"] if call_text is None else call_text).lower()
+        if call_text == self.segment_hits.text:
+            self.call_hits = self.segment_hits
+        else:
+            self.call_hits = RUBRIC_MATCHER.scan(call_text)
+    
+    def segment_any(self, i, phrases):
+        """Same as `any(p in segment_text for p in phrases)` for segment i"""
+        tags = self.segments[i]
+        return any(phrase in tags for phrase in phrases)
+    
+    def segment_total(self, i, phrases):
+        """Same as `sum(segment_text.count(p) for p in phrases)` for segment i"""
+        tags = self.segments[i]
+        total = 0
+        for phrase in phrases:
+            next_free = 0
+            for pos in tags.get(phrase, ()):
+                if pos >= next_free:
+                    total += 1
+                    next_free = pos + len(phrase)
+        return total
+
+def analyze_zenconnect_quality(transcription, strictness="moderate", hits=None, rubric=None, timing=None):
+    """
+    Analyze call based on ZenConnect monitoring criteria. The sections and
+    their points come from the rubric; the default one has Opening (5),
+    Handling & Process (20), Knowledge & Accuracy (10), Communication &
+    Language (10) and Closing & Next Steps (5), 50 points in all.
     
     Strictness levels:
     - lenient: More forgiving, gives benefit of doubt
     - moderate: Balanced expectations
     - strict: High standards, less forgiving
-    """
     
-    # Define strictness multipliers for scoring thresholds
-    if strictness == "lenient":
-        threshold_multiplier = 0.7  # Lower thresholds = easier to score
-        bonus_multiplier = 1.3  # More generous bonuses
-    elif strictness == "strict":
-        threshold_multiplier = 1.3  # Higher thresholds = harder to score
-        bonus_multiplier = 0.7  # Less generous bonuses
-    else:  # moderate
-        threshold_multiplier = 1.0
-        bonus_multiplier = 1.0
-    
-    text_lower = transcription.lower()
-    scores = {}
-    detailed_feedback = {}
-    
-    # === OPENING (5 points) ===
-    opening_score = 0
-    opening_details = []
-    
-    # Check for greeting (max 2 points) - Apply strictness
-    greetings = ['hello', 'hi', 'good morning', 'good afternoon', 'good evening', 'thank you for calling', 'thanks for calling']
-    greeting_found = any(greeting in text_lower[:200] for greeting in greetings)
-    
-    if strictness == "lenient":
-        # Lenient: Any greeting gets full points
-        if greeting_found:
-            opening_score += 2 * bonus_multiplier
-            opening_details.append("✓ Professional greeting detected")
-        else:
-            opening_score += 0.5  # Still give some credit
-            opening_details.append("◐ No clear greeting, but being lenient")
-    elif strictness == "strict":
-        # Strict: Must have professional greeting
-        if greeting_found and ('thank you for calling' in text_lower[:200] or 'thanks for calling' in text_lower[:200]):
-            opening_score += 2 * bonus_multiplier
-            opening_details.append("✓ Professional greeting detected")
-        elif greeting_found:
-            opening_score += 0.5
-            opening_details.append("◐ Basic greeting - needs more professionalism")
-        else:
-            opening_details.append("✗ No clear greeting found")
-    else:  # moderate
-        if greeting_found and ('thank you for calling' in text_lower[:200] or 'thanks for calling' in text_lower[:200]):
-            opening_score += 2
-            opening_details.append("✓ Professional greeting detected")
-        elif greeting_found:
-            opening_score += 1
-            opening_details.append("◐ Basic greeting, could be more professional")
-        else:
-            opening_details.append("✗ No clear greeting found")
-    
-    # Check for verification/identity (max 1.5 points) - Apply strictness
-    verify_phrases = ['may i have your', 'can i get your', 'verify', 'confirm your', 'your name', 'account number', 'system id']
-    verify_count = sum(1 for phrase in verify_phrases if phrase in text_lower)
-    
-    if strictness == "lenient":
-        if verify_count >= 1:
-            opening_score += 1.5 * bonus_multiplier
-            opening_details.append("✓ Identity verification attempted")
-        else:
-            opening_score += 0.5
-            opening_details.append("◐ Minimal verification, being lenient")
-    elif strictness == "strict":
-        if verify_count >= 2:
-            opening_score += 1.5 * bonus_multiplier
-            opening_details.append("✓ Identity verification attempted")
-        elif verify_count == 1:
-            opening_score += 0.5
-            opening_details.append("◐ Insufficient verification")
-        else:
-            opening_details.append("✗ No verification detected")
-    else:  # moderate
-        if verify_count >= 2:
-            opening_score += 1.5
-            opening_details.append("✓ Identity verification attempted")
-        elif verify_count == 1:
-            opening_score += 0.75
-            opening_details.append("◐ Minimal verification")
-        else:
-            opening_details.append("✗ No verification detected")
-    
-    # Check for purpose identification (max 1.5 points) - STRICTER
-    purpose_phrases = ['how can i help', 'what can i do', 'how may i assist', "what's the reason", 'what brings you', 'how can i assist']
-    if any(phrase in text_lower[:300] for phrase in purpose_phrases):
-        opening_score += 1.5
-        opening_details.append("✓ Purpose of call identified")
-    else:
-        opening_score += 0
-        opening_details.append("✗ Purpose not clearly identified")
-    
-    scores['opening'] = round(opening_score, 1)
-    detailed_feedback['opening'] = opening_details
-    
-    # === HANDLING & PROCESS (20 points) ===
-    handling_score = 0
-    handling_details = []
-    
-    # Active listening (max 5 points) - MUCH STRICTER
-    listening_phrases = ['i understand', 'i see', 'got it', 'okay', 'right', 'i hear you', 'that makes sense']
-    listening_count = sum(text_lower.count(phrase) for phrase in listening_phrases)
-    if listening_count >= 8:
-        handling_score += 5
-        handling_details.append("✓ Strong active listening demonstrated")
-    elif listening_count >= 5:
-        handling_score += 3
-        handling_details.append("◐ Adequate active listening")
-    elif listening_count >= 2:
-        handling_score += 1.5
-        handling_details.append("◐ Minimal active listening")
-    else:
-        handling_details.append("✗ Limited active listening cues")
-    
-    # Empathy & rapport (max 4 points) - STRICTER
-    empathy_phrases = ['sorry', 'apologize', 'understand your frustration', 'appreciate your patience', 'i can imagine', 'i would feel']
-    empathy_count = sum(text_lower.count(phrase) for phrase in empathy_phrases)
-    if empathy_count >= 4:
-        handling_score += 4
-        handling_details.append("✓ Excellent empathy shown")
-    elif empathy_count >= 2:
-        handling_score += 2
-        handling_details.append("◐ Some empathy demonstrated")
-    elif empathy_count >= 1:
-        handling_score += 1
-        handling_details.append("◐ Minimal empathy")
-    else:
-        handling_details.append("✗ Limited empathy expressed")
-    
-    # Clarifying questions (max 3 points) - STRICTER
-    question_count = text_lower.count('?')
-    clarifying_words = ['what', 'when', 'where', 'how', 'which', 'could you', 'can you']
-    clarify_count = sum(text_lower.count(word) for word in clarifying_words)
-    if clarify_count >= 8 and question_count >= 4:
-        handling_score += 3
-        handling_details.append("✓ Good clarifying questions asked")
-    elif clarify_count >= 5 and question_count >= 2:
-        handling_score += 1.5
-        handling_details.append("◐ Some clarifying questions")
-    elif clarify_count >= 2:
-        handling_score += 0.5
-        handling_details.append("◐ Minimal clarification")
-    else:
-        handling_details.append("✗ No clarifying questions detected")
-    
-    # Hold/transfer protocol (max 4 points) - SAME
-    hold_phrases = ['place you on hold', 'hold for a moment', 'one moment', 'give me a moment', 'bear with me']
-    transfer_phrases = ['transfer you', 'connect you', 'specialist', 'another team']
-    has_hold = any(phrase in text_lower for phrase in hold_phrases)
-    has_transfer = any(phrase in text_lower for phrase in transfer_phrases)
-    
-    if has_hold:
-        handling_score += 2
-        handling_details.append("✓ Proper hold procedure used")
-    if has_transfer:
-        handling_score += 2
-        handling_details.append("✓ Transfer protocol followed")
-    if not has_hold and not has_transfer:
-        handling_score += 4  # No hold/transfer needed
-        handling_details.append("✓ No hold/transfer required")
-    
-    # Process adherence (max 4 points) - STRICTER
-    process_phrases = ['let me check', 'looking into', 'reviewing', 'checking', 'pulling up', 'i will', 'i am going to']
-    process_count = sum(text_lower.count(phrase) for phrase in process_phrases)
-    if process_count >= 3:
-        handling_score += 4
-        handling_details.append("✓ Followed troubleshooting process")
-    elif process_count >= 1:
-        handling_score += 2
-        handling_details.append("◐ Basic process followed")
-    else:
-        handling_score += 0
-        handling_details.append("✗ Process adherence unclear")
-    
-    scores['handling'] = round(min(handling_score, 20), 1)
-    detailed_feedback['handling'] = handling_details
-    
-    # === KNOWLEDGE & ACCURACY (10 points) ===
-    knowledge_score = 0
-    knowledge_details = []
-    
-    # Correct information provided (max 5 points)
-    confidence_phrases = ['the solution is', 'what you need to do', 'here is how', 'the correct', 'the way to']
-    technical_terms = ['system', 'software', 'hardware', 'setting', 'configuration', 'update', 'restart', 'troubleshoot']
-    
-    has_confidence = any(phrase in text_lower for phrase in confidence_phrases)
-    tech_count = sum(text_lower.count(term) for term in technical_terms)
-    
-    if has_confidence and tech_count >= 3:
-        knowledge_score += 5
-        knowledge_details.append("✓ Clear, confident technical guidance")
-    elif has_confidence or tech_count >= 2:
-        knowledge_score += 3
-        knowledge_details.append("◐ Adequate technical information")
-    else:
-        knowledge_score += 1
-        knowledge_details.append("◐ Limited technical detail")
-    
-    # Resources referenced (max 3 points)
-    resource_phrases = ['manual', 'documentation', 'guide', 'article', 'knowledge base', 'faq', 'support page']
-    if any(phrase in text_lower for phrase in resource_phrases):
-        knowledge_score += 3
-        knowledge_details.append("✓ Referenced appropriate resources")
-    else:
-        knowledge_details.append("◐ No external resources mentioned")
-    
-    # Safety/compliance (max 2 points)
-    safety_phrases = ['data protection', 'privacy', 'security', 'backup', 'save your work', 'important to']
-    if any(phrase in text_lower for phrase in safety_phrases):
-        knowledge_score += 2
-        knowledge_details.append("✓ Safety/compliance considerations mentioned")
-    else:
-        knowledge_score += 1
-        knowledge_details.append("◐ Basic safety awareness")
-    
-    scores['knowledge'] = round(min(knowledge_score, 10), 1)
-    detailed_feedback['knowledge'] = knowledge_details
-    
-    # === COMMUNICATION & LANGUAGE (10 points) ===
-    comm_score = 0
-    comm_details = []
-    word_count = len(transcription.split())
-    
-    # Clear language (max 4 points) - MUCH STRICTER on filler words
-    filler_words = len(re.findall(r'\b(um|uh|like|you know|basically|actually|sort of|kind of)\b', text_lower))
-    if word_count > 0:
-        filler_ratio = filler_words / word_count
-        if filler_ratio < 0.01:  # Less than 1% filler words
-            comm_score += 4
-            comm_details.append("✓ Very clear, minimal filler words")
-        elif filler_ratio < 0.025:  # Less than 2.5%
-            comm_score += 2.5
-            comm_details.append("◐ Mostly clear speech")
-        elif filler_ratio < 0.05:  # Less than 5%
-            comm_score += 1
-            comm_details.append("◐ Some filler words present")
-        else:
-            comm_score += 0
-            comm_details.append("✗ Excessive filler words")
-    
-    # Grammar & professionalism (max 3 points) - STRICTER
-    professional_phrases = ['please', 'thank you', 'appreciate', 'certainly', 'absolutely', 'of course']
-    prof_count = sum(text_lower.count(phrase) for phrase in professional_phrases)
-    if prof_count >= 7:
-        comm_score += 3
-        comm_details.append("✓ Excellent professional language")
-    elif prof_count >= 4:
-        comm_score += 2
-        comm_details.append("◐ Professional language used")
-    elif prof_count >= 2:
-        comm_score += 1
-        comm_details.append("◐ Basic professionalism")
-    else:
-        comm_score += 0
-        comm_details.append("✗ Limited professional language")
-    
-    # Tone & pace (max 3 points) - STRICTER on sentence structure
-    sentence_count = len([s for s in transcription.split('.') if s.strip()])
-    avg_sentence_length = word_count / max(sentence_count, 1)
-    
-    if 12 <= avg_sentence_length <= 18:  # Narrower optimal range
-        comm_score += 3
-        comm_details.append("✓ Good pace and tone (estimated)")
-    elif 10 <= avg_sentence_length <= 22:
-        comm_score += 1.5
-        comm_details.append("◐ Acceptable pace")
-    else:
-        comm_score += 0.5
-        comm_details.append("◐ Pace may need adjustment")
-    
-    scores['communication'] = round(min(comm_score, 10), 1)
-    detailed_feedback['communication'] = comm_details
-    
-    # === CLOSING & NEXT STEPS (5 points) ===
-    closing_score = 0
-    closing_details = []
-    
-    # Resolution confirmation (max 2 points) - STRICTER
-    resolution_phrases = ['did that help', 'does that work', 'is that clear', 'solve', 'resolved', 'fixed', 'working now', 'does that answer']
-    resolution_count = sum(1 for phrase in resolution_phrases if phrase in text_lower[-300:])
-    if resolution_count >= 2:
-        closing_score += 2
-        closing_details.append("✓ Confirmed resolution")
-    elif resolution_count >= 1:
-        closing_score += 1
-        closing_details.append("◐ Minimal resolution confirmation")
-    else:
-        closing_details.append("✗ No resolution confirmation")
-    
-    # Additional help offered (max 1.5 points) - STRICTER
-    offer_phrases = ['anything else', 'help you with anything', 'other questions', 'further assistance', 'anything else i can help']
-    if any(phrase in text_lower[-300:] for phrase in offer_phrases):
-        closing_score += 1.5
-        closing_details.append("✓ Offered additional assistance")
-    else:
-        closing_details.append("✗ No offer for additional help")
-    
-    # Follow-up mentioned (max 1.5 points) - STRICTER
-    followup_phrases = ['follow up', 'call back', 'email you', 'reach out', 'contact you', 'ticket number', 'reference number']
-    followup_count = sum(1 for phrase in followup_phrases if phrase in text_lower)
-    if followup_count >= 2:
-        closing_score += 1.5
-        closing_details.append("✓ Follow-up plan established")
-    elif followup_count >= 1:
-        closing_score += 0.75
-        closing_details.append("◐ Basic follow-up mentioned")
-    else:
-        closing_details.append("✗ No specific follow-up mentioned")
-    
-    scores['closing'] = round(closing_score, 1)
-    detailed_feedback['closing'] = closing_details
-    
-    # Calculate total
-    total_score = sum(scores.values())
-    percentage = (total_score / 50) * 100
-    
-    # Collect flagged issues for highlighting
-    flagged_issues = []
-    
-    # Check for critical issues
-    if scores['opening'] < 3:
-        flagged_issues.append({'category': 'Opening', 'issue': 'Poor opening - missing greeting, verification, or purpose', 'severity': 'high'})
-    if scores['handling'] < 12:
-        flagged_issues.append({'category': 'Handling', 'issue': 'Inadequate handling - needs improvement in listening, empathy, or process', 'severity': 'high'})
-    if scores['knowledge'] < 6:
-        flagged_issues.append({'category': 'Knowledge', 'issue': 'Technical knowledge concerns - unclear or incorrect information', 'severity': 'high'})
-    if scores['communication'] < 6:
-        flagged_issues.append({'category': 'Communication', 'issue': 'Communication problems - excessive filler words or unclear speech', 'severity': 'medium'})
-    if scores['closing'] < 3:
-        flagged_issues.append({'category': 'Closing', 'issue': 'Poor closing - no resolution confirmation or follow-up', 'severity': 'high'})
-    
-    # Determine category based on percentage
-    if percentage >= 90:
-        category = "Excellent"
-        category_emoji = "🟢"
-    elif percentage >= 80:
-        category = "Good"
-        category_emoji = "🟢"
-    elif percentage >= 70:
-        category = "Satisfactory"
-        category_emoji = "🟡"
-    elif percentage >= 60:
-        category = "Needs Improvement"
-        category_emoji = "🟠"
-    else:
-        category = "Unsatisfactory"
-        category_emoji = "🔴"
+    The rules, thresholds and strictness levels live in the rubric spec
+    (RUBRIC unless another spec is passed) and are evaluated through its
+    cached compiled plan. hits is an optional RUBRIC_MATCHER scan of the
+    lowercased transcription (TranscriptIndex.call_hits) so an already
+    indexed call is not rescanned. timing is the call's timing_stats();
+    pace, dead air, holds and response latency are scored from it when
+    given, and from the transcript text otherwise.
+    """
     
-    return scores, total_score, percentage, category, category_emoji, detailed_feedback, flagged_issues
+    return rubric_plan(rubric or RUBRIC, strictness).evaluate(transcription, hits, inputs=timing_inputs(timing))
 
 def format_html_report(scores, total, percentage, category, category_emoji, detailed_feedback, flagged_issues, duration_str, word_count, speaking_rate, language):
     """Format a beautiful HTML report"""
@@ -414,7 +271,7 @@ def format_html_report(scores, total, percentage, category, category_emoji, deta
             <div style="text-align: center;">
                 <div style="font-size: 18px; color: #64748b; font-weight: 600; margin-bottom: 15px;">OVERALL SCORE</div>
                 <div style="font-size: 72px; font-weight: 900; color: {score_color}; line-height: 1; margin-bottom: 10px;">
-                    {total:.1f}<span style="font-size: 36px; opacity: 0.7;">/50</span>
+                    {total:.1f}<span style="font-size: 36px; opacity: 0.7;">/{RUBRIC['total_points']}</span>
                 </div>
                 <div style="font-size: 28px; font-weight: 700; color: {score_color}; margin-bottom: 15px;">
                     {percentage:.1f}%
@@ -449,11 +306,7 @@ def format_html_report(scores, total, percentage, category, category_emoji, deta
         <div style="background: rgba(255,255,255,0.15); backdrop-filter: blur(10px); border-radius: 16px; padding: 25px; margin-bottom: 25px;">
             <h2 style="margin: 0 0 20px 0; font-size: 20px; font-weight: 700;">📊 Performance Breakdown</h2>
             
-            {create_score_bar("Opening", scores['opening'], 5)}
-            {create_score_bar("Handling & Process", scores['handling'], 20)}
-            {create_score_bar("Knowledge & Accuracy", scores['knowledge'], 10)}
-            {create_score_bar("Communication & Language", scores['communication'], 10)}
-            {create_score_bar("Closing & Next Steps", scores['closing'], 5)}
+            {"".join(create_score_bar(label, scores[key], maximum) for key, label, maximum in RUBRIC_SECTIONS)}
         </div>
         
         <!-- Flagged Issues Section -->
@@ -463,11 +316,7 @@ def format_html_report(scores, total, percentage, category, category_emoji, deta
         <div style="background: rgba(255,255,255,0.15); backdrop-filter: blur(10px); border-radius: 16px; padding: 25px;">
             <h2 style="margin: 0 0 20px 0; font-size: 20px; font-weight: 700;">💡 Detailed Feedback</h2>
             
-            {create_feedback_section("Opening", detailed_feedback['opening'])}
-            {create_feedback_section("Handling & Process", detailed_feedback['handling'])}
-            {create_feedback_section("Knowledge & Accuracy", detailed_feedback['knowledge'])}
-            {create_feedback_section("Communication & Language", detailed_feedback['communication'])}
-            {create_feedback_section("Closing & Next Steps", detailed_feedback['closing'])}
+            {"".join(create_feedback_section(label, detailed_feedback[key]) for key, label, _maximum in RUBRIC_SECTIONS)}
         </div>
         
     </div>
@@ -475,36 +324,40 @@ def format_html_report(scores, total, percentage, category, category_emoji, deta
     
     return html
 
-def create_flagged_issues_section(flagged_issues):
-    """Create a prominent section showing flagged issues"""
-    if not flagged_issues:
-        return ""
-    
-    html = """
+FLAGGED_SECTION_TEMPLATE = """
     <div style="background: rgba(239, 68, 68, 0.15); backdrop-filter: blur(10px); border-radius: 16px; padding: 25px; margin-bottom: 25px; border: 2px solid #ef4444;">
         <h2 style="margin: 0 0 20px 0; font-size: 20px; font-weight: 700; color: #fee2e2;">🚨 Flagged Issues - Requires Attention</h2>
+    {issues}
+    </div>
     """
-    
-    for issue in flagged_issues:
-        severity_color = "#ef4444" if issue['severity'] == 'high' else "#f59e0b"
-        severity_bg = "rgba(239, 68, 68, 0.2)" if issue['severity'] == 'high' else "rgba(245, 158, 11, 0.2)"
-        severity_label = "HIGH PRIORITY" if issue['severity'] == 'high' else "MEDIUM PRIORITY"
-        
-        html += f"""
+
+FLAGGED_ISSUE_TEMPLATE = """
         <div style="background: {severity_bg}; padding: 15px; border-radius: 12px; margin-bottom: 12px; border-left: 4px solid {severity_color};">
             <div style="display: flex; justify-content: space-between; align-items: start; margin-bottom: 8px;">
-                <span style="font-weight: 700; font-size: 16px; color: white;">⚠️ {issue['category']}</span>
+                <span style="font-weight: 700; font-size: 16px; color: white;">⚠️ {category}</span>
                 <span style="background: {severity_color}; color: white; padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: 700;">{severity_label}</span>
             </div>
-            <div style="color: #fee2e2; line-height: 1.5;">{issue['issue']}</div>
+            <div style="color: #fee2e2; line-height: 1.5;">{issue}</div>
         </div>
         """
+
+def create_flagged_issues_section(flagged_issues):
+    """Create a prominent section showing flagged issues"""
+    if not flagged_issues:
+        return ""
     
-    html += """
-    </div>
-    """
-    
-    return html
+    issues = []
+    for issue in flagged_issues:
+        high = issue['severity'] == 'high'
+        issues.append(FLAGGED_ISSUE_TEMPLATE.format(
+            severity_color="#ef4444" if high else "#f59e0b",
+            severity_bg="rgba(239, 68, 68, 0.2)" if high else "rgba(245, 158, 11, 0.2)",
+            severity_label="HIGH PRIORITY" if high else "MEDIUM PRIORITY",
+            category=issue['category'],
+            issue=issue['issue'],
+        ))
+    
+    return FLAGGED_SECTION_TEMPLATE.format(issues="".join(issues))
 
 def create_score_bar(label, score, max_score):
     """Create a visual score bar"""
@@ -531,35 +384,47 @@ def create_score_bar(label, score, max_score):
     </div>
     """
 
+FEEDBACK_SECTION_TEMPLATE = """
+    <div style="margin-bottom: 20px;">
+        <div style="font-weight: 700; font-size: 16px; margin-bottom: 12px; opacity: 0.95;">▸ {title}</div>
+        {items}
+    </div>
+    """
+
+FEEDBACK_ITEM_TEMPLATE = """
+        <div style="background: {bg}; padding: 10px 15px; border-radius: 8px; margin-bottom: 8px; border-left: 3px solid {color};">
+            <span style="color: {color}; font-weight: 700; margin-right: 8px;">{icon}</span>
+            <span style="color: white;">{text}</span>
+        </div>
+        """
+
+# Icon -> (color, background) for feedback lines
+FEEDBACK_COLORS = {
+    "✓": ("#16a34a", "rgba(22, 163, 74, 0.1)"),
+    "◐": ("#eab308", "rgba(234, 179, 8, 0.1)"),
+    "✗": ("#ef4444", "rgba(239, 68, 68, 0.1)"),
+}
+
 def create_feedback_section(title, feedback_items):
     """Create a feedback section"""
-    items_html = ""
+    items = []
     for item in feedback_items:
         icon = "✓" if item.startswith("✓") else ("◐" if item.startswith("◐") else "✗")
-        
-        if icon == "✓":
-            color = "#16a34a"
-            bg = "rgba(22, 163, 74, 0.1)"
-        elif icon == "◐":
-            color = "#eab308"
-            bg = "rgba(234, 179, 8, 0.1)"
-        else:
-            color = "#ef4444"
-            bg = "rgba(239, 68, 68, 0.1)"
-        
-        items_html += f"""
-        <div style="background: {bg}; padding: 10px 15px; border-radius: 8px; margin-bottom: 8px; border-left: 3px solid {color};">
-            <span style="color: {color}; font-weight: 700; margin-right: 8px;">{icon}</span>
-            <span style="color: white;">{item[2:]}</span>
+        color, bg = FEEDBACK_COLORS[icon]
+        items.append(FEEDBACK_ITEM_TEMPLATE.format(bg=bg, color=color, icon=icon, text=item[2:]))
+    
+    return FEEDBACK_SECTION_TEMPLATE.format(title=title, items="".join(items))
+
+RECOMMENDATION_TEMPLATE = """
+        <div style="background: rgba(255,255,255,0.15); backdrop-filter: blur(10px); border-radius: 12px; padding: 20px; margin-bottom: 15px;">
+            <div style="font-size: 18px; font-weight: 700; margin-bottom: 15px;">{icon} {title}</div>
+            <ul style="margin: 0; padding-left: 20px;">
+        {items}
+            </ul>
         </div>
         """
-    
-    return f"""
-    <div style="margin-bottom: 20px;">
-        <div style="font-weight: 700; font-size: 16px; margin-bottom: 12px; opacity: 0.95;">▸ {title}</div>
-        {items_html}
-    </div>
-    """
+
+RECOMMENDATION_ITEM_TEMPLATE = '<li style="margin-bottom: 8px; line-height: 1.5;">{item}</li>'
 
 def generate_recommendations_html(scores, percentage):
     """Generate recommendations in HTML format"""
@@ -583,88 +448,24 @@ def generate_recommendations_html(scores, percentage):
         title = "IMPROVEMENT OPPORTUNITIES"
         message = "Focus on the areas below to enhance your performance."
     
-    html = f"""
+    parts = [f"""
     <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: linear-gradient(135deg, #4C799B 0%, #3a5f7a 100%); padding: 30px; border-radius: 20px; color: white;">
         
         <div style="background: {bg_color}; border-left: 4px solid {border_color}; padding: 20px; border-radius: 12px; margin-bottom: 25px;">
             <div style="font-size: 20px; font-weight: 700; margin-bottom: 10px;">{icon} {title}</div>
             <div style="font-size: 16px; opacity: 0.9;">{message}</div>
         </div>
-    """
-    
-    # Specific recommendations
-    recommendations = []
-    
-    if scores['opening'] < 4:
-        recommendations.append({
-            'title': 'Opening Improvements',
-            'icon': '🚪',
-            'items': [
-                'Provide a warm, professional greeting',
-                'Always verify customer identity properly',
-                'Clearly identify and acknowledge call purpose'
-            ]
-        })
-    
-    if scores['handling'] < 16:
-        recommendations.append({
-            'title': 'Handling & Process',
-            'icon': '🔧',
-            'items': [
-                'Demonstrate more active listening cues',
-                'Show empathy and build stronger rapport',
-                'Ask clarifying questions to understand fully',
-                'Follow proper hold and transfer protocols'
-            ]
-        })
-    
-    if scores['knowledge'] < 8:
-        recommendations.append({
-            'title': 'Knowledge & Accuracy',
-            'icon': '📚',
-            'items': [
-                'Provide confident, detailed technical solutions',
-                'Reference knowledge base articles when applicable',
-                'Address safety and compliance considerations'
-            ]
-        })
-    
-    if scores['communication'] < 8:
-        recommendations.append({
-            'title': 'Communication Skills',
-            'icon': '💬',
-            'items': [
-                'Reduce use of filler words (um, uh, like)',
-                'Maintain professional language throughout',
-                'Adjust pace for optimal clarity'
-            ]
-        })
-    
-    if scores['closing'] < 4:
-        recommendations.append({
-            'title': 'Closing & Follow-Up',
-            'icon': '✅',
-            'items': [
-                'Always confirm the issue is resolved',
-                'Offer additional assistance proactively',
-                'Establish clear follow-up plans with customer'
-            ]
-        })
-    
-    for rec in recommendations:
-        html += f"""
-        <div style="background: rgba(255,255,255,0.15); backdrop-filter: blur(10px); border-radius: 12px; padding: 20px; margin-bottom: 15px;">
-            <div style="font-size: 18px; font-weight: 700; margin-bottom: 15px;">{rec['icon']} {rec['title']}</div>
-            <ul style="margin: 0; padding-left: 20px;">
-        """
-        
-        for item in rec['items']:
-            html += f'<li style="margin-bottom: 8px; line-height: 1.5;">{item}</li>'
-        
-        html += """
-            </ul>
-        </div>
-        """
+    """]
+    
+    # Coaching for each section scoring below its threshold in the rubric
+    for rec in RUBRIC_RECOMMENDATIONS:
+        if scores[rec['section']] >= rec['below']:
+            continue
+        parts.append(RECOMMENDATION_TEMPLATE.format(
+            icon=rec.get('icon', ''),
+            title=rec['title'],
+            items="".join(RECOMMENDATION_ITEM_TEMPLATE.format(item=item) for item in rec['items']),
+        ))
     
     # Action recommendation
     if percentage < 70:
@@ -677,75 +478,37 @@ def generate_recommendations_html(scores, percentage):
         action_bg = "rgba(22, 163, 74, 0.2)"
         action_text = "📌 RECOMMENDED ACTION: Continue Current Performance"
     
-    html += f"""
+    parts.append(f"""
         <div style="background: {action_bg}; backdrop-filter: blur(10px); border-radius: 12px; padding: 20px; text-align: center; font-size: 18px; font-weight: 700;">
             {action_text}
         </div>
         
     </div>
-    """
+    """)
     
-    return html
+    return "".join(parts)
 
-def transcribe_and_analyze_zenconnect(audio_file, model_choice, strictness_choice, progress=gr.Progress()):
-    """Main function to transcribe and analyze using ZenConnect criteria"""
-    
-    if audio_file is None:
-        return "Please upload an audio file first.", "", ""
-    
-    try:
-        # Map model choice to model name
-        model_map = {
-            "Fast (Tiny - ~1min for 5min audio)": "tiny",
-            "Balanced (Small - ~2min for 5min audio)": "small", 
-            "Accurate (Base - ~3min for 5min audio)": "base"
-        }
-        
-        # Map strictness to multiplier
-        strictness_map = {
-            "Lenient (Generous scoring - Training friendly)": "lenient",
-            "Moderate (Balanced expectations)": "moderate",
-            "Strict (High standards - Quality focused)": "strict"
-        }
-        
-        model_name = model_map.get(model_choice, "small")
-        strictness = strictness_map.get(strictness_choice, "moderate")
-        
-        # Progress: Starting transcription
-        progress(0, desc=f"Loading {model_name} model...")
-        
-        # Load the appropriate model
-        current_model = load_model_if_needed(model_name)
-        
-        # Transcribe
-        progress(0.2, desc="Transcribing audio with Whisper...")
-        result = current_model.transcribe(audio_file, word_timestamps=True)
-        
-        progress(0.5, desc="Audio transcription complete!")
-        
-        transcription = result["text"]
-        language = result["language"]
-        duration = result.get("duration", 0)
-        word_count = len(transcription.split())
-        
-        # Calculate statistics
-        duration_str = str(timedelta(seconds=int(duration))).split('.')[0]
-        speaking_rate = (word_count / duration * 60) if duration > 0 else 0
-        
-        # Analyze using ZenConnect criteria
-        progress(0.7, desc="Analyzing call quality...")
-        scores, total, percentage, category, category_emoji, detailed_feedback, flagged_issues = analyze_zenconnect_quality(transcription, strictness)
-        
-        # Format HTML reports
-        progress(0.85, desc="Generating reports...")
-        quality_html = format_html_report(scores, total, percentage, category, category_emoji, detailed_feedback, flagged_issues,
-                                          duration_str, word_count, speaking_rate, language)
-        
-        recommendations_html = generate_recommendations_html(scores, percentage)
-        
-        # Format transcript with timestamps and issue flags
-        transcript_html = """
-        <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f8fafc; padding: 25px; border-radius: 16px;">
+# Transcript segments share one stylesheet instead of repeating inline styles,
+# which keeps long transcripts several times smaller
+TRANSCRIPT_STYLE = """
+        <style>
+            .zc-seg { padding: 15px; border-radius: 10px; margin-bottom: 12px; border-left: 4px solid #4C799B; background: white; box-shadow: 0 2px 8px rgba(0,0,0,0.05); }
+            .zc-seg-high { border-left-color: #ef4444; background: #fef2f2; }
+            .zc-seg-medium { border-left-color: #f59e0b; background: #fffbeb; }
+            .zc-seg-good { border-left-color: #16a34a; background: #f0fdf4; }
+            .zc-seg-time { font-size: 13px; color: #64748b; font-weight: 600; margin-bottom: 8px; display: flex; align-items: center; justify-content: space-between; }
+            .zc-seg-text { color: #0f172a; line-height: 1.6; }
+            .zc-badge { color: white; padding: 3px 10px; border-radius: 12px; font-size: 11px; font-weight: 700; margin-left: 10px; }
+            .zc-badge-high { background: #ef4444; }
+            .zc-badge-medium { background: #f59e0b; }
+            .zc-badge-good { background: #16a34a; }
+            .zc-speaker { font-size: 11px; font-weight: 700; text-transform: uppercase; letter-spacing: 0.5px; margin-left: 8px; }
+            .zc-speaker-agent { color: #4C799B; }
+            .zc-speaker-customer { color: #94a3b8; }
+        </style>"""
+
+TRANSCRIPT_HEADER_TEMPLATE = """
+        <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f8fafc; padding: 25px; border-radius: 16px;">{style}
             <h3 style="margin: 0 0 10px 0; color: #0f172a; font-size: 20px;">📝 Timestamped Transcript</h3>
             <div style="background: white; padding: 12px; border-radius: 8px; margin-bottom: 20px; border-left: 3px solid #4C799B;">
                 <div style="font-size: 13px; color: #64748b;">
@@ -754,110 +517,316 @@ def transcribe_and_analyze_zenconnect(audio_file, model_choice, strictness_choic
                     <span style="margin-left: 10px;">🟠 Medium Priority</span>
                     <span style="margin-left: 10px;">🟢 Good Section</span>
                 </div>
-            </div>
-        """
+            </div>{page_info}
+"""
+
+TRANSCRIPT_PAGE_INFO_TEMPLATE = """
+            <div style="font-size: 13px; color: #64748b; font-weight: 600; margin-bottom: 15px;">
+                Showing segments {first}–{last} of {total} · Page {page} of {pages}
+            </div>"""
+
+SEGMENT_TEMPLATE = """<div class="zc-seg{kind_class}"><div class="zc-seg-time"><span>[{start_time} → {end_time}]{speaker}</span>{badge}</div><div class="zc-seg-text">{text}</div></div>
+"""
+
+SPEAKER_TEMPLATE = '<span class="zc-speaker zc-speaker-{speaker}">{speaker}</span>'
+
+BADGE_TEMPLATE = '<span class="zc-badge zc-badge-{kind}">{flag} {reason}</span>'
+
+# Static files (the header logo) are served from here with browser caching
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+STATIC_ROUTE = '/static'
+STATIC_MAX_AGE = 7 * 24 * 3600
+LOGO_URL = f"{STATIC_ROUTE}/neurooptimal-logo.webp"
+# 80px/160px variants built by "python zamp_assets.py --responsive"; LOGO_URL stays the fallback
+LOGO_SRCSET = {image_format: f"{STATIC_ROUTE}/responsive/neurooptimal-logo-80.{image_format} 1x, "
+                             f"{STATIC_ROUTE}/responsive/neurooptimal-logo-160.{image_format} 2x"
+               for image_format in ('avif', 'webp')}
+
+# Segments per transcript page in the UI; the browser only receives one page
+TRANSCRIPT_PAGE_SIZE = int(os.environ.get('ZENCONNECT_TRANSCRIPT_PAGE_SIZE', '200'))
+
+def _format_clock(seconds):
+    return str(timedelta(seconds=int(seconds))).split('.')[0]
+
+def transcript_page_count(result, page_size=TRANSCRIPT_PAGE_SIZE):
+    """Number of transcript pages for a result"""
+    return max(1, -(-len(result["segments"]) // page_size)) if page_size else 1
+
+def format_transcript_html(result, scores, page=None, page_size=TRANSCRIPT_PAGE_SIZE, index=None):
+    """
+    Format the timestamped transcript with per-segment issue flags.
+    
+    With page set, only that page of page_size segments is rendered; pass
+    page=None for the whole transcript (used for saved reports). index is the
+    call's TranscriptIndex, built here when not supplied.
+    """
+    
+    if index is None:
+        index = TranscriptIndex(result)
+    
+    segments = result["segments"]
+    total_segments = len(segments)
+    first, last = 0, total_segments
+    page_info = ""
+    if page is not None and page_size:
+        pages = transcript_page_count(result, page_size)
+        page = min(max(int(page), 1), pages)
+        first = (page - 1) * page_size
+        last = min(first + page_size, total_segments)
+        if pages > 1:
+            page_info = TRANSCRIPT_PAGE_INFO_TEMPLATE.format(first=first + 1, last=last, total=total_segments, page=page, pages=pages)
+    
+    parts = [TRANSCRIPT_HEADER_TEMPLATE.format(style=TRANSCRIPT_STYLE, page_info=page_info)]
+    total_duration = result.get("duration", 0)
+    speakers = (result.get('diarization') or {}).get('speakers', 1)
+    
+    for i in range(first, last):
+        segment = segments[i]
         
-        total_duration = duration
+        # Determine if this segment should be flagged
+        flag = None
+        flag_reason = ""
+        kind = None
         
-        for i, segment in enumerate(result["segments"]):
-            start_time = str(timedelta(seconds=int(segment['start']))).split('.')[0]
-            end_time = str(timedelta(seconds=int(segment['end']))).split('.')[0]
-            segment_text = segment['text'].lower()
-            
-            # Determine if this segment should be flagged
-            flag = None
-            flag_reason = ""
-            border_color = "#4C799B"
-            bg_color = "white"
+        # Check opening (first 20% of call)
+        if segment['start'] < (total_duration * 0.2):
+            has_greeting = index.segment_any(i, SEGMENT_GREETINGS)
+            has_verify = index.segment_any(i, SEGMENT_VERIFY_PHRASES)
             
-            # Check opening (first 20% of call)
-            if segment['start'] < (total_duration * 0.2):
-                greetings = ['hello', 'hi', 'good morning', 'good afternoon', 'good evening', 'thank you for calling']
-                verify_phrases = ['may i have', 'can i get', 'verify', 'confirm your', 'your name']
-                
-                has_greeting = any(g in segment_text for g in greetings)
-                has_verify = any(v in segment_text for v in verify_phrases)
-                
-                if not has_greeting and i < 2:
-                    flag = "🔴"
-                    flag_reason = "Missing Greeting"
-                    border_color = "#ef4444"
-                    bg_color = "#fef2f2"
-                elif not has_verify and i < 3 and scores['opening'] < 3:
-                    flag = "🟠"
-                    flag_reason = "No Verification Detected"
-                    border_color = "#f59e0b"
-                    bg_color = "#fffbeb"
-            
-            # Check for excessive filler words throughout
-            filler_words = ['um', 'uh', 'like', 'you know', 'basically', 'actually']
-            filler_count = sum(segment_text.count(f' {word} ') for word in filler_words)
-            word_count_segment = len(segment['text'].split())
-            
-            if word_count_segment > 10 and filler_count / word_count_segment > 0.15:
-                if not flag:  # Don't override existing flags
-                    flag = "🟠"
-                    flag_reason = "Excessive Filler Words"
-                    border_color = "#f59e0b"
-                    bg_color = "#fffbeb"
-            
-            # Check for empathy/professionalism issues
-            negative_phrases = ['whatever', "don't care", "not my problem", "can't help"]
-            if any(phrase in segment_text for phrase in negative_phrases):
+            if not has_greeting and i < 2:
                 flag = "🔴"
-                flag_reason = "Unprofessional Language"
-                border_color = "#ef4444"
-                bg_color = "#fef2f2"
-            
-            # Check closing (last 20% of call)
-            if segment['start'] > (total_duration * 0.8):
-                resolution_phrases = ['did that help', 'does that work', 'is that clear', 'resolved', 'fixed']
-                followup_phrases = ['anything else', 'further assistance', 'follow up', 'call back']
-                
-                has_resolution = any(r in segment_text for r in resolution_phrases)
-                has_followup = any(f in segment_text for f in followup_phrases)
-                
-                if has_resolution or has_followup:
-                    if not flag:  # Mark good sections
-                        flag = "🟢"
-                        flag_reason = "Good Closing"
-                        border_color = "#16a34a"
-                        bg_color = "#f0fdf4"
-                elif scores['closing'] < 3 and i == len(result["segments"]) - 1:
-                    flag = "🔴"
-                    flag_reason = "Poor Closing - No Resolution or Follow-up"
-                    border_color = "#ef4444"
-                    bg_color = "#fef2f2"
-            
-            # Build the segment HTML with flags
-            flag_badge = ""
-            if flag:
-                flag_badge = f'<span style="background: {border_color}; color: white; padding: 3px 10px; border-radius: 12px; font-size: 11px; font-weight: 700; margin-left: 10px;">{flag} {flag_reason}</span>'
-            
-            transcript_html += f"""
-            <div style="background: {bg_color}; padding: 15px; border-radius: 10px; margin-bottom: 12px; border-left: 4px solid {border_color}; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                <div style="font-size: 13px; color: #64748b; font-weight: 600; margin-bottom: 8px; display: flex; align-items: center; justify-content: space-between;">
-                    <span>[{start_time} → {end_time}]</span>
-                    {flag_badge}
-                </div>
-                <div style="color: #0f172a; line-height: 1.6;">
-                    {segment['text']}
-                </div>
-            </div>
-            """
+                flag_reason = "Missing Greeting"
+                kind = "high"
+            elif not has_verify and i < 3 and scores.get('opening', 3) < 3:
+                flag = "🟠"
+                flag_reason = "No Verification Detected"
+                kind = "medium"
         
-        transcript_html += "</div>"
+        # Check for excessive filler words throughout
+        filler_count = index.segment_total(i, SEGMENT_FILLER_PATTERNS)
+        word_count_segment = len(segment['text'].split())
         
-        progress(1.0, desc="Analysis complete!")
+        if word_count_segment > 10 and filler_count / word_count_segment > 0.15:
+            if not flag:  # Don't override existing flags
+                flag = "🟠"
+                flag_reason = "Excessive Filler Words"
+                kind = "medium"
         
-        return quality_html, recommendations_html, transcript_html
+        # Check for empathy/professionalism issues
+        if index.segment_any(i, NEGATIVE_PHRASES):
+            flag = "🔴"
+            flag_reason = "Unprofessional Language"
+            kind = "high"
         
-    except Exception as e:
-        error_html = f"""
+        # Check closing (last 20% of call)
+        if segment['start'] > (total_duration * 0.8):
+            has_resolution = index.segment_any(i, SEGMENT_RESOLUTION_PHRASES)
+            has_followup = index.segment_any(i, SEGMENT_FOLLOWUP_PHRASES)
+            
+            if has_resolution or has_followup:
+                if not flag:  # Mark good sections
+                    flag = "🟢"
+                    flag_reason = "Good Closing"
+                    kind = "good"
+            elif scores.get('closing', 3) < 3 and i == total_segments - 1:
+                flag = "🔴"
+                flag_reason = "Poor Closing - No Resolution or Follow-up"
+                kind = "high"
+        
+        # Only the agent's turns are flagged on a diarized call
+        if speakers > 1 and segment['speaker'] == CUSTOMER:
+            flag = None
+            kind = None
+        
+        # Build the segment HTML with flags
+        parts.append(SEGMENT_TEMPLATE.format(
+            kind_class=f" zc-seg-{kind}" if kind else "",
+            start_time=_format_clock(segment['start']),
+            end_time=_format_clock(segment['end']),
+            badge=BADGE_TEMPLATE.format(kind=kind, flag=flag, reason=flag_reason) if flag else "",
+            speaker=SPEAKER_TEMPLATE.format(speaker=segment['speaker']) if speakers > 1 else "",
+            text=escape(segment['text'], quote=False),
+        ))
+    
+    parts.append("</div>")
+    return "".join(parts)
+
+def build_reports(result, strictness="moderate", timer=None, transcript_page=None):
+    """
+    Score a Whisper result and build the quality, recommendations and
+    transcript reports. transcript_page limits the transcript to one page
+    of TRANSCRIPT_PAGE_SIZE segments; None renders all of it.
+    """
+    
+    timer = timer or StageTimer()
+    transcription = result["text"]
+    duration = result.get("duration", 0)
+    skipped_seconds = result.get("vad", {}).get("skipped_seconds", 0)
+    word_count = len(transcription.split())
+    if skipped_seconds:
+        timer.skipped_seconds = skipped_seconds
+    
+    # Index phrase hits once; scoring and the transcript flags both read it.
+    # A diarized call is scored on the agent's turns only. Pace, dead air
+    # and holds come from the word timestamps.
+    with timer.stage('scoring'):
+        scored_text = agent_text(result)
+        index = TranscriptIndex(result, scored_text)
+        timing = timing_stats(result, HOLD_PHRASES, index)
+        evaluation = analyze_zenconnect_quality(scored_text, strictness, hits=index.call_hits, timing=timing)
+    if timing:
+        speaking_rate = timing['speech_wpm']
+    else:
+        speaking_rate = (word_count / duration * 60) if duration > 0 else 0
+    
+    call = {
+        'duration': duration,
+        'skipped_seconds': skipped_seconds,
+        'word_count': word_count,
+        'speaking_rate': speaking_rate,
+        'language': result["language"],
+        'conversation': result.get('diarization'),
+        'timing': timing,
+        'scored_text': scored_text,
+        'index': index,
+    }
+    with timer.stage('html'):
+        return render_reports(result, call, evaluation, transcript_page)
+
+def render_reports(result, call, evaluation, transcript_page=None):
+    """
+    build_reports' result for a call: the call's stats (call) with one
+    analyze_zenconnect_quality() evaluation of it and the three HTML reports
+    """
+    
+    scores, total, percentage, category, category_emoji, detailed_feedback, flagged_issues = evaluation
+    duration_str = str(timedelta(seconds=int(call['duration']))).split('.')[0]
+    timing = call['timing']
+    quality_html = format_html_report(scores, total, percentage, category, category_emoji, detailed_feedback, flagged_issues,
+                                      duration_str, call['word_count'], call['speaking_rate'], call['language'])
+    if timing:
+        quality_html += format_timing_html(timing)
+    if call['conversation']:
+        quality_html += format_conversation_html(call['conversation'])
+    
+    return dict(
+        call,
+        scores=scores,
+        total=total,
+        percentage=percentage,
+        category=category,
+        category_emoji=category_emoji,
+        detailed_feedback=detailed_feedback,
+        flagged_issues=flagged_issues,
+        quality_html=quality_html,
+        recommendations_html=generate_recommendations_html(scores, percentage),
+        transcript_html=format_transcript_html(result, scores, page=transcript_page, index=call['index']),
+    )
+
+def format_timing_html(timing):
+    """Pace-per-minute chart and dead air, hold and response-time stats for one call"""
+    rated = [wpm for wpm in timing['wpm_per_minute'] if wpm is not None]
+    top = max(rated, default=0) or 1
+    bars = "".join(
+        f'<div title="Minute {minute + 1}: {wpm} wpm" style="flex: 1; background: #4C799B; border-radius: 3px 3px 0 0; height: {wpm / top * 100:.0f}%;"></div>'
+        if wpm is not None else
+        f'<div title="Minute {minute + 1}: not enough speech" style="flex: 1; background: #e2e8f0; height: 4%;"></div>'
+        for minute, wpm in enumerate(timing['wpm_per_minute']))
+    
+    announced = len(timing['holds']) - timing['unannounced_holds']
+    holds = (f"{len(timing['holds'])} · {_format_clock(timing['hold_seconds'])} total"
+             f" · {announced} announced" if timing['holds'] else "none")
+    latency = (f"{timing['response_latency']:.1f}s avg · {timing['slow_responses']} slow"
+               if timing['response_latency'] is not None else "needs speaker labels")
+    return f"""
+    <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f8fafc; border-radius: 16px; padding: 15px 25px; margin-top: 15px; color: #0f172a;">
+        <div style="font-weight: 700; font-size: 16px; margin-bottom: 10px;">⏱️ Pace & Silence — from word timings</div>
+        <div style="display: flex; align-items: flex-end; gap: 2px; height: 60px; margin-bottom: 8px;">{bars}</div>
+        <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 10px; font-size: 14px;">
+            <div><strong>Pace</strong><br>{timing['speech_wpm']:.0f} wpm · ±{timing['wpm_spread']:.0f} per minute</div>
+            <div><strong>Dead air</strong><br>{len(timing['dead_air'])} gaps · {timing['dead_air_seconds']:.0f}s · longest {timing['longest_dead_air']:.0f}s</div>
+            <div><strong>Holds</strong><br>{holds}</div>
+            <div><strong>Response time</strong><br>{latency}</div>
+        </div>
+    </div>
+    """
+
+def format_conversation_html(conversation):
+    """Talk-time and interruption panel for a diarized call"""
+    if conversation['speakers'] < 2:
+        return f"""
+    <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f8fafc; border-radius: 16px; padding: 15px 25px; margin-top: 15px; color: #475569; font-size: 14px;">
+        🎙️ Only one voice detected — the whole call was scored as the agent.
+    </div>
+    """
+    
+    agent_share = conversation['talk_ratio'] * 100
+    return f"""
+    <div style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f8fafc; border-radius: 16px; padding: 15px 25px; margin-top: 15px; color: #0f172a;">
+        <div style="font-weight: 700; font-size: 16px; margin-bottom: 10px;">🎙️ Conversation — scored on the agent's turns only</div>
+        <div style="background: #e2e8f0; border-radius: 8px; height: 14px; overflow: hidden; margin-bottom: 8px;">
+            <div style="background: #4C799B; height: 100%; width: {agent_share:.0f}%;"></div>
+        </div>
+        <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 10px; font-size: 14px;">
+            <div><strong>Agent talk</strong><br>{_format_clock(conversation['agent_talk_seconds'])} ({agent_share:.0f}%)</div>
+            <div><strong>Customer talk</strong><br>{_format_clock(conversation['customer_talk_seconds'])} ({100 - agent_share:.0f}%)</div>
+            <div><strong>Turns</strong><br>{conversation['turns']} · longest agent turn {conversation['longest_agent_turn']:.0f}s</div>
+            <div><strong>Interruptions</strong><br>agent {conversation['agent_interruptions']} · customer {conversation['customer_interruptions']}</div>
+        </div>
+    </div>
+    """
+
+def format_performance_html(performance):
+    """Create a collapsible panel with per-stage timings for one analysis"""
+    stage_labels = {
+        'cache': 'Transcript cache lookup',
+        'model_load': 'Model load',
+        'audio_load': 'Audio load',
+        'decode': 'Decode (Whisper)',
+        'diarize': 'Speaker diarization',
+        'scoring': 'Scoring',
+        'html': 'HTML generation',
+    }
+    total = performance['total_seconds'] or 0
+    
+    rows = []
+    for name, stage in performance['stages'].items():
+        share = (stage['seconds'] / total * 100) if total > 0 else 0
+        calls = f" ×{stage['calls']}" if stage['calls'] > 1 else ""
+        peak = f"{stage['peak_rss_mb']:.0f} MB" if stage['peak_rss_mb'] is not None else "–"
+        rows.append(f"""
+            <tr>
+                <td style="padding: 6px 10px;">{stage_labels.get(name, name)}{calls}</td>
+                <td style="padding: 6px 10px; text-align: right;">{stage['seconds']:.2f}s</td>
+                <td style="padding: 6px 10px; text-align: right;">{share:.0f}%</td>
+                <td style="padding: 6px 10px; text-align: right;">{peak}</td>
+            </tr>""")
+    
+    rtf = f"{performance['rtf']:.2f}×" if performance['rtf'] is not None else "cached"
+    peak = f"{performance['peak_rss_mb']:.0f} MB" if performance['peak_rss_mb'] is not None else "–"
+    skipped = f" · {performance['skipped_seconds']:.0f}s non-speech skipped" if performance.get('skipped_seconds') else ""
+    
+    return f"""
+    <details style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; background: #f8fafc; border-radius: 16px; padding: 15px 25px; margin-top: 15px; color: #0f172a;">
+        <summary style="cursor: pointer; font-weight: 700; font-size: 16px;">⚡ Performance — {total:.2f}s total · real-time factor {rtf} · peak {peak}{skipped}</summary>
+        <table style="width: 100%; border-collapse: collapse; margin-top: 12px; font-size: 14px;">
+            <tr style="color: #64748b; text-align: left;">
+                <th style="padding: 6px 10px;">Stage</th>
+                <th style="padding: 6px 10px; text-align: right;">Time</th>
+                <th style="padding: 6px 10px; text-align: right;">Share</th>
+                <th style="padding: 6px 10px; text-align: right;">Peak RSS</th>
+            </tr>{"".join(rows)}
+        </table>
+    </details>
+    """
+
+def format_error_html(error):
+    """Format an error message for the quality report area"""
+    return f"""
         <div style="padding: 30px; background: #fee2e2; border-radius: 16px; color: #991b1b;">
             <h3>❌ Error Processing Audio</h3>
             <p>An error occurred while processing your audio file:</p>
-            <p><strong>{str(e)}</strong></p>
+            <p><strong>{str(error)}</strong></p>
             <p>Please make sure:</p>
             <ul>
                 <li>The file is a valid audio format (MP3, WAV, M4A, etc.)</li>
@@ -866,7 +835,480 @@ def transcribe_and_analyze_zenconnect(audio_file, model_choice, strictness_choic
             </ul>
         </div>
         """
-        return error_html, "", ""
+
+def _analyze_call(audio_file, model_name, strictness, show_performance, transcript_page, progress=None):
+    """Transcribe (or load from cache), score and render one call"""
+    if progress is None:
+        progress = no_progress
+    timer = StageTimer(call=os.path.basename(audio_file), model=model_name)
+    
+    # Reuse a cached transcript when this recording was already transcribed
+    progress(0, desc="Checking transcript cache...")
+    with timer.stage('cache'):
+        cache_key = transcript_key(audio_file, model_name)
+        result = transcript_cache.get(cache_key)
+    
+    if result is None:
+        # Progress: Starting transcription
+        progress(0.05, desc=f"Loading {model_name} model...")
+        with timer.stage('model_load'):
+            load_model_if_needed(model_name)
+        
+        # Transcribe
+        progress(0.2, desc="Transcribing audio with Whisper...")
+        result = transcribe_file(audio_file, model_name, timer)
+        diarize_if_enabled(result, audio_file, timer)
+        transcript_cache.put(cache_key, result, source=transcript_cache.source(audio_file, model_name))
+        
+        progress(0.5, desc="Audio transcription complete!")
+    else:
+        progress(0.5, desc="Loaded cached transcript")
+        if diarize_if_enabled(result, audio_file, timer):
+            transcript_cache.put(cache_key, result)
+    
+    # Score and format HTML reports
+    progress(0.7, desc="Analyzing call quality...")
+    timer.audio_seconds = result.get("duration")
+    reports = build_reports(result, strictness, timer, transcript_page)
+    performance = timer.finish()
+    
+    progress(1.0, desc="Analysis complete!")
+    
+    quality_html = reports['quality_html']
+    if show_performance:
+        quality_html += format_performance_html(performance)
+    transcript_state = {'result': result, 'scores': reports['scores'], 'index': reports['index'], 'reports': reports}
+    return quality_html, reports['recommendations_html'], reports['transcript_html'], transcript_state
+
+def transcribe_and_analyze_zenconnect(audio_file, model_choice, strictness_choice, show_performance=False, progress=None):
+    """Main function to transcribe and analyze using ZenConnect criteria"""
+    
+    if audio_file is None:
+        return "Please upload an audio file first.", "", ""
+    
+    try:
+        model_name = MODEL_CHOICES.get(model_choice, "small")
+        strictness = STRICTNESS_CHOICES.get(strictness_choice, DEFAULT_STRICTNESS)
+        return _analyze_call(audio_file, model_name, strictness, show_performance, None, progress)[:3]
+        
+    except Exception as e:
+        return format_error_html(e), "", ""
+
+def _chunk_bounds(audio, sample_rate, chunk_seconds, search_seconds=5):
+    """
+    Split audio into chunks of at most chunk_seconds, cutting each one at the
+    quietest 100 ms frame in the last search_seconds before the nominal
+    boundary so words are not split between chunks
+    """
+    total = len(audio)
+    chunk = int(chunk_seconds * sample_rate)
+    search = min(int(search_seconds * sample_rate), chunk // 2)
+    frame = sample_rate // 10
+    bounds = []
+    start = 0
+    while total - start > chunk:
+        lo = start + chunk - search
+        window = audio[lo:start + chunk]
+        frames = len(window) // frame
+        if frames:
+            energy = np.square(window[:frames * frame].reshape(frames, frame)).mean(axis=1)
+            cut = lo + int(np.argmin(energy)) * frame + frame // 2
+        else:
+            cut = start + chunk
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
+
+
+def transcribe_stream(audio_file, model_name, chunk_seconds=STREAM_CHUNK_SECONDS, timer=None):
+    """
+    Transcribe a recording chunk by chunk, yielding the growing result and
+    the fraction of audio decoded after each chunk.
+    
+    The audio is read from the memory-mapped PCM cache, so only the current
+    chunk is held as float32. Segment and word timestamps are shifted back
+    onto the original timeline, the tail of the transcript so far is passed
+    as the prompt for the next chunk, and the language detected on the first
+    chunk is reused.
+    """
+    timer = timer or StageTimer()
+    with timer.stage('audio_load'):
+        audio = audio_cache.open(audio_file)
+    try:
+        sample_rate = audio.sample_rate
+        timer.audio_seconds = len(audio) / sample_rate
+        options = dict(TRANSCRIBE_OPTIONS)
+        result = {'text': '', 'segments': [], 'language': None, 'duration': 0}
+        
+        for start, end in _chunk_bounds(audio, sample_rate, chunk_seconds):
+            offset = start / sample_rate
+            if result['text']:
+                options['initial_prompt'] = result['text'][-200:]
+            
+            # Hold the model per chunk so other requests can interleave
+            with model_pool.acquire(model_name) as current_model:
+                with timer.stage('decode'):
+                    chunk = current_model.transcribe(audio[start:end], **options)
+            
+            # Fix the language from the first chunk that had speech in it
+            if 'language' not in options and chunk['segments']:
+                options['language'] = chunk['language']
+            result['language'] = options.get('language', chunk['language'])
+            if 'vad' in chunk:
+                vad = result.setdefault('vad', {'speech_seconds': 0, 'skipped_seconds': 0})
+                vad['speech_seconds'] = round(vad['speech_seconds'] + chunk['vad']['speech_seconds'], 2)
+                vad['skipped_seconds'] = round(vad['skipped_seconds'] + chunk['vad']['skipped_seconds'], 2)
+            
+            for segment in chunk['segments']:
+                segment['id'] = len(result['segments'])
+                segment['start'] += offset
+                segment['end'] += offset
+                for word in segment.get('words', []):
+                    word['start'] += offset
+                    word['end'] += offset
+                result['segments'].append(segment)
+            result['text'] += chunk['text']
+            result['duration'] = end / sample_rate
+            
+            yield result, end / max(len(audio), 1)
+    finally:
+        audio.close()
+
+def transcribe_file(audio_file, model_name, timer=None):
+    """Transcribe a whole recording in DECODE_WINDOW_SECONDS windows and return the result"""
+    result = None
+    for result, _done in transcribe_stream(audio_file, model_name, DECODE_WINDOW_SECONDS, timer):
+        pass
+    return result
+
+def completion_status(result):
+    """Status line for a finished analysis, noting any audio the VAD skipped"""
+    skipped = result.get('vad', {}).get('skipped_seconds')
+    if skipped:
+        return f"Analysis complete! Skipped {timedelta(seconds=int(skipped))} of silence and hold music before decoding."
+    return "Analysis complete!"
+
+def stream_transcribe_and_analyze_zenconnect(audio_file, model_choice, strictness_choice, stream_results, show_performance=False, progress=None):
+    """Gradio handler form of analyze_call_stream(), taking dropdown labels"""
+    
+    model_name = MODEL_CHOICES.get(model_choice, "small")
+    strictness = STRICTNESS_CHOICES.get(strictness_choice, DEFAULT_STRICTNESS)
+    yield from analyze_call_stream(audio_file, model_name, strictness, stream_results, show_performance, progress)
+
+def analyze_call_stream(audio_file, model_name, strictness, stream_results, show_performance=False, progress=None):
+    """
+    Re-score and re-render the reports while the call decodes (after the
+    first chunk, then every STREAM_SCORE_EVERY chunks), so the opening of a
+    long call is visible while the rest is still transcribing. Scoring the
+    whole transcript after every chunk would make a long call quadratic.
+    Falls back to one-shot analysis when streaming is switched off. Yields
+    (quality, recommendations, transcript, status, transcript_state); only
+    the first transcript page is rendered, and transcript_state (set on the
+    final yield) is what render_transcript_page() pages through.
+    """
+    
+    if audio_file is None:
+        yield "Please upload an audio file first.", "", "", "Please upload an audio file first.", None
+        return
+    if progress is None:
+        progress = no_progress
+    
+    try:
+        if not stream_results:
+            quality_html, recommendations_html, transcript_html, transcript_state = _analyze_call(
+                audio_file, model_name, strictness, show_performance, 1, progress)
+            yield quality_html, recommendations_html, transcript_html, completion_status(transcript_state['result']), transcript_state
+            return
+        
+        timer = StageTimer(call=os.path.basename(audio_file), model=model_name)
+        
+        # A full transcript from either mode is good enough to skip decoding
+        progress(0, desc="Checking transcript cache...")
+        with timer.stage('cache'):
+            cache_key = stream_key = transcript_key(audio_file, model_name, STREAM_CHUNK_SECONDS)
+            result = transcript_cache.get(stream_key)
+            if result is None:
+                cache_key = transcript_key(audio_file, model_name)
+                result = transcript_cache.get(cache_key)
+        
+        if result is None:
+            progress(0.05, desc=f"Loading {model_name} model...")
+            with timer.stage('model_load'):
+                load_model_if_needed(model_name)
+            reports = None
+            for chunk_number, (result, done) in enumerate(transcribe_stream(audio_file, model_name, timer=timer)):
+                if done >= 1:
+                    continue  # the finished transcript is scored once below
+                if chunk_number % STREAM_SCORE_EVERY == 0:
+                    reports = build_reports(result, strictness, timer, transcript_page=1)
+                decoded = str(timedelta(seconds=int(result['duration'])))
+                progress(done, desc=f"Transcribed {decoded} so far...")
+                yield (reports['quality_html'], reports['recommendations_html'], reports['transcript_html'],
+                       f"Transcribing... {done * 100:.0f}% decoded ({decoded}). Scores are provisional until the call is complete.",
+                       None)
+            diarize_if_enabled(result, audio_file, timer)
+            transcript_cache.put(stream_key, result, source=transcript_cache.source(audio_file, model_name))
+        elif diarize_if_enabled(result, audio_file, timer):
+            transcript_cache.put(cache_key, result)
+        
+        timer.audio_seconds = timer.audio_seconds or result.get("duration")
+        reports = build_reports(result, strictness, timer, transcript_page=1)
+        performance = timer.finish()
+        progress(1.0, desc="Analysis complete!")
+        
+        quality_html = reports['quality_html']
+        if show_performance:
+            quality_html += format_performance_html(performance)
+        transcript_state = {'result': result, 'scores': reports['scores'], 'index': reports['index'], 'reports': reports}
+        yield quality_html, reports['recommendations_html'], reports['transcript_html'], completion_status(result), transcript_state
+        
+    except JobCancelled:
+        raise
+    except Exception as e:
+        yield format_error_html(e), "", "", f"Error: {e}", None
+
+def render_transcript_page(transcript_state, page):
+    """Render another page of the last analyzed transcript"""
+    if not transcript_state:
+        return ""
+    return format_transcript_html(transcript_state['result'], transcript_state['scores'], page=int(page or 1),
+                                  index=transcript_state['index'])
+
+def rescore_transcript(transcript_state, strictness_choice, page=1):
+    """
+    Score the last analyzed call again at another strictness. The rubric
+    plan is re-evaluated on the state's cached hits and timing, so nothing
+    is transcribed or queued. Returns the three reports and the new state.
+    """
+    
+    reports = transcript_state['reports']
+    strictness = STRICTNESS_CHOICES.get(strictness_choice, DEFAULT_STRICTNESS)
+    evaluation = rubric_plan(RUBRIC, strictness).evaluate(reports['scored_text'], reports['index'].call_hits,
+                                                          inputs=timing_inputs(reports['timing']))
+    reports = render_reports(transcript_state['result'], reports, evaluation, transcript_page=int(page or 1))
+    transcript_state = dict(transcript_state, scores=reports['scores'], reports=reports)
+    return reports['quality_html'], reports['recommendations_html'], reports['transcript_html'], transcript_state
+
+# Finished jobs' transcript state by job ID, so their transcripts can be paged
+RECENT_JOB_TRANSCRIPTS = 16
+_job_transcripts = OrderedDict()
+_job_transcripts_lock = threading.Lock()
+
+def run_analysis_job(params, progress):
+    """JobQueue runner: analyze one call, publishing partial reports while it streams"""
+    
+    def report(fraction, desc=None):
+        progress(fraction, desc)
+    
+    payload = None
+    transcript_state = None
+    for quality_html, recommendations_html, transcript_html, status, transcript_state in analyze_call_stream(
+            params['audio_file'], params['model'], params['strictness'], params['stream_results'],
+            params['show_performance'], report):
+        payload = {
+            'quality_html': quality_html,
+            'recommendations_html': recommendations_html,
+            'transcript_html': transcript_html,
+            'status': status,
+        }
+        if transcript_state is None:
+            progress(message=status, partial=payload)
+    
+    if transcript_state is not None:
+        with _job_transcripts_lock:
+            _job_transcripts[params['job_id']] = transcript_state
+            while len(_job_transcripts) > RECENT_JOB_TRANSCRIPTS:
+                _job_transcripts.popitem(last=False)
+        save_call_result(params['audio_file'], transcript_state['reports'], params['model'], params['strictness'],
+                         params.get('agent'), params.get('call_date'))
+    return payload
+
+# Every finished analysis is kept for the Results tab and cross-call queries
+results_store = ResultsStore(
+    os.environ.get('ZENCONNECT_RESULTS_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zenconnect_results.sqlite3'))
+)
+
+def save_call_result(audio_file, reports, model_name, strictness, agent=None, call_date=None):
+    """Record an analyzed call in the results store; a failure here never fails the analysis"""
+    try:
+        results_store.record(transcript_cache.audio_digest(audio_file), reports, file=os.path.basename(audio_file),
+                             agent=agent, call_date=call_date or recording_date(audio_file),
+                             model=model_name, strictness=strictness)
+    except Exception:
+        logging.getLogger(__name__).exception("Could not save results for %s", audio_file)
+
+# Analyses run as queued jobs on a few worker threads; ZENCONNECT_JOB_CONCURRENCY
+# caps simultaneous jobs per model, e.g. "tiny=2,small=1" (default 1 each)
+job_queue = JobQueue(
+    os.environ.get('ZENCONNECT_JOB_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.zenconnect_jobs.sqlite3')),
+    run_analysis_job,
+    workers=int(os.environ.get('ZENCONNECT_JOB_WORKERS', '2')),
+    concurrency=parse_concurrency(os.environ.get('ZENCONNECT_JOB_CONCURRENCY'))
+)
+JOB_POLL_SECONDS = float(os.environ.get('ZENCONNECT_JOB_POLL_SECONDS', '1'))
+
+def submit_analysis_job(audio_file, model_choice, strictness_choice, stream_results, show_performance=False,
+                        agent="", call_date=""):
+    """Queue an analysis and return its job ID for the UI to poll"""
+    
+    if audio_file is None:
+        return "", "Please upload an audio file first."
+    call_date = (call_date or "").strip()
+    if call_date:
+        try:
+            date.fromisoformat(call_date)
+        except ValueError:
+            return "", f"Call date must look like 2024-05-31, not '{call_date}'."
+    
+    model_name = MODEL_CHOICES.get(model_choice, "small")
+    strictness = STRICTNESS_CHOICES.get(strictness_choice, DEFAULT_STRICTNESS)
+    job_queue.start()
+    job_id = job_queue.submit(model_name, audio_file=audio_file, strictness=strictness,
+                              stream_results=bool(stream_results), show_performance=bool(show_performance),
+                              agent=(agent or "").strip(), call_date=call_date or None)
+    return job_id, f"Job {job_id} queued."
+
+def format_job_status(status):
+    """One-line status text for a job"""
+    
+    job_id, state = status['id'], status['status']
+    if state == QUEUED:
+        waiting = f"{status['ahead']} job(s) ahead" if status['ahead'] else "waiting"
+        return f"Job {job_id} queued ({waiting}, {status['model']} model)."
+    if state == RUNNING:
+        note = " Cancelling..." if status['cancel_requested'] else ""
+        return f"Job {job_id}: {status['message'] or 'Running...'} ({status['progress'] * 100:.0f}%){note}"
+    if state == FAILED:
+        return f"Job {job_id} failed: {status['error']}"
+    if state == CANCELLED:
+        return f"Job {job_id} was cancelled."
+    return f"Job {job_id}: {status['message'] or 'Analysis complete!'}"
+
+def watch_job(job_id, progress=None):
+    """Poll a job by ID, showing partial reports while it runs and the final reports once done"""
+    
+    if progress is None:
+        progress = no_progress
+    job_id = (job_id or "").strip()
+    status = job_queue.status(job_id) if job_id else None
+    if status is None:
+        yield "", "", "", "Unknown job ID." if job_id else "No job to check.", None
+        return
+    
+    seen = None
+    while True:
+        status = job_queue.status(job_id)
+        finished = status['status'] in FINISHED_STATES
+        if finished or seen != (status['status'], status['message'], status['progress']):
+            seen = (status['status'], status['message'], status['progress'])
+            progress(status['progress'], desc=status['message'] or status['status'].capitalize())
+            result = job_queue.result(job_id) or {}
+            text = format_job_status(status)
+            if status['status'] == FAILED:
+                yield format_error_html(status['error']), "", "", text, None
+            else:
+                with _job_transcripts_lock:
+                    transcript_state = _job_transcripts.get(job_id) if finished else None
+                yield (result.get('quality_html', ""), result.get('recommendations_html', ""),
+                       result.get('transcript_html', ""), text, transcript_state)
+        if finished:
+            return
+        time.sleep(JOB_POLL_SECONDS)
+
+def cancel_job(job_id):
+    """Cancel a queued or running job"""
+    job_id = (job_id or "").strip()
+    if not job_id:
+        return "No job to cancel."
+    if job_queue.cancel(job_id):
+        return f"Cancellation requested for job {job_id}."
+    status = job_queue.status(job_id)
+    return format_job_status(status) if status else "Unknown job ID."
+
+# Scoring Methodology panel: one card per rubric section
+METHODOLOGY_CARD_TEMPLATE = """<div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
+                            <div style="font-weight: 700; color: #4C799B; margin-bottom: 5px;">{label}</div>
+                            <div style="font-size: 24px; font-weight: 900; color: #1e293b;">{points:g} pts</div>
+                        </div>"""
+
+# Results tab: filters over the results store
+SECTION_LABELS = {key: label for key, label, _maximum in RUBRIC_SECTIONS}
+ANY_CHOICE = "Any"
+PERIOD_CHOICES = ["Any time", "Today", "Last 7 days", "This month", "Last 30 days", "This year"]
+RESULT_GROUP_CHOICES = {"No grouping": None, **{name.title(): name for name in GROUP_COLUMNS}}
+RESULT_HEADERS = ["Date", "Agent", "File", "Category", "%", *SECTION_LABELS.values(), "Flagged", "Language", "Duration", "WPM"]
+
+def _period_start(period, today=None):
+    today = today or date.today()
+    if period == "Today":
+        return today
+    if period == "Last 7 days":
+        return today - timedelta(days=6)
+    if period == "This month":
+        return today.replace(day=1)
+    if period == "Last 30 days":
+        return today - timedelta(days=29)
+    if period == "This year":
+        return today.replace(month=1, day=1)
+    return None
+
+RESULTS_SUMMARY_TEMPLATE = """
+<div style="background: white; padding: 20px; border-radius: 16px; box-shadow: 0 4px 12px rgba(0,0,0,0.08);">
+    <div style="font-size: 18px; font-weight: 700; color: #4C799B; margin-bottom: 10px;">{count} matching call(s){shown}</div>
+    <table style="width: 100%; border-collapse: collapse; font-size: 14px;">
+        <tr style="text-align: left; color: #64748b;"><th>{group_label}</th><th>Calls</th><th>Avg %</th><th>Min %</th><th>Max %</th>{section_headers}</tr>
+        {rows}
+    </table>
+</div>
+"""
+RESULTS_SUMMARY_ROW_TEMPLATE = "<tr><td>{group}</td><td>{calls}</td><td>{avg:.1f}</td><td>{low:.1f}</td><td>{high:.1f}</td>{sections}</tr>"
+
+def search_results(agent, period, date_from, date_to, category, section, comparison, value, group_choice, limit=200):
+    """Query the results store for the Results tab; returns (summary_html, table_rows)"""
+    
+    try:
+        filters = {
+            'agent': (agent or "").strip() or None,
+            'date_from': (date_from or "").strip() or _period_start(period),
+            'date_to': (date_to or "").strip() or None,
+            'category': None if category in (None, ANY_CHOICE) else category,
+        }
+        section_key = next((key for key, label in SECTION_LABELS.items() if label == section), None)
+        if section_key and value is not None:
+            filters['sections'] = {section_key: (comparison, float(value))}
+        group_by = RESULT_GROUP_CHOICES.get(group_choice)
+        calls = results_store.query(limit=int(limit or 200), **filters)
+        count = results_store.count(**filters)
+        stats = results_store.stats(group_by, **filters)
+    except ValueError as e:
+        return format_error_html(e), []
+    
+    rows = []
+    for call in calls:
+        rows.append([
+            call['call_date'], call['agent'], call['file'], call['category'], round(call['percentage'], 1),
+            *(call['scores'].get(key, "") for key in SECTION_LABELS),
+            "; ".join(issue['category'] for issue in call['flagged_issues']), call['language'],
+            _format_clock(call['duration']), round(call['wpm'], 1),
+        ])
+    
+    summary_rows = [
+        RESULTS_SUMMARY_ROW_TEMPLATE.format(
+            group=escape(str(stat['group'] if group_by else "All")), calls=stat['calls'], avg=stat['avg_percentage'] or 0,
+            low=stat['min_percentage'] or 0, high=stat['max_percentage'] or 0,
+            sections="".join(f"<td>{stat['sections'].get(key, 0):.1f}</td>" for key in SECTION_LABELS),
+        )
+        for stat in stats if stat['calls']
+    ]
+    summary_html = RESULTS_SUMMARY_TEMPLATE.format(
+        count=count,
+        shown=f" (showing {len(rows)})" if count > len(rows) else "",
+        group_label=escape(group_choice if group_by else ""),
+        section_headers="".join(f"<th>{escape(label)}</th>" for label in SECTION_LABELS.values()),
+        rows="".join(summary_rows),
+    )
+    return summary_html, rows
 
 # Custom CSS for the interface
 custom_css = """
@@ -908,119 +1350,251 @@ custom_css = """
 }
 """
 
-# Create the interface
-with gr.Blocks(css=custom_css, theme=gr.themes.Soft(), title="ZenConnect Call Analyzer") as interface:
-    
-    gr.HTML("""
-    <div style="position: relative; text-align: center; padding: 40px 20px; background: linear-gradient(135deg, #4C799B 0%, #3a5f7a 100%); border-radius: 20px; margin-bottom: 30px; color: white;">
-        <img src="data:image/png;base64,UklGRqIZAABXRUJQVlA4WAoAAAAgAAAA8wEA8wEASUNDUMgBAAAAAAHIAAAAAAQwAABtbnRyUkdCIFhZWiAH4AABAAEAAAAAAABhY3NwAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAQAA9tYAAQAAAADTLQAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAlkZXNjAAAA8AAAACRyWFlaAAABFAAAABRnWFlaAAABKAAAABRiWFlaAAABPAAAABR3dHB0AAABUAAAABRyVFJDAAABZAAAAChnVFJDAAABZAAAAChiVFJDAAABZAAAAChjcHJ0AAABjAAAADxtbHVjAAAAAAAAAAEAAAAMZW5VUwAAAAgAAAAcAHMAUgBHAEJYWVogAAAAAAAAb6IAADj1AAADkFhZWiAAAAAAAABimQAAt4UAABjaWFlaIAAAAAAAACSgAAAPhAAAts9YWVogAAAAAAAA9tYAAQAAAADTLXBhcmEAAAAAAAQAAAACZmYAAPKnAAANWQAAE9AAAApbAAAAAAAAAABtbHVjAAAAAAAAAAEAAAAMZW5VUwAAACAAAAAcAEcAbwBvAGcAbABlACAASQBuAGMALgAgADIAMAAxADZWUDggtBcAAFCYAJ0BKvQB9AE+USiSRiOioiEllLhgcAoJZ278fJmoxA1/QIFU/67u+OS+T/tn4y9SPwzGZe48u+c3/cep79Q+wR+tfS08wv7p+tJ6P/9L6TPUu+i70x39myUny9/iu13/P/2v0l63Ei65D+U/d3+J64P4nvb4AX41/U/87vMYBfr16Gf0vmj/K+oBwClAPxNvrf0DfXvsMfsL6VvsA/cb//+6kMVls20/b/QVGbaft/oKjNtP2/0FRm2n7f6CozbT9v9BUZtp+3+gqM20/b/QVGbaft/oKi79V+ubL7fUx0TmKf6kiXwx/Cpn3WTkolywsEBOLf6CozbT9v8/xTeEgov/4lLbA2fi7R45TSpyfAo98W/0FRm2n7MQHjz33HmSNPf1bnfFNjpKdhzVgmO6/vO+stU7LYk1n+2rOmINIdfo0/uv9v9BUZtm/xJm06TZX5cLnj1dKFF1wQpiXFdZmcj/PT6c42QsyE7/C9SWFicIAGcQ+BuCB/76zm2n7f5igMEpgZmlUp+2zwHbfFNv0xmc5HmHDo8QDq+r58iwRI8PEEXgzc+e6GsmqsO+SENhlzPI3xb/QVF1JMaBG75rECNrRDCjlJ+fv6R0asfQKGuWc78hqjoG3lLqVZU/UWMXUowdiQ7lZ/GKaWQou+B1g+gqM2gp4iHlu3kbL/H6dAByebGsEHsX5L8q3GifIwqIgDb8h2wOGx2Vyu/+cmpvCZjshZi0CD0t7vm9m27ehG2n7eRgbLsn3nQDH0ggybxvdCmpLtzOostICS8Xbk2uPyN6bTSYJQAeyqQV5qXSDVPez6/xqfZAtaewH0Gk1/oKjMZ4jyo23i7qwf703O2T5MDXwHSKtgAvCMEPySfBEgWY47yQ6etJSth3u8/Kvj8bLwEx7FsQblWlUX2A2jrpnl2r3kz1C+IcrR/Srtv6+HGA3TFxd02wgv0Y85quyYInedVD5osJI/l2VcAAR6Dls2ggIUE4Yhze9LXJt75n84IPyyGXSk1IIYfnPk1H8vz3BNLy6+nroI8n/Mx1kpuPwLFn3RUZllF1Wua8pD3XdxB2Nd6+xUrmcWGlSb6WldBnFmWN6KOS1iLVlm4OSYASTEpOHP7XNRZXoJELlMYXPuvFcMBsuTf45b/QVGbaft/NkItEQwayIIxlkWYMbrgldv9BUZtp+3+f43fuVjFpaybg80JMb/5ZTiSTJBUZtp+3+gqL7Bpvg5if7IqTYghGJJkgqM20/b/QVF52cLpXvlQovzUZF/6B1fOqjNtP2/0FRm2n2nVenjvQvVpKsEDBjOLk4Xk6ztp+3+gqM20/b+RqY7qAJ5SroH7oZqKM3VvJ5BODyM20/b/QVGbZpwyknscq0qfCqqgCBnMEXBCjNtP2/0FRm2m7+5JsWoHz/FuU/bkA6u/9BUZtp+3+gqLxq1ZOZBWX/WCDFGIkz1Lf6CozbT9v9BT7qRgJKZDNW2G1zoOb/zXkA8xL3uWUVrzmvTzXB2OYkmSCozbT9v9BUZtp+/4kyQVGbaft/oKjNtP2/0FRm2n7f6CozbT9v9BUZtp+3+gqM20/b/QVGbaft/oKjNtP2/0FRm2n7f6CozbT9v9BUZtp+3+gqM20/b/QVGbaft/oKjNmgAD+/XEAAAAAAAAAA5HMHVCdk8wfXSCI4Ci2SNEwE/iiZjrU1IW3kOJwvxuPTpQ75qk/wPnF1SbtV08m9apaMoaIb3tFTGp/dehAm5pu3goBNH8u7HEQnLkTlF8AA11n8YB83Djhe1LsKLdNWS1AdPE3ego6K/Cesa7Hsku8yx4rCGeKdOLO4QMHznEm0CxFnOSfH+X4aDiEKH8LZOKgiJhFrMKsk1RU1/9sG6LWE/RXLdkBZo7FOsn5Nowqbkfu98ouj3Pc2DreMZytFa6Wh/Ek3AUT0NWr/NIhoCcFB2MBKY18j4xoOLzFKF0MWODGeyv8UakCIo+Ulfg0nZpXKu/TjPKPWBTf3LreJcschbwC32vJ2smCD0eeMEvLVqAcz8sb4LJWj7LS/qeqJBjS9UHJOr28H11tdyzPE2n2KrsIx+L8F/+uPa4l3tdnhGxmeygZBG+HyGgFc0IEhCEfcuo9e6VHnFSGXvKzw/+5gEIzoW+PvGg+Y6vAAOKC1ZSiX83nrD/Jkti5nrS+6Nb9uk7S5EZI3jtPGSzd+8TIo0jy1fRx4If9qocHBRjKQjXh7c8NTz47myO/lRgL0A8XEbEPTxYgVPJe/iCwGflCJixYH7fpdOORrv36pT6KlGCIALke2kkHP3lvgNaa1cHckCUeWSazW5acY1+ubz1/3bLsB4LmlfA+zy6qJVVPz1seY6VXckNwMG5CNy2y3KD/zPjngF4oYnMnJ1s5QwUxHqYfaklDNtOLf2RDUKlkKutiypjjaDYcsrzJPPcETpxetJ7FBW2QByI4SlwfGuqme3g4yWhm2RaEO/zaXrruTXUd5uVTILAOleVImxqy8/GckesFFfcy7T8ZBKdB3bSm1lEAYF5yL96T08P1iwZiPJ8sWaW0I9/hEtU7L7U4BOfmbFkCZeFIgE91oDA7p3jI6yt9XJIBY3+EvF8eUXxTZ6aN9vQIxV2Q8z7aBlv9xk415d+BFBzlVrtlmy0rRa7rk6Gy8ezK1ouN/kvmv2Ni9gWsO5Tase+EQBv/Mb2+dnQpA8yZR9e9qzmOUn9+mRV37i3XOGkhIQvOSKBdXx5mG5iGbD0DhvienXcxbrWllXUqh/CMBVY5T4H5DKo5vkK23tOP2ZtPO/00XuWr/17AjodYOW5n7zRo2TqgXEM1rmo8RyoR7KPkCdvP+JGfS2qSr/Y43gX4UtUXOAqZy9LCxDS4Dd2/9SMa6HYL/4DGy361CYPjXRj+JOhnoYmE91cM5oLyZX74RylX5/ANWAHGZVITSYjnA2CvGa0XDBcQw9OOM/kU18FiRUxaP8tX3R1/LfwX9KnIpbgksYYmdXMiw+dVQEL7zsywBBTRnTQdJ+Mo7hZzbfq/mY1WVpmeH6XgiumC9wYM1FY4arfX+ckKbdUdK2G4wT9OuIV/+stMq+56ylu8Uzz84nLuoEdooew3YXvTiTN0xZd3NXiaQctaPIYLXDJKOAEF59WHaP5XXG/v+TOh9koLTYQ+6Lq1sOJed49nnwiS+Spw75whlWIc4djnfDYFVAxv2+cJCErWtWSSMD/6yOPA1uDX0EscnoP8HpYRCQ0dw2tqwaPI7TOkhmLCP2HjGLQ+ZZ010wCWY/WDlsEC1/roG9VbCtbq1dUyxGqvZo9pFDQyDtcVq3cut2dEYN4R0maklOxhUrQn0w7UzSCo/m/bEK2QiOLESB+pqJ6AWBX3J2+/DCr5Sx2QUgxPPj/f2P2p1mEEyD/ZVpkSK3gmMjies4cXqkGm6ZrX1OJiOU6OqCk9UXwhlsAQaOLZHvyC8eRCE/UInj3OPbQfJePW4l4vRkjS74tEU4+gDsHsk+hV6tl0quZV6Urnjc7tt2RPf4vGQnt8olLm5jjO8jbFPVy/UfoVjHCPk+y9vgO15pvB41NjNcOtdvwcWvocJARFxaNfXJK+ehfXS7dA4TA48BtjBiMcJcJ8ukQG8kX/LW++A3jzS1G5dHxmwBGTfkEASDgnUrUwiYhgVOy/OJhtPCdukDQ4a4TCIUzMMVV9zu7qXeWRvZSqs70vNDXy9AgTks7y2w1HWNLwuH4VLWmK4TISBE72WT2YRUO3nBaHo6zNCAoCocz9SndzGgWYcuhWn+B9tdv7EK8hUenazHmfhHGK5M3Vgw4bY09odID+RqvawHElyb1EpC7AKARmoXg8bfz7/m/fVXySJ/EpLfm+dWb9Pohj1bTpA+M5MKZ64V2UU+yH2oj/Dxdx+hSUf2MK7nN8QNg4Fr6k79X2N8Q5cE8s9tU4vldWypruIzgpVhIkUukG77BpEsfrFYLCxpkCnWHcPzTcRWvMiKUbL4FEphlnYeMIBgFBAC8Zntcn47fifsHga65DLqsEaZYg7qh/WUSRIzQxy1DJJ8QnksgaCodlJyY3wEvdW8Kn79ENpQIM1E1si8EvhtmQDj3K1Pq1nIfbXgtoBAKAQkUTSph2MJfX2Lvw2WkZ67gW4B4vlAoT5SpUVAs02ILwS+fAuQmd9ujyzoDgtbNbt1svjgpenUIgB+GZDLWrsdfVBBPzgrjr7i8dtazrn+9BOodFaat1BID6/koggDY6mTBO8p7k45moTPy+Dkn94V8NeHP3l2Df5tEitdRmSOQkCBenUYqe5h8B2I7B7zUmn06buofPSrvV/5LMsmo1V/MQYgZ7Jm+32XuNYldBkHbAwjWS5F08g9Kr928gYG98YgKSvdws+iAnUvWsudMlf0W42SweGNhKG5ielEmBM5GvrFuMxKa8I0Cnc6bdTA1j4dRCee1J/3Lt0Hy3gLST4MfIESDJf42wIk0rqX1IPuKAUyXpBAujY0gxQtjfmRVhXriKaXHIkR7VwmFxT+J8gNmjDeEYQ7ToqpUH27Jm9Pfw9ZbNDdaqlrgVsKuWm9bvXPAiTZrJJ6UKJqNja5FsfRL/5fbPRS+SYMAYJwmekxcVYiLUeXdM+5KccLisN5WODaE8jLhUdsVr4TN6peQF5uha8pxqqvyi+9ii8Z/8Af/aobH11f565rFBX2ir7l0QHZMtObPz8beb2K6OZp4WWAAqywDbgqzn+2DgoE6UCX4RQtmpjtE7QMHxg7bGyBn989Rp1WqEy5kq0S5Ld2N81yhKz5U7l/sS7o4tQ74DtPuuR9xq5NPe0JypSgG9bcMpY8LWe9HItN20a688Hogh/ipqH3911VFfEhFtURI+sZ8ixZQnXfkJOgweXyh0HUDX0W5u9gXSXkaa6xATU64sb0VRIQC9ElTkEiJhOOmvu7mqFtyC+cwJVkmNt8z2eE1CqsNX9TCD3OItatwRn73dM63FxTwaPMIlu8fUNWw3jARbs10F4XHgRJJcC5qvl0rLwXVJkpjiiC51lqdzF2bCqGD/CryfyQ047thR9nzoObt5XAUiDUw697d3/r6RXgTS7We6GaatQNWBailxEnR3aCXTNxFEcLlMeSdFqrkJ298RIfU6H+0v5V6LHbjFk1EegqY0UhlsYywnkVnMu8sBzbiMusY4G5TSJnnVJuW6hqisvSk4XlntfkAG/i4Qkw3du3l2Odr+PtJeM5hzH6xgFMNOvjoo/HwyB2FelxZ56ytOSnk+rboTrmrW18TauLoWITIKZP2GM8kSkPvcfJJi6+3JqzxC08hk2wLw9UPQDcK7X/YKu57dKPwlpf+66SkTpUbD6weEupXkgoRTK82O+14yU6f+P6Ic79gT4nVb09pzDjOb+gK2wh3QYVCeCXcrHKgdKpTxqkeGRpgS8qPOjnME9HPkszLYAOVL7g+x+nMOOXD+RZmJDVkdpdlNR3ZDNiZJC3CJxOyamzZHmV03DKf7TtdjbjwkMSN8w+z1H3qpoRXDpBXhtNlmHxNwOTQ+fYTFuw9p0RQeAXDtzbZp3K/77bKRVASjt6WYdFA2dJXgXZun0690ZHk3oiSV7vwAZOY8+STAF/MbgkXzFaTlci1IuXBDHkRaGl4CjC1how/4XEeMAn8gQY/y27mXvQa7e2QXeftAQNuRnldEQa8oFTxy2MydX2S9I4awbuFXZF1VG1VHmozQxVcC4epSyUgbym2gJIO7w/QCMzvqWO0gEipJAONXqM6xT5GoOY9MWUTeF8AixjqTatZvuFheWo1tSWuzLutcYJkmCdWXGQrd0+4/ifue2F3LmOWS1T7dFu0zSHPiVZdSVdmSGZp14S/ACdNZPYG3QLEeA+VJqkJiQn3x6JbgzOSvUrZmcfgElJh4j9w3uSZ1Hw1jIhDcR6u38M5Kj44n/QV3JP6N6zoEocTNXePuXbL+U5MuP1juvMHQEPintQDfITFHsk+R1XXTInGKvdrKeNeeC621LB2JADPV/4yG5l9kyjzTwhcmHnUTJeSEqKd9N5jSEZOrn/GKzLvhScyfO1lODJDDqG84oqaII76NbYxgCHWsjl5IaLKlrbxBx4sCAcdvSFz573vm1ZjNf6TGvQVqR+qh+E4BCqsXT7qrh0EbeMSlHsVaCJtOxnXUW1jTF2bVr//GOFJtSyBoszJ4QLNomNi+PwcX0tHW7XEGxa4kfvmwF8QF1Y9Q3zSy4/jeby7KMCTAWsMmphclpLupQNQAbWNsRR+unGz81totYiRGXGGxjVd7j2P2zxOWC/uEeOtol5hyBstl5xVABZhB4rSjk5fiGRhZm6r0gw9xyKU5PW8dMVZi6f0VqSKgpivptFMcqVCEMds7axEtx5XvzP6f5RvduEI9KO7CWlbNCSo8r/MDhuubUNleoQoESY5vDi56MRgvIowvLijkBFhEv747VQl6x44ClsN0ij9nMSIkmxXEkT5p2QO6wbeQGtUWTRUEaOYVWdfJZCCRwo4hL34GSmPRmaymUcHx5EpBdzTaBoK4RJecDH30O3fA8BhoMuQryOiMUSAieI2l4ksw6jYZHQdi70/Lmctx5UPdb7T5TX9b/StusQ+GvEpA42bWIL4qWHcWUY5Qz1dvIFkAADI+CV3RQvBnflVoCBH9fg26/TrjtkeYDo3tWBNU7jxObbY1K07P1rdxxzlEagD/88HJuG9nT7odJsRw77JTLWs0WEHieQCIrYwXu91tfi2barzwSIBAAAg7sOUT5NL/H/0pz/4AMoDt1W1DhzuCTh40kDhI5SzcUL4tJCdC8IxcORuXnAn3AsOMkw+7CRQ/JU6daadMs7FGj+gbf1P/dQo36Q7fSjALF4eEuEAB9xADtfI4spF4ccAHKqk33BVcKOorp3NFVSL/fqKKh1uikA/avh2/gWNhG+98ZZQttRWhHm9WMx1HTOV9G3n0j3jyIJiOC8UfzeFBf1Tel9cABvoXYMfZCslAuilGONY9uPfRpht44eTz9h7dGXolAJ4jecczokvhYBrRvoMoF88iaGrSGsfnykONz4qpdaCK7vr9VayEqxd3/np74wcIYxRroHiVdDp+wCYJvNYU7HIAAPkjyc4b60j3hXRMNQQ6NtyQQhiqnTOQw6uAKs90KoT9j3G26bBv7xEnHxyUUReAlOoDW4Zr1w1whVqCuhdLRDMgfJAiaSmFbDV38T7xVTqGgNG2OuKENpNudPC2E/uvez2yUjaiJ5QXh5saGn7ri4VOwOgBzPor4JJBCcQKCnTPVQTj+eDt7Um66MH9bf/NR26CpJiQzfRz83wdYBOWGc24Z7yvGdMNiWgmQhEpVbb/XnkGL5bafPwgw3DFFyTLlVc2jSdokWpE8JwnxQniq9AtoL5JO387axRZ/x5s7EdduSIzDB9t09OkwFbUAH7hpXmyJ1vobBmQ7MotZryVaGJTAd6qH3C9P+BN7c7mAZwQvclenoimrCoFTL0dlVXTHsN2g0caCdcWXGhaq8i7pFD3FLxugfR90sPRfQMkvzRsRCxokI7dsD3MJS6DK1NKM1lUZZbOBEAdfKLHC5s8xBjT/82nKSKerJPhoWHStH7De8XGJ3TAJp0KYHS9Ga9rz3E9iM8FOUzScd+lg0kFhXd0btuT86mngwSsw15N3zRcZKY04Cr+lTwa3RNoVToxmydlLNwpHAv1R9RNeIJjAAUW7DwF546V3zDaaHEqC7UxriLxok7G9nlH+K7/nJVV1mlVR2NA+Lnz3/FwC7K1N2tV6iWLFiE2jLz0IQ1twYHvTkzKW6LZQVqFarEqmw7GdQFJBO3kQC5V7EAB5OMP7OUUMB7GFKuRKte4FqicRm4n+C3ksV8vfTRXhjFHt4dLQwiC1piJRR0q+k8/bF/QdBfAxt2XoEEnHz5uBY2jsF8oCfrWj6tHNfx0cftevAOYMgoj8oRnRIVKsDf0THBc8ycduaZoqnRLhVbWusUsbsHq2GGHsmUbCPLNVagTmlmSikcu0bICwt9wxWqsqAwODbg9L9q7LMuuf7oJP7KIMHcWE4HDHVqFcPGNAgQE9dHIPEaKxvD3i9AQFw9yiBVIyR1NWciGv11bjEaiNB6My95iV4iGC7fwAAAAAAAAAAAAAAAAAAAAAAAA" alt="NeuroOptimal Logo" style="position: absolute; top: 20px; right: 20px; height: 80px; background: white; padding: 10px; border-radius: 16px; box-shadow: 0 4px 12px rgba(0,0,0,0.15);">
-        <h1 style="margin: 0; font-size: 48px; font-weight: 900; letter-spacing: -1px; text-shadow: 0 4px 12px rgba(0,0,0,0.2); color: white;">
-            ZenConnect Call Analyzer
-        </h1>
-        <p style="margin: 15px 0 0 0; font-size: 20px; opacity: 0.95; font-weight: 500;">
-            AI-Powered Quality Monitoring System
-        </p>
-        <div style="margin-top: 20px; padding: 15px 25px; background: rgba(255,255,255,0.2); backdrop-filter: blur(10px); border-radius: 50px; display: inline-block; font-size: 15px; font-weight: 600;">
-            Upload • Analyze • Improve
+def build_interface():
+    """
+    Build the Gradio UI. Gradio is only imported here, so the scoring and
+    rendering functions above can be used without it.
+    """
+    import gradio as gr
+    
+    def watch_job_ui(job_id, progress=gr.Progress()):
+        yield from watch_job(job_id, progress)
+    
+    def rescore_ui(transcript_state, strictness_choice, page):
+        # Before a call has finished there is nothing to re-score
+        if not transcript_state:
+            return gr.update(), gr.update(), gr.update(), transcript_state
+        return rescore_transcript(transcript_state, strictness_choice, page)
+    
+    with gr.Blocks(css=custom_css, theme=gr.themes.Soft(), title="ZenConnect Call Analyzer") as interface:
+    
+        gr.HTML(f"""
+        <div style="position: relative; text-align: center; padding: 40px 20px; background: linear-gradient(135deg, #4C799B 0%, #3a5f7a 100%); border-radius: 20px; margin-bottom: 30px; color: white;">
+            <picture>
+                <source type="image/avif" srcset="{LOGO_SRCSET['avif']}">
+                <source type="image/webp" srcset="{LOGO_SRCSET['webp']}">
+                <img src="{LOGO_URL}" alt="NeuroOptimal Logo" width="80" height="80" decoding="async" style="position: absolute; top: 20px; right: 20px; height: 80px; background: white; padding: 10px; border-radius: 16px; box-shadow: 0 4px 12px rgba(0,0,0,0.15);">
+            </picture>
+            <h1 style="margin: 0; font-size: 48px; font-weight: 900; letter-spacing: -1px; text-shadow: 0 4px 12px rgba(0,0,0,0.2); color: white;">
+                ZenConnect Call Analyzer
+            </h1>
+            <p style="margin: 15px 0 0 0; font-size: 20px; opacity: 0.95; font-weight: 500;">
+                AI-Powered Quality Monitoring System
+            </p>
+            <div style="margin-top: 20px; padding: 15px 25px; background: rgba(255,255,255,0.2); backdrop-filter: blur(10px); border-radius: 50px; display: inline-block; font-size: 15px; font-weight: 600;">
+                Upload • Analyze • Improve
+            </div>
         </div>
-    </div>
-    """)
-    
-    with gr.Row():
-        audio_input = gr.Audio(
-            type="filepath", 
-            label="🎵 Upload Your Call Recording",
-            elem_id="audio-upload"
-        )
-    
-    with gr.Row():
-        with gr.Column():
-            model_selector = gr.Dropdown(
-                choices=[
-                    "Fast (Tiny - ~1min for 5min audio)",
-                    "Balanced (Small - ~2min for 5min audio)",
-                    "Accurate (Base - ~3min for 5min audio)"
-                ],
-                value="Balanced (Small - ~2min for 5min audio)",
-                label="🎚️ Select Processing Speed",
-                info="Fast = quicker but less accurate | Accurate = slower but more precise"
-            )
+        """)
+    
+        with gr.Tabs():
+            with gr.Tab("🎧 Analyze"):
+                with gr.Row():
+                    audio_input = gr.Audio(
+                        type="filepath", 
+                        label="🎵 Upload Your Call Recording",
+                        elem_id="audio-upload"
+                    )
+    
+                with gr.Row():
+                    with gr.Column():
+                        model_selector = gr.Dropdown(
+                            choices=list(MODEL_CHOICES),
+                            value="Balanced (Small - ~2min for 5min audio)",
+                            label="🎚️ Select Processing Speed",
+                            info="Fast = quicker but less accurate | Accurate = slower but more precise | Turbo = int8 faster-whisper on CPU"
+                        )
         
-        with gr.Column():
-            strictness_selector = gr.Dropdown(
-                choices=[
-                    "Lenient (Generous scoring - Training friendly)",
-                    "Moderate (Balanced expectations)",
-                    "Strict (High standards - Quality focused)"
-                ],
-                value="Moderate (Balanced expectations)",
-                label="⚖️ Scoring Strictness",
-                info="Lenient = More forgiving | Strict = Higher expectations"
-            )
-    
-    with gr.Row():
-        analyze_btn = gr.Button(
-            "🚀 Analyze Call Quality",
-            variant="primary",
-            size="lg",
-            elem_id="analyze-btn"
+                    with gr.Column():
+                        strictness_selector = gr.Dropdown(
+                            choices=list(STRICTNESS_CHOICES),
+                            value=next(label for label, name in STRICTNESS_CHOICES.items() if name == DEFAULT_STRICTNESS),
+                            label="⚖️ Scoring Strictness",
+                            info="Lenient = More forgiving | Strict = Higher expectations"
+                        )
+    
+                with gr.Row():
+                    stream_checkbox = gr.Checkbox(
+                        value=True,
+                        label="📡 Show results while transcribing",
+                        info="Long calls are decoded in chunks and the reports update as each chunk finishes"
+                    )
+                    performance_checkbox = gr.Checkbox(
+                        value=False,
+                        label="⚡ Show performance panel",
+                        info="Adds per-stage timings, real-time factor and peak memory to the quality report"
+                    )
+    
+                with gr.Row():
+                    agent_input = gr.Textbox(
+                        label="🧑‍💼 Agent",
+                        placeholder="Who took the call (optional, used by the Results tab)"
+                    )
+                    call_date_input = gr.Textbox(
+                        label="📅 Call date",
+                        placeholder="YYYY-MM-DD (defaults to the recording's date)"
+                    )
+    
+                with gr.Row():
+                    analyze_btn = gr.Button(
+                        "🚀 Analyze Call Quality",
+                        variant="primary",
+                        size="lg",
+                        elem_id="analyze-btn"
+                    )
+    
+                # Status message area
+                status_output = gr.Textbox(
+                    label="Status",
+                    value="Ready to analyze. Upload an audio file and click the button above.",
+                    interactive=False,
+                    visible=True
+                )
+    
+                with gr.Row():
+                    job_id_box = gr.Textbox(
+                        label="Job ID",
+                        placeholder="Filled in when you analyze; paste an earlier job ID to check on it",
+                        scale=3
+                    )
+                    check_job_btn = gr.Button("🔄 Check Job", scale=1)
+                    cancel_job_btn = gr.Button("⏹️ Cancel Job", variant="stop", scale=1)
+    
+                with gr.Row():
+                    quality_output = gr.HTML(label="Quality Report", elem_classes="output-html")
+    
+                with gr.Row():
+                    recommendations_output = gr.HTML(label="Recommendations", elem_classes="output-html")
+    
+                with gr.Row():
+                    transcript_output = gr.HTML(label="Transcript", elem_classes="output-html")
+    
+                with gr.Row():
+                    transcript_page = gr.Number(
+                        value=1,
+                        precision=0,
+                        label=f"Transcript page ({TRANSCRIPT_PAGE_SIZE} segments per page)"
+                    )
+    
+                transcript_state = gr.State()
+    
+                gr.HTML(f"""
+                <div style="text-align: center; padding: 30px; background: rgba(76, 121, 155, 0.1); border-radius: 16px; margin-top: 30px; color: #475569;">
+                    <h3 style="margin: 0 0 15px 0; color: #4C799B; font-size: 20px;">📋 Scoring Methodology</h3>
+                    <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin-top: 20px;">
+                        {"".join(METHODOLOGY_CARD_TEMPLATE.format(label=escape(label), points=maximum) for _key, label, maximum in RUBRIC_SECTIONS)}
+                    </div>
+                    <p style="margin: 25px 0 0 0; font-size: 14px; font-style: italic;">
+                        ⚡ Powered by OpenAI Whisper + ZenConnect Quality Standards
+                    </p>
+                </div>
+                """)
+    
+            with gr.Tab("📊 Results"):
+                with gr.Row():
+                    results_agent = gr.Textbox(label="Agent", placeholder="Any agent")
+                    results_period = gr.Dropdown(choices=PERIOD_CHOICES, value="This month", label="Period")
+                    results_from = gr.Textbox(label="From", placeholder="YYYY-MM-DD (overrides period)")
+                    results_to = gr.Textbox(label="To", placeholder="YYYY-MM-DD")
+                with gr.Row():
+                    results_category = gr.Dropdown(
+                        choices=[ANY_CHOICE, *(category['label'] for category in RUBRIC.get('categories', []))],
+                        value=ANY_CHOICE,
+                        label="Category"
+                    )
+                    results_section = gr.Dropdown(choices=[ANY_CHOICE, *SECTION_LABELS.values()], value=ANY_CHOICE, label="Section score")
+                    results_comparison = gr.Dropdown(choices=["<", "<=", ">", ">="], value="<", label="Comparison")
+                    results_value = gr.Number(value=3, label="Score")
+                    results_group = gr.Dropdown(choices=list(RESULT_GROUP_CHOICES), value="Agent", label="Summarize by")
+                results_btn = gr.Button("🔎 Search Calls", variant="primary")
+                results_summary = gr.HTML()
+                results_table = gr.Dataframe(headers=RESULT_HEADERS, interactive=False, wrap=True)
+    
+        # Analyses are queued as jobs; the UI only polls them, so many polls can run at once
+        job_outputs = [quality_output, recommendations_output, transcript_output, status_output, transcript_state]
+        analyze_btn.click(
+            fn=submit_analysis_job,
+            inputs=[audio_input, model_selector, strictness_selector, stream_checkbox, performance_checkbox,
+                    agent_input, call_date_input],
+            outputs=[job_id_box, status_output]
+        ).then(
+            fn=watch_job_ui,
+            inputs=job_id_box,
+            outputs=job_outputs,
+            show_progress=True,
+            concurrency_limit=None
         )
     
-    # Status message area
-    status_output = gr.Textbox(
-        label="Status",
-        value="Ready to analyze. Upload an audio file and click the button above.",
-        interactive=False,
-        visible=True
-    )
+        check_job_btn.click(
+            fn=watch_job_ui,
+            inputs=job_id_box,
+            outputs=job_outputs,
+            show_progress=True,
+            concurrency_limit=None
+        )
     
-    with gr.Row():
-        quality_output = gr.HTML(label="Quality Report", elem_classes="output-html")
+        cancel_job_btn.click(
+            fn=cancel_job,
+            inputs=job_id_box,
+            outputs=status_output
+        )
     
-    with gr.Row():
-        recommendations_output = gr.HTML(label="Recommendations", elem_classes="output-html")
+        # A finished call is re-scored in place when the strictness changes
+        strictness_selector.change(
+            fn=rescore_ui,
+            inputs=[transcript_state, strictness_selector, transcript_page],
+            outputs=[quality_output, recommendations_output, transcript_output, transcript_state],
+            queue=False
+        )
     
-    with gr.Row():
-        transcript_output = gr.HTML(label="Transcript", elem_classes="output-html")
+        transcript_page.change(
+            fn=render_transcript_page,
+            inputs=[transcript_state, transcript_page],
+            outputs=transcript_output
+        )
     
-    gr.HTML("""
-    <div style="text-align: center; padding: 30px; background: rgba(76, 121, 155, 0.1); border-radius: 16px; margin-top: 30px; color: #475569;">
-        <h3 style="margin: 0 0 15px 0; color: #4C799B; font-size: 20px;">📋 Scoring Methodology</h3>
-        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 15px; margin-top: 20px;">
-            <div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                <div style="font-weight: 700; color: #4C799B; margin-bottom: 5px;">Opening</div>
-                <div style="font-size: 24px; font-weight: 900; color: #1e293b;">5 pts</div>
-            </div>
-            <div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                <div style="font-weight: 700; color: #4C799B; margin-bottom: 5px;">Handling & Process</div>
-                <div style="font-size: 24px; font-weight: 900; color: #1e293b;">20 pts</div>
-            </div>
-            <div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                <div style="font-weight: 700; color: #4C799B; margin-bottom: 5px;">Knowledge</div>
-                <div style="font-size: 24px; font-weight: 900; color: #1e293b;">10 pts</div>
-            </div>
-            <div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                <div style="font-weight: 700; color: #4C799B; margin-bottom: 5px;">Communication</div>
-                <div style="font-size: 24px; font-weight: 900; color: #1e293b;">10 pts</div>
-            </div>
-            <div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.05);">
-                <div style="font-weight: 700; color: #4C799B; margin-bottom: 5px;">Closing</div>
-                <div style="font-size: 24px; font-weight: 900; color: #1e293b;">5 pts</div>
-            </div>
-        </div>
-        <p style="margin: 25px 0 0 0; font-size: 14px; font-style: italic;">
-            ⚡ Powered by OpenAI Whisper + ZenConnect Quality Standards
-        </p>
-    </div>
-    """)
+        results_btn.click(
+            fn=search_results,
+            inputs=[results_agent, results_period, results_from, results_to, results_category,
+                    results_section, results_comparison, results_value, results_group],
+            outputs=[results_summary, results_table]
+        )
     
-    analyze_btn.click(
-        fn=transcribe_and_analyze_zenconnect,
-        inputs=[audio_input, model_selector, strictness_selector],
-        outputs=[quality_output, recommendations_output, transcript_output],
-        show_progress=True
-    )
+    return interface
+
+def create_app():
+    """
+    The UI mounted on a FastAPI app that also serves ASSETS_DIR with caching
+    headers and a /health readiness check: 200 once the preloaded models are
+    warm, 503 before that, with the resident models in the body.
+    """
+    import gradio as gr
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse
+    from fastapi.staticfiles import StaticFiles
+    
+    class CachedStaticFiles(StaticFiles):
+        async def get_response(self, path, scope):
+            response = await super().get_response(path, scope)
+            if response.status_code in (200, 304):
+                response.headers['Cache-Control'] = f"public, max-age={STATIC_MAX_AGE}"
+            return response
+    
+    app = FastAPI()
+    
+    @app.get("/health")
+    def health():
+        status = preloader.status()
+        return JSONResponse(status, status_code=200 if status['ready'] else 503)
+    
+    app.mount(STATIC_ROUTE, CachedStaticFiles(directory=ASSETS_DIR), name="static")
+    return gr.mount_gradio_app(app, build_interface(), path="/")
 
 # Launch
 if __name__ == "__main__":
-    interface.launch(share=False, server_name="127.0.0.1", server_port=7860)
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    import uvicorn
+    
+    job_queue.start()
+    preloader.start()
+    uvicorn.run(create_app(), host="127.0.0.1", port=7860)
\ No newline at end of file
@@ -0,0 +1,265 @@
+"""
+SQLite store of analyzed calls for dashboards and cross-call queries.
+
+Reports built by build_reports() only live in the browser; recording them
+here keeps scores, per-section feedback, flagged issues and call stats
+queryable across calls, e.g. every call this month whose Closing score is
+below 3. One row per recording (keyed by the audio's content hash, so
+re-analyzing a call replaces its row) sits in `calls`, with indexes on
+agent, call date, category and percentage. Each rubric section gets its
+own indexed score_<section> column, added the first time a section is
+recorded, so filters and averages on any section need neither a join nor
+JSON parsing. Feedback and flagged issues live in `call_details`, keeping
+`calls` rows narrow for aggregate scans.
+"""
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    call_key TEXT PRIMARY KEY,
+    file TEXT NOT NULL DEFAULT '',
+    agent TEXT NOT NULL DEFAULT '',
+    call_date TEXT NOT NULL,
+    analyzed_at REAL NOT NULL,
+    model TEXT NOT NULL DEFAULT '',
+    strictness TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT '',
+    duration REAL NOT NULL DEFAULT 0,
+    word_count INTEGER NOT NULL DEFAULT 0,
+    wpm REAL NOT NULL DEFAULT 0,
+    total REAL NOT NULL,
+    percentage REAL NOT NULL,
+    category TEXT NOT NULL DEFAULT '',
+    flagged TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS calls_agent ON calls (agent, call_date);
+CREATE INDEX IF NOT EXISTS calls_date ON calls (call_date);
+CREATE INDEX IF NOT EXISTS calls_category ON calls (category, call_date);
+CREATE INDEX IF NOT EXISTS calls_percentage ON calls (percentage);
+CREATE TABLE IF NOT EXISTS call_details (
+    call_key TEXT PRIMARY KEY,
+    scores TEXT NOT NULL,
+    feedback TEXT NOT NULL,
+    flagged_issues TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+SCORE_PREFIX = 'score_'
+
+SCORE_COMPARISONS = ('<', '<=', '>', '>=', '=')
+GROUP_COLUMNS = {
+    'agent': 'calls.agent',
+    'category': 'calls.category',
+    'day': 'calls.call_date',
+    'month': "substr(calls.call_date, 1, 7)",
+    'language': 'calls.language',
+}
+
+
+def _iso_date(value):
+    """'YYYY-MM-DD' for a date, datetime or date string (None stays None)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.strftime('%Y-%m-%d')
+    return datetime.date.fromisoformat(str(value).strip()[:10]).isoformat()
+
+
+def recording_date(audio_file):
+    """Date of a recording from its modification time, or today if unavailable"""
+    try:
+        return datetime.date.fromtimestamp(os.path.getmtime(audio_file)).isoformat()
+    except (OSError, TypeError):
+        return datetime.date.today().isoformat()
+
+
+class ResultsStore:
+    """
+    Analyzed calls in a local SQLite database, created on first use.
+    record() takes the dict returned by build_reports(); query() and stats()
+    filter by agent, date range, category, percentage and section scores.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._ready = False
+        self._sections = set()
+
+    def _connect(self):
+        if not self._ready:
+            self._init_db()
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self):
+        with self._lock:
+            if self._ready:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            with closing(sqlite3.connect(self.db_path, timeout=30)) as conn, conn:
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(SCHEMA)
+                self._load_sections(conn)
+            self._ready = True
+
+    def _load_sections(self, conn):
+        self._sections = {row[1][len(SCORE_PREFIX):] for row in conn.execute("PRAGMA table_info(calls)")
+                          if row[1].startswith(SCORE_PREFIX)}
+
+    @property
+    def sections(self):
+        """Sections with a score column, in no particular order"""
+        if not self._ready:
+            self._init_db()
+        return set(self._sections)
+
+    def _add_sections(self, conn, sections):
+        """Add an indexed score column for each section not seen before"""
+        with self._lock:
+            for section in sections:
+                if section in self._sections:
+                    continue
+                if not section.isidentifier():
+                    raise ValueError(f"Section name '{section}' can't be used as a column")
+                try:
+                    conn.execute(f"ALTER TABLE calls ADD COLUMN {SCORE_PREFIX}{section} REAL")
+                except sqlite3.OperationalError:
+                    pass  # added by another process since we looked
+                conn.execute(f"CREATE INDEX IF NOT EXISTS calls_{SCORE_PREFIX}{section} ON calls ({SCORE_PREFIX}{section})")
+                self._sections.add(section)
+
+    def record(self, call_key, reports, file="", agent="", call_date=None, model="", strictness=""):
+        """Store (or replace) one analyzed call; call_date defaults to today"""
+        scores = reports['scores']
+        flagged_issues = reports.get('flagged_issues', [])
+        row = {
+            'call_key': call_key,
+            'file': file or "",
+            'agent': (agent or "").strip(),
+            'call_date': _iso_date(call_date) or datetime.date.today().isoformat(),
+            'analyzed_at': time.time(),
+            'model': model or "",
+            'strictness': strictness or "",
+            'language': reports.get('language') or "",
+            'duration': float(reports.get('duration') or 0),
+            'word_count': int(reports.get('word_count') or 0),
+            'wpm': float(reports.get('speaking_rate') or 0),
+            'total': float(reports['total']),
+            'percentage': float(reports['percentage']),
+            'category': reports.get('category') or "",
+            'flagged': "; ".join(issue['category'] for issue in flagged_issues),
+            **{SCORE_PREFIX + section: float(score) for section, score in scores.items()},
+        }
+        columns = ", ".join(row)
+        placeholders = ", ".join("?" for _name in row)
+        with closing(self._connect()) as conn, conn:
+            self._add_sections(conn, scores)
+            conn.execute(f"INSERT OR REPLACE INTO calls ({columns}) VALUES ({placeholders})", list(row.values()))
+            conn.execute("INSERT OR REPLACE INTO call_details (call_key, scores, feedback, flagged_issues) "
+                         "VALUES (?, ?, ?, ?)",
+                         (call_key, json.dumps(scores), json.dumps(reports.get('detailed_feedback', {}), ensure_ascii=False),
+                          json.dumps(flagged_issues, ensure_ascii=False)))
+
+    def delete(self, call_key):
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM call_details WHERE call_key = ?", (call_key,))
+            return bool(conn.execute("DELETE FROM calls WHERE call_key = ?", (call_key,)).rowcount)
+
+    def _where(self, conn, agent=None, date_from=None, date_to=None, category=None, min_percentage=None,
+               max_percentage=None, sections=None):
+        """
+        WHERE clause and arguments for the shared filters. Dates are
+        inclusive; sections maps a section to (comparison, value), e.g.
+        {'closing': ('<', 3)}.
+        """
+        clauses, args = [], []
+        if agent:
+            clauses.append("calls.agent = ?")
+            args.append(agent.strip())
+        if date_from:
+            clauses.append("calls.call_date >= ?")
+            args.append(_iso_date(date_from))
+        if date_to:
+            clauses.append("calls.call_date <= ?")
+            args.append(_iso_date(date_to))
+        if category:
+            clauses.append("calls.category = ?")
+            args.append(category)
+        if min_percentage is not None:
+            clauses.append("calls.percentage >= ?")
+            args.append(min_percentage)
+        if max_percentage is not None:
+            clauses.append("calls.percentage <= ?")
+            args.append(max_percentage)
+        for section, (op, value) in (sections or {}).items():
+            if op not in SCORE_COMPARISONS:
+                raise ValueError(f"Unknown score comparison '{op}'")
+            if section not in self._sections:
+                self._load_sections(conn)  # another process may have recorded it
+            if section not in self._sections:
+                raise ValueError(f"No scores recorded for section '{section}'")
+            clauses.append(f"calls.{SCORE_PREFIX}{section} {op} ?")
+            args.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def query(self, limit=200, offset=0, order="call_date DESC", **filters):
+        """
+        Calls matching the filters (see _where) as dicts, newest first by
+        default; scores, feedback and flagged_issues are decoded.
+        """
+        if order not in ("call_date DESC", "call_date", "percentage", "percentage DESC", "analyzed_at DESC"):
+            raise ValueError(f"Unsupported order '{order}'")
+        with closing(self._connect()) as conn:
+            where, args = self._where(conn, **filters)
+            rows = conn.execute(f"SELECT calls.*, call_details.scores, call_details.feedback, call_details.flagged_issues "
+                                f"FROM calls JOIN call_details ON call_details.call_key = calls.call_key{where} "
+                                f"ORDER BY calls.{order}, calls.call_key LIMIT ? OFFSET ?",
+                                (*args, int(limit), int(offset))).fetchall()
+        calls = []
+        for row in rows:
+            call = {name: row[name] for name in row.keys() if not name.startswith(SCORE_PREFIX)}
+            for name in ('scores', 'feedback', 'flagged_issues'):
+                call[name] = json.loads(call[name])
+            calls.append(call)
+        return calls
+
+    def count(self, **filters):
+        with closing(self._connect()) as conn:
+            where, args = self._where(conn, **filters)
+            return conn.execute(f"SELECT COUNT(*) FROM calls{where}", args).fetchone()[0]
+
+    def stats(self, group_by=None, **filters):
+        """
+        Aggregates over the matching calls, one dict per group (agent,
+        category, day, month or language; None for a single overall row):
+        calls, avg/min/max percentage, average duration and WPM, and the
+        average score per section under 'sections'.
+        """
+        if group_by is not None and group_by not in GROUP_COLUMNS:
+            raise ValueError(f"Cannot group by '{group_by}'")
+        group = GROUP_COLUMNS.get(group_by, "''")
+        with closing(self._connect()) as conn:
+            where, args = self._where(conn, **filters)
+            sections = sorted(self._sections)
+            averages = "".join(f", AVG({SCORE_PREFIX}{section}) AS {SCORE_PREFIX}{section}" for section in sections)
+            rows = conn.execute(
+                f"SELECT {group} AS grp, COUNT(*) AS calls, AVG(percentage) AS avg_percentage, "
+                f"MIN(percentage) AS min_percentage, MAX(percentage) AS max_percentage, "
+                f"AVG(duration) AS avg_duration, AVG(wpm) AS avg_wpm{averages} FROM calls{where} "
+                f"GROUP BY grp ORDER BY grp", args).fetchall()
+        results = []
+        for row in rows:
+            result = {name: row[name] for name in ('calls', 'avg_percentage', 'min_percentage', 'max_percentage',
+                                                    'avg_duration', 'avg_wpm')}
+            result['group'] = row['grp'] if group_by else None
+            result['sections'] = {section: row[SCORE_PREFIX + section] for section in sections
+                                  if row[SCORE_PREFIX + section] is not None}
+            results.append(result)
+        return results
@@ -0,0 +1,322 @@
+"""
+Declarative scoring rubrics.
+
+A rubric spec (JSON, or YAML when PyYAML is installed) names phrase groups,
+the measures computed from them, and per section a list of rules whose
+tiers map measure conditions to points and feedback. Strictness levels are
+rows in the spec: each has a label for the UI and parameters such as
+bonus_multiplier that tiers and thresholds can scale by, and a rule can give
+its own tiers per level. See rubrics/zenconnect.json.
+
+compile_rubric() resolves all of that for one strictness level into a
+RubricPlan: a single PhraseMatcher over every phrase in the rubric, one
+closure per measure, and flat tier tables with thresholds and points
+already scaled. rubric_plan() caches plans per (rubric, version,
+strictness) and recompiles when the spec's content changes, even if its
+version was not bumped. Evaluating a call is one phrase scan plus one pass over the
+measures and tiers.
+
+Measure ops:
+    any          phrase from the group occurs (optionally within start/end)
+    distinct     number of different phrases from the group that occur
+    total        non-overlapping occurrences of all phrases in the group
+    total_words  as total, counting only whole-word matches (no start/end)
+    word_ratio   total_words divided by the call's word count (0 if empty; no start/end)
+Built-in measures: word_count, avg_sentence_length.
+
+"inputs" declares measures that come from outside the transcript text (e.g.
+timing stats from word timestamps), each with the default used when a call
+does not supply it; evaluate() takes their values as inputs={...}.
+
+Each section has a key, a label and its maximum points ("max", or "cap"
+when the score is capped); "recommendations" lists the coaching shown when
+a section scores below a threshold, in the same shape as "flags".
+
+Conditions map a measure to true/false or to a dict of gte/gt/lte/lt/eq or
+between: [low, high] (inclusive); "scale": "<strictness parameter>"
+multiplies the thresholds. A tier's "when" is a dict (all must hold), a list
+of dicts (any must hold) or absent (always holds).
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from zenconnect_phrases import PhraseMatcher
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+MEASURE_OPS = ('any', 'distinct', 'total', 'total_words', 'word_ratio')
+BUILTIN_MEASURES = ('word_count', 'avg_sentence_length')
+COMPARISONS = {
+    'gte': lambda value, limit: value >= limit,
+    'gt': lambda value, limit: value > limit,
+    'lte': lambda value, limit: value <= limit,
+    'lt': lambda value, limit: value < limit,
+    'eq': lambda value, limit: value == limit,
+    'between': lambda value, limits: (value >= limits[0]) & (value <= limits[1]),
+}
+
+logger = logging.getLogger("zenconnect.rubric")
+
+_specs = {}
+_plans = {}
+# Content digest per spec object, as (spec, digest) by id(spec)
+_digests = {}
+_lock = threading.Lock()
+
+
+class RubricError(ValueError):
+    """The rubric spec is malformed"""
+
+
+def load_rubric(path):
+    """Load a rubric spec from a .json/.yaml/.yml file, reloading it when the file changes"""
+    mtime = os.path.getmtime(path)
+    cached = _specs.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise RubricError("YAML rubrics need the PyYAML package (pip install pyyaml)")
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    for key in ('name', 'version', 'total_points', 'strictness', 'phrases', 'sections'):
+        if key not in spec:
+            raise RubricError(f"Rubric {path} is missing '{key}'")
+    if cached is not None:
+        _digests.pop(id(cached[1]), None)
+    _specs[path] = (mtime, spec)
+    return spec
+
+
+def spec_digest(spec):
+    """SHA-256 of a spec's content, memoized per spec object"""
+    cached = _digests.get(id(spec))
+    if cached is not None and cached[0] is spec:
+        return cached[1]
+    digest = hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    _digests[id(spec)] = (spec, digest)
+    return digest
+
+
+def rubric_phrases(spec):
+    """Every phrase used by a rubric, in spec order"""
+    return [phrase for group in spec['phrases'].values() for phrase in group]
+
+
+def rubric_sections(spec):
+    """(key, label, max points) per section, in spec order; max defaults to the section's cap"""
+    sections = []
+    for section in spec['sections']:
+        maximum = section.get('max', section.get('cap'))
+        if maximum is None:
+            raise RubricError(f"Section '{section['key']}' needs a 'max' or 'cap'")
+        sections.append((section['key'], section.get('label', section['key'].title()), maximum))
+    return sections
+
+
+def resolve_strictness(spec, strictness):
+    """The strictness level to use; unknown names fall back to the rubric's default"""
+    if strictness in spec['strictness']:
+        return strictness
+    return spec.get('default_strictness') or next(iter(spec['strictness']))
+
+
+def _compile_measure(name, measure, phrase_groups):
+    op = measure.get('op')
+    if op not in MEASURE_OPS:
+        raise RubricError(f"Measure '{name}' has unknown op '{op}'")
+    group = measure.get('phrases')
+    if group not in phrase_groups:
+        raise RubricError(f"Measure '{name}' uses unknown phrase group '{group}'")
+    phrases = phrase_groups[group]
+    start, end = measure.get('start'), measure.get('end')
+    if op in ('total_words', 'word_ratio') and (start is not None or end is not None):
+        raise RubricError(f"Measure '{name}': {op} counts the whole call and takes no start/end")
+    if op == 'any':
+        return lambda hits, stats: hits.any_of(phrases, start, end)
+    if op == 'distinct':
+        return lambda hits, stats: hits.distinct(phrases, start, end)
+    if op == 'total':
+        return lambda hits, stats: hits.total(phrases, start, end)
+    if op == 'total_words':
+        return lambda hits, stats: hits.total_words(phrases)
+    return lambda hits, stats: hits.total_words(phrases) / stats['word_count'] if stats['word_count'] else 0
+
+
+def _compile_when(when, measures, params):
+    """
+    Compile a condition into a list of alternatives, each a list of
+    (measure, test). Tests work elementwise on NumPy arrays as well as on
+    plain numbers, so the same plan scores one call or a whole archive.
+    """
+    if when is None:
+        return [[]]
+    alternatives = when if isinstance(when, list) else [when]
+    compiled = []
+    for alternative in alternatives:
+        tests = []
+        for measure, condition in alternative.items():
+            if measure not in measures:
+                raise RubricError(f"Condition uses unknown measure '{measure}'")
+            if isinstance(condition, bool):
+                tests.append((measure, lambda value, expected=condition: (value != 0) == expected))
+                continue
+            condition = dict(condition)
+            scale = params.get(condition.pop('scale'), 1.0) if 'scale' in condition else 1.0
+            for op, limit in condition.items():
+                if op not in COMPARISONS:
+                    raise RubricError(f"Condition on '{measure}' has unknown comparison '{op}'")
+                limit = [bound * scale for bound in limit] if op == 'between' else limit * scale
+                tests.append((measure, lambda value, compare=COMPARISONS[op], limit=limit: compare(value, limit)))
+        compiled.append(tests)
+    return compiled
+
+
+def _matches(alternatives, values):
+    return any(all(test(values[measure]) for measure, test in tests) for tests in alternatives)
+
+
+def _mask(alternatives, values, size):
+    """Vectorized _matches: a boolean array over calls"""
+    mask = np.zeros(size, dtype=bool)
+    for tests in alternatives:
+        alternative = np.ones(size, dtype=bool)
+        for measure, test in tests:
+            alternative &= test(values[measure])
+        mask |= alternative
+    return mask
+
+
+class RubricPlan:
+    """A rubric compiled for one strictness level"""
+
+    def __init__(self, spec, strictness):
+        self.name = spec['name']
+        self.version = spec['version']
+        self.strictness = strictness
+        self.total_points = spec['total_points']
+        params = spec['strictness'][strictness]
+
+        phrase_groups = spec['phrases']
+        self.phrases = rubric_phrases(spec)
+        self.matcher = PhraseMatcher(self.phrases)
+        self.measures = [(name, _compile_measure(name, measure, phrase_groups))
+                         for name, measure in spec.get('measures', {}).items()]
+        self.inputs = dict(spec.get('inputs', {}))
+        known = set(BUILTIN_MEASURES) | set(self.inputs) | {name for name, _fn in self.measures}
+
+        self.sections = []
+        for section in spec['sections']:
+            rules = []
+            for rule in section['rules']:
+                if 'tiers_by_strictness' in rule:
+                    by_level = rule['tiers_by_strictness']
+                    tiers = by_level.get(strictness, by_level.get('default'))
+                    if tiers is None:
+                        raise RubricError(f"Rule '{rule.get('name')}' has no tiers for '{strictness}' and no default")
+                else:
+                    tiers = rule['tiers']
+                compiled = [(
+                    _compile_when(tier.get('when'), known, params),
+                    tier.get('points', 0) * params.get(tier['scale'], 1.0) if 'scale' in tier else tier.get('points', 0),
+                    tier.get('feedback'),
+                ) for tier in tiers]
+                rules.append((_compile_when(rule.get('only_if'), known, params), compiled))
+            self.sections.append((section['key'], section.get('cap'), rules))
+
+        self.flags = [(flag['section'], flag['below'], {key: flag[key] for key in ('category', 'issue', 'severity')})
+                      for flag in spec.get('flags', [])]
+        self.categories = [(category.get('min_percentage'), category['label'], category.get('emoji', ''))
+                           for category in spec.get('categories', [])]
+
+    def measure(self, transcription, hits=None, inputs=None):
+        """
+        Raw measure values for a call; hits must come from a matcher covering
+        self.phrases. inputs supplies the spec's declared inputs (others are ignored).
+        """
+        if hits is None:
+            hits = self.matcher.scan(transcription.lower())
+        word_count = len(transcription.split())
+        sentence_count = len([s for s in transcription.split('.') if s.strip()])
+        values = {
+            'word_count': word_count,
+            'avg_sentence_length': word_count / max(sentence_count, 1),
+        }
+        values.update(self.inputs)
+        if inputs:
+            values.update((name, value) for name, value in inputs.items() if name in self.inputs)
+        for name, fn in self.measures:
+            values[name] = fn(hits, values)
+        return values
+
+    def evaluate(self, transcription, hits=None, inputs=None):
+        """
+        Score a call. Returns (scores, total, percentage, category,
+        category_emoji, detailed_feedback, flagged_issues).
+        """
+        return self.score(self.measure(transcription, hits, inputs))
+
+    def score(self, values):
+        """Score a call from its measure values"""
+        scores = {}
+        detailed_feedback = {}
+        for key, cap, rules in self.sections:
+            points = 0
+            feedback = []
+            for only_if, tiers in rules:
+                if not _matches(only_if, values):
+                    continue
+                for when, tier_points, tier_feedback in tiers:
+                    if _matches(when, values):
+                        points += tier_points
+                        if tier_feedback:
+                            feedback.append(tier_feedback)
+                        break
+            scores[key] = round(min(points, cap) if cap is not None else points, 1)
+            detailed_feedback[key] = feedback
+
+        total_score = sum(scores.values())
+        percentage = (total_score / self.total_points) * 100
+        flagged_issues = [dict(issue) for section, below, issue in self.flags if scores[section] < below]
+
+        category, category_emoji = "", ""
+        for minimum, label, emoji in self.categories:
+            if minimum is None or percentage >= minimum:
+                category, category_emoji = label, emoji
+                break
+        return scores, total_score, percentage, category, category_emoji, detailed_feedback, flagged_issues
+
+
+def compile_rubric(spec, strictness):
+    return RubricPlan(spec, resolve_strictness(spec, strictness))
+
+
+def rubric_plan(spec, strictness):
+    """
+    Compiled plan for a rubric and strictness level, cached per (name,
+    version, strictness). A spec whose content no longer matches the cached
+    plan's (edited without bumping its version) is recompiled, with a warning.
+    """
+    strictness = resolve_strictness(spec, strictness)
+    key = (spec['name'], spec['version'], strictness)
+    digest = spec_digest(spec)
+    cached = _plans.get(key)
+    if cached is None or cached[0] != digest:
+        with _lock:
+            cached = _plans.get(key)
+            if cached is None or cached[0] != digest:
+                if cached is not None:
+                    logger.warning("Rubric '%s' version %s changed without a version bump; recompiling its %s plan",
+                                   spec['name'], spec['version'], strictness)
+                cached = _plans[key] = (digest, RubricPlan(spec, strictness))
+    return cached[1]
@@ -0,0 +1,142 @@
+"""
+Pacing, dead air, hold and response-latency analytics from word timestamps.
+
+Whisper is run with word_timestamps=True, so every word has a start and end
+on the original recording (VAD-trimmed silence and hold music show up as
+gaps, since timestamps are mapped back). timing_stats() walks the words
+once, in order, and derives:
+
+  * speaking rate: words per minute of actual speech, where speech is each
+    word plus any pause shorter than PAUSE_SECONDS before it (overall and
+    per minute of the call, with the spread between minutes)
+  * dead air: silences of DEAD_AIR_SECONDS or more that are too short to
+    be a hold
+  * holds: silences of HOLD_SECONDS or more, announced when the agent used
+    a hold phrase within HOLD_CUE_SECONDS before the silence started
+  * response latency: on diarized calls, the gap between the end of a
+    customer turn and the start of the agent's reply
+
+Only the agent's words count towards the speaking rate of a diarized call.
+timing_inputs() turns the stats into the rubric's timing inputs (see
+"inputs" in rubrics/zenconnect.json).
+"""
+from bisect import bisect_left
+
+import numpy as np
+
+PAUSE_SECONDS = 1.0
+DEAD_AIR_SECONDS = 5.0
+HOLD_SECONDS = 20.0
+HOLD_CUE_SECONDS = 30.0
+SLOW_RESPONSE_SECONDS = 4.0
+# A minute needs this much speech before its WPM is reported
+MIN_MINUTE_SPEECH = 10.0
+
+AGENT = 'agent'
+
+
+def _tokens(segments):
+    """(start, end, speaker, words) per word; segments without word timestamps count as one span"""
+    for segment in segments:
+        speaker = segment.get('speaker', AGENT)
+        words = segment.get('words')
+        if words:
+            for word in words:
+                yield word['start'], word['end'], speaker, 1
+        elif segment['text'].strip():
+            yield segment['start'], segment['end'], speaker, len(segment['text'].split())
+
+
+def timing_stats(result, hold_phrases=(), index=None):
+    """
+    Timing analytics for a Whisper result, or None when it has no timed words.
+    index is the call's TranscriptIndex, if it has one; its per-segment hits
+    (which must cover hold_phrases) then find the hold cues instead of a
+    rescan of every segment's text.
+    """
+    segments = result['segments']
+    diarized = (result.get('diarization') or {}).get('speakers', 1) > 1
+    duration = result.get('duration') or (segments[-1]['end'] if segments else 0)
+
+    # End times of the agent's segments that announce a hold
+    if index is not None:
+        announced = [index.segment_any(i, hold_phrases) for i in range(len(segments))]
+    else:
+        announced = [any(phrase in segment['text'].lower() for phrase in hold_phrases) for segment in segments]
+    cues = [segment['end'] for segment, announces in zip(segments, announced)
+            if announces and segment.get('speaker', AGENT) == AGENT]
+
+    minutes = int(duration // 60) + 1
+    words_per_minute = [0] * minutes
+    speech_per_minute = [0.0] * minutes
+    dead_air, holds, latencies = [], [], []
+    previous_end = previous_speaker = None
+
+    for start, end, speaker, count in _tokens(segments):
+        gap = start - previous_end if previous_end is not None else None
+        if gap is not None:
+            if gap >= HOLD_SECONDS:
+                cue = bisect_left(cues, previous_end - HOLD_CUE_SECONDS)
+                holds.append({'start': round(previous_end, 2), 'end': round(start, 2),
+                              'announced': cue < len(cues) and cues[cue] <= previous_end + 0.5})
+            elif gap >= DEAD_AIR_SECONDS:
+                dead_air.append([round(previous_end, 2), round(start, 2)])
+            if diarized and speaker == AGENT and previous_speaker != AGENT and gap < HOLD_SECONDS:
+                latencies.append(max(0.0, gap))
+
+        if speaker == AGENT or not diarized:
+            minute = min(int(max(start, 0) // 60), minutes - 1)
+            words_per_minute[minute] += count
+            speech = end - start
+            if gap is not None and 0 < gap < PAUSE_SECONDS and previous_speaker == speaker:
+                speech += gap
+            speech_per_minute[minute] += max(0.0, speech)
+
+        previous_end = max(end, previous_end) if previous_end is not None else end
+        previous_speaker = speaker
+
+    if previous_end is None:
+        return None
+
+    speech_seconds = sum(speech_per_minute)
+    words = sum(words_per_minute)
+    wpm_per_minute = [round(count / seconds * 60) if seconds >= MIN_MINUTE_SPEECH else None
+                      for count, seconds in zip(words_per_minute, speech_per_minute)]
+    rated = [wpm for wpm in wpm_per_minute if wpm is not None]
+    hold_lengths = [hold['end'] - hold['start'] for hold in holds]
+    dead_air_lengths = [end - start for start, end in dead_air]
+
+    return {
+        'speech_seconds': round(speech_seconds, 1),
+        'speech_wpm': round(words / speech_seconds * 60, 1) if speech_seconds else 0.0,
+        'wpm_per_minute': wpm_per_minute,
+        'wpm_spread': round(float(np.std(rated)), 1) if len(rated) > 1 else 0.0,
+        'dead_air': dead_air,
+        'dead_air_seconds': round(sum(dead_air_lengths), 1),
+        'longest_dead_air': round(max(dead_air_lengths, default=0.0), 1),
+        'holds': holds,
+        'hold_seconds': round(sum(hold_lengths), 1),
+        'longest_hold': round(max(hold_lengths, default=0.0), 1),
+        'unannounced_holds': sum(1 for hold in holds if not hold['announced']),
+        'response_latency': round(float(np.mean(latencies)), 2) if latencies else None,
+        'response_latency_p90': round(float(np.percentile(latencies, 90)), 2) if latencies else None,
+        'slow_responses': sum(1 for latency in latencies if latency >= SLOW_RESPONSE_SECONDS),
+    }
+
+
+def timing_inputs(timing):
+    """Rubric inputs for a call's timing stats ({} when there are none)"""
+    if not timing:
+        return {}
+    return {
+        'has_timing': True,
+        'speech_wpm': timing['speech_wpm'],
+        'wpm_spread': timing['wpm_spread'],
+        'dead_air_seconds': timing['dead_air_seconds'],
+        'longest_dead_air': timing['longest_dead_air'],
+        'hold_count': len(timing['holds']),
+        'unannounced_holds': timing['unannounced_holds'],
+        'longest_hold': timing['longest_hold'],
+        'response_latency': timing['response_latency'] or 0.0,
+        'slow_responses': timing['slow_responses'],
+    }
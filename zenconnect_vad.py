@@ -0,0 +1,139 @@
+"""
+Energy-based voice activity detection used to skip non-speech before decoding.
+
+Support calls often carry minutes of silence and hold music that Whisper
+would otherwise decode. `trim_non_speech` keeps only the regions that look
+like speech and returns a TimeMap, which `remap_result` uses to move segment
+and word timestamps from the trimmed audio back onto the original recording.
+
+Frames count as active when their energy is well above the recording's
+noise floor. Long stretches of active audio whose level barely varies are
+treated as music: speech rises and falls with every syllable, while hold
+music sits at a steady level.
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+FRAME_MS = 30
+
+
+class TimeMap:
+    """
+    Kept regions of the original audio as (start, end) in seconds, in order.
+    Times in the trimmed audio are the kept regions laid end to end.
+    """
+
+    def __init__(self, regions, duration):
+        self.regions = list(regions)
+        self.duration = duration
+        self._trimmed_starts = []
+        offset = 0.0
+        for start, end in self.regions:
+            self._trimmed_starts.append(offset)
+            offset += end - start
+        self.speech_seconds = float(offset)
+
+    @property
+    def skipped_seconds(self):
+        return max(0.0, self.duration - self.speech_seconds)
+
+    def to_original(self, t, end=False):
+        """
+        Map a time in the trimmed audio to the original. A time that falls on
+        the joint between two regions maps to the end of the earlier region
+        when end=True and to the start of the later one otherwise.
+        """
+        if not self.regions:
+            return t
+        find = bisect_left if end else bisect_right
+        i = max(0, find(self._trimmed_starts, t) - 1)
+        start, stop = self.regions[i]
+        return float(min(start + t - self._trimmed_starts[i], stop if i < len(self.regions) - 1 else self.duration))
+
+
+def _frame_energy_db(audio, frame):
+    frames = len(audio) // frame
+    if not frames:
+        return np.zeros(0)
+    power = np.square(audio[:frames * frame].astype(np.float32)).reshape(frames, frame).mean(axis=1)
+    return 10 * np.log10(power + 1e-10)
+
+
+def _runs(mask):
+    """(start, end) index pairs of the True runs in a boolean array"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def detect_speech(audio, sample_rate=16000, margin_db=12.0, min_level_db=-55.0, min_speech_ms=200,
+                  min_silence_ms=1000, pad_ms=250, music_window_ms=3000, music_std_db=2.5):
+    """
+    Return the speech regions of audio as (start, end) sample offsets.
+
+    Silences shorter than min_silence_ms are kept so pauses inside a turn
+    stay intact; set music_std_db=None to keep steady-level audio.
+    """
+    frame = max(1, sample_rate * FRAME_MS // 1000)
+    energy = _frame_energy_db(audio, frame)
+    if not len(energy):
+        return []
+
+    floor = np.percentile(energy, 10)
+    active = energy > max(floor + margin_db, min_level_db)
+
+    if music_std_db is not None:
+        window = max(1, music_window_ms // FRAME_MS)
+        for start, end in _runs(active):
+            for lo in range(start, end - window + 1, window):
+                if energy[lo:lo + window].std() < music_std_db:
+                    active[lo:lo + window] = False
+
+    # Close short gaps, then drop blips too short to be words
+    min_silence = max(1, min_silence_ms // FRAME_MS)
+    for start, end in _runs(~active):
+        if end - start < min_silence and start > 0 and end < len(active):
+            active[start:end] = True
+    min_speech = max(1, min_speech_ms // FRAME_MS)
+    pad = pad_ms // FRAME_MS
+    regions = []
+    for start, end in _runs(active):
+        if end - start < min_speech:
+            continue
+        start, end = max(0, start - pad), min(len(active), end + pad)
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end)
+        else:
+            regions.append((start, end))
+    return [(int(start) * frame, min(len(audio), int(end) * frame)) for start, end in regions]
+
+
+def trim_non_speech(audio, sample_rate=16000, min_skip_seconds=1.0, **options):
+    """
+    Drop non-speech from audio. Returns (trimmed_audio, time_map); the audio
+    is returned unchanged (with an identity map) when less than
+    min_skip_seconds would be removed.
+    """
+    duration = len(audio) / sample_rate
+    regions = detect_speech(audio, sample_rate, **options)
+    kept = sum(end - start for start, end in regions)
+    if (len(audio) - kept) / sample_rate < min_skip_seconds:
+        return audio, TimeMap([(0.0, duration)], duration)
+    trimmed = np.concatenate([audio[start:end] for start, end in regions]) if regions else audio[:0]
+    return trimmed, TimeMap([(start / sample_rate, end / sample_rate) for start, end in regions], duration)
+
+
+def remap_result(result, time_map):
+    """Move a Whisper result's timestamps onto the original audio and record what was skipped"""
+    for segment in result['segments']:
+        segment['start'] = time_map.to_original(segment['start'])
+        segment['end'] = time_map.to_original(segment['end'], end=True)
+        for word in segment.get('words', []):
+            word['start'] = time_map.to_original(word['start'])
+            word['end'] = time_map.to_original(word['end'], end=True)
+    result['duration'] = time_map.duration
+    result['vad'] = {
+        'speech_seconds': round(time_map.speech_seconds, 2),
+        'skipped_seconds': round(time_map.skipped_seconds, 2),
+    }
+    return result